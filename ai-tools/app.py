@@ -1,5 +1,8 @@
+from casuse_common.metrics import instrument_app
 from fastapi import FastAPI
 app = FastAPI(title="casuse-hp ai-tools")
+# Prometheus: GET /metrics (casuse_common.metrics)
+instrument_app(app, service="ai-tools")
 
 @app.get("/healthz")
 def healthz():
@@ -4,10 +4,9 @@ from fastapi import APIRouter, Depends, HTTPException, status, Header
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 import pyotp
-from jose import jwt, JWTError
 from app.db import get_db
 from app.models.user import User
-from app.core.security import create_access_token, create_refresh_token, verify_password
+from app.core.security import create_access_token, create_refresh_token, decode_token, verify_and_update_password
 from app.config import get_settings
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -33,7 +32,10 @@ class MeResponse(BaseModel):
 @router.post("/login", response_model=TokenResponse)
 def login(data: LoginRequest, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.email == data.username).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    valid, new_hash = verify_and_update_password(data.password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     if settings.ENABLE_2FA and user.twofa_enabled:
         if not data.totp:
@@ -43,6 +45,10 @@ def login(data: LoginRequest, db: Session = Depends(get_db)):
         totp = pyotp.TOTP(user.twofa_secret)
         if not totp.verify(data.totp, valid_window=1):
             raise HTTPException(status_code=400, detail="Invalid TOTP code")
+    if new_hash:
+        # seed-hash (pbkdf2_sha256) of andere bcrypt cost: nu naar BCRYPT_ROUNDS
+        user.hashed_password = new_hash
+        db.commit()
     access_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     refresh_expires = timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token({"sub": str(user.id), "email": user.email, "role": user.role}, access_expires)
@@ -54,12 +60,11 @@ class RefreshRequest(BaseModel):
 
 @router.post("/refresh", response_model=TokenResponse)
 def refresh_token(data: RefreshRequest, db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(data.refresh_token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        if payload.get("type") != "refresh":
-            raise HTTPException(status_code=401, detail="Invalid token type")
-    except JWTError:
+    payload = decode_token(data.refresh_token)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
+    if payload.get("type") != "refresh":
+        raise HTTPException(status_code=401, detail="Invalid token type")
     user_id = int(payload.get("sub"))
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -73,11 +78,10 @@ def me(authorization: str = Header(None), db: Session = Depends(get_db)):
     if not authorization or not authorization.lower().startswith("bearer "):
         raise HTTPException(status_code=401, detail="Missing token")
     token = authorization.split(" ", 1)[1]
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
-        user_id = int(payload.get("sub"))
-    except JWTError:
+    payload = decode_token(token)
+    if payload is None:
         raise HTTPException(status_code=401, detail="Invalid token")
+    user_id = int(payload.get("sub"))
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
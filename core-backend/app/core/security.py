@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 
+from casuse_common.jwt_cache import VerifiedClaimsCache
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
@@ -11,9 +12,14 @@ settings = get_settings()
 # BELANGRIJK:
 # - accepteer bcrypt (voor later / productie)
 # - maar ook pbkdf2_sha256 (voor onze seeds uit alembic)
+# - pbkdf2_sha256 en bcrypt met een andere cost dan BCRYPT_ROUNDS gelden als
+#   verouderd en worden bij login herberekend (verify_and_update_password)
 pwd_context = CryptContext(
     schemes=["bcrypt", "pbkdf2_sha256"],
-    deprecated="auto"
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
 )
 
 
@@ -39,16 +45,35 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+def verify_and_update_password(plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """(geldig, nieuwe hash); nieuwe hash enkel bij een verouderde hash."""
+    return pwd_context.verify_and_update(plain, hashed)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
     
 
+def _verify_token(token: str) -> dict:
+    return jwt.decode(
+        token,
+        settings.JWT_SECRET,
+        algorithms=[settings.JWT_ALGORITHM],
+    )
+
+
+# geverifieerde claims per token (per proces), tot `exp` van de token;
+# gedeeld met de website-backend via casuse_common
+token_cache = VerifiedClaimsCache(
+    _verify_token,
+    maxsize=settings.JWT_CACHE_SIZE,
+    max_ttl=settings.JWT_CACHE_TTL_SECONDS,
+)
+
+
 def decode_token(token: str):
+    # claims zijn gedeeld tussen requests: niet wijzigen
     try:
-        return jwt.decode(
-            token,
-            settings.JWT_SECRET,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
+        return token_cache.decode(token)
     except JWTError:
         return None
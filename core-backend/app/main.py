@@ -1,4 +1,6 @@
 import logging
+from casuse_common.db_pool import pool_stats
+from casuse_common.metrics import instrument_app
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
@@ -20,6 +22,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Prometheus: GET /metrics (casuse_common.metrics)
+instrument_app(app, service="core-backend", engines=[engine])
 
 @app.on_event("startup")
 def startup():
@@ -50,6 +54,11 @@ def readyz():
     except Exception as e:
         return {"status": "not-ready", "error": str(e)}
 
+@app.get("/metrics/db-pool")
+def db_pool_metrics():
+    # pool van deze worker: uitgeleend, overflow, wachttijd bij checkout
+    return {"pgbouncer": settings.DB_PGBOUNCER, **pool_stats(engine)}
+
 @app.post("/ai/ask")
 def ai_ask(payload: dict):
     q = payload.get("question", "")
@@ -0,0 +1,5 @@
+"""Gedeelde code voor de casuse-hp backends (core en modules)."""
+
+from casuse_common.jwt_cache import VerifiedClaimsCache
+
+__all__ = ["VerifiedClaimsCache"]
@@ -0,0 +1,149 @@
+# libs/casuse-common/casuse_common/db_pool.py
+"""
+Instelbare en meetbare connection pool voor SQLAlchemy-engines (sync en
+async).
+
+- `engine_options(...)`: kwargs voor create_engine / create_async_engine met
+  pool size, overflow, recycle en timeout uit de Settings van de service
+- PgBouncer-modus (transaction pooling): geen server-side prepared
+  statements die aan één serververbinding vastzitten
+    - asyncpg: statement cache uit en een unieke naam per prepared statement
+    - psycopg 3: automatisch prepareren uit (prepare_threshold=None)
+    - psycopg2: prepareert zelf niet, niets te doen
+- `pool_stats(engine)`: live cijfers van de pool van deze worker
+  (uitgeleend, overflow, wachttijd bij checkout, timeouts)
+
+De wachttijd is de tijd om een verbinding uit de pool te krijgen: wachten op
+een vrije verbinding, of een nieuwe openen als er nog overflow is. Een hoge
+max met timeouts > 0 betekent dat de pool (of max_connections van Postgres)
+te klein is voor het aantal gelijktijdige requests.
+
+Vereist SQLAlchemy 2.x (extra `db`); de rest van casuse_common niet.
+"""
+
+import threading
+import time
+import uuid
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class _CheckoutTimer:
+    """Mixin voor QueuePool: meet elke checkout (`_do_get`)."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.peak_checked_out = 0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        waited = time.perf_counter() - started
+        checked_out = self.checkedout()
+        with self._stats_lock:
+            self.checkouts += 1
+            self.wait_seconds_total += waited
+            if waited > self.wait_seconds_max:
+                self.wait_seconds_max = waited
+            if checked_out > self.peak_checked_out:
+                self.peak_checked_out = checked_out
+        return record
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def _asyncpg_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def pgbouncer_connect_args(driver: str) -> Dict[str, Any]:
+    """connect_args zonder server-side prepared statements, per DBAPI-driver."""
+    if driver == "asyncpg":
+        return {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _asyncpg_statement_name,
+        }
+    if driver == "psycopg":
+        return {"prepare_threshold": None}
+    return {}
+
+
+def engine_options(
+    url: str,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_recycle: int = -1,
+    pool_timeout: float = 30.0,
+    pgbouncer: bool = False,
+) -> Dict[str, Any]:
+    """
+    kwargs voor create_engine(url, **...) of create_async_engine(url, **...).
+    Het soort pool (sync/async) volgt uit de driver in de URL.
+    """
+    driver = make_url(url).get_driver_name()
+    options: Dict[str, Any] = {
+        "poolclass": (
+            TimedAsyncAdaptedQueuePool if driver == "asyncpg" else TimedQueuePool
+        ),
+        "pool_size": pool_size,
+        "max_overflow": max_overflow,
+        "pool_recycle": pool_recycle,
+        "pool_timeout": pool_timeout,
+        "pool_pre_ping": True,
+    }
+    if pgbouncer:
+        options["connect_args"] = pgbouncer_connect_args(driver)
+    return options
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    """Live cijfers van de pool van `engine` (sync Engine of AsyncEngine)."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    if not isinstance(pool, _CheckoutTimer):
+        return {"pool_class": type(pool).__name__, "status": pool.status()}
+
+    with pool._stats_lock:
+        checkouts = pool.checkouts
+        stats = {
+            "checkouts": checkouts,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": round(pool.wait_seconds_total, 6),
+            "wait_seconds_avg": (
+                round(pool.wait_seconds_total / checkouts, 6) if checkouts else 0.0
+            ),
+            "wait_seconds_max": round(pool.wait_seconds_max, 6),
+            "peak_checked_out": pool.peak_checked_out,
+        }
+    return {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "timeout_seconds": pool.timeout(),
+        "recycle_seconds": pool._recycle,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool.overflow() is negatief zolang de pool nog niet vol is
+        "overflow": max(pool.overflow(), 0),
+        **stats,
+    }
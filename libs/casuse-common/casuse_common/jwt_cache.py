@@ -0,0 +1,92 @@
+# libs/casuse-common/casuse_common/jwt_cache.py
+"""
+Cache van geverifieerde JWT-claims (per proces).
+
+Een portaal dat elke paar seconden pollt stuurt telkens dezelfde access token
+mee; zonder cache wordt bij elke request opnieuw de HMAC-handtekening
+gecontroleerd en de JSON van header en claims geparsed (python-jose). Hier
+gebeurt dat één keer per token:
+
+- key = SHA-256 van de token (de token zelf wordt niet bewaard)
+- een entry verloopt op `exp` van de token, of na max_ttl als dat eerder is
+- enkel geslaagde verificaties worden bewaard; een ongeldige of verlopen
+  token gaat altijd opnieuw door `verify`, die de fout zelf opgooit
+- begrensd (LRU), thread-safe (ook voor sync endpoints in de threadpool)
+
+De teruggegeven claims zijn gedeeld tussen requests: niet wijzigen.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Tuple
+
+Claims = Dict[str, Any]
+
+
+class VerifiedClaimsCache:
+    def __init__(
+        self,
+        verify: Callable[[str], Claims],
+        maxsize: int = 10000,
+        max_ttl: float = 300.0,
+    ) -> None:
+        self.verify = verify
+        self.maxsize = maxsize
+        self.max_ttl = max_ttl
+        # digest -> (verloopt op, epoch-seconden; claims)
+        self._data: "OrderedDict[bytes, Tuple[float, Claims]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def decode(self, token: str) -> Claims:
+        """Geverifieerde claims; fouten van `verify` (bv. JWTError) gaan door."""
+        key = hashlib.sha256(token.encode()).digest()
+        # wall clock: `exp` in de token is ook epoch-tijd
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._data[key]
+            self.misses += 1
+
+        # buiten de lock: verificatie kost het meest
+        claims = self.verify(token)
+
+        expires_at = now + self.max_ttl
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= now:
+            return claims
+        with self._lock:
+            self._data[key] = (expires_at, claims)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return claims
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "max_ttl_seconds": self.max_ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
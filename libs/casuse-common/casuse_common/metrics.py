@@ -0,0 +1,210 @@
+# libs/casuse-common/casuse_common/metrics.py
+"""
+Prometheus-metrics voor de FastAPI-services, overal op dezelfde manier:
+
+    from casuse_common.metrics import instrument_app
+
+    app = FastAPI(...)
+    instrument_app(app, service="website-backend", engines=[async_engine])
+
+Dat geeft GET /metrics (tekstformaat van Prometheus) met per service,
+HTTP-methode en route-template (bv. /api/admin/customers/{customer_id},
+niet de concrete URL):
+
+- http_requests_total: requests per status
+- http_request_duration_seconds: latency-histogram
+- http_requests_in_progress: requests die nu lopen
+- http_request_db_queries: histogram van het aantal SQL-queries per request
+  (stijgt dat voor een route, dan is er meestal een N+1 bijgekomen)
+- http_request_db_seconds: histogram van de DB-tijd per request
+
+De DB-cijfers komen uit SQLAlchemy-events (before/after_cursor_execute) op
+de meegegeven engines (sync Engine of AsyncEngine) en worden via een
+contextvar aan de lopende request toegekend; queries buiten een request
+(achtergrondtaken) tellen niet mee.
+
+Een URL die met geen enkele route overeenkomt krijgt route "<unmatched>",
+zodat scans en 404's het aantal series niet laten exploderen.
+
+Meerdere workers (uvicorn --workers, gunicorn): zet PROMETHEUS_MULTIPROC_DIR
+op een lege, per container gedeelde map; /metrics telt dan alle workers op.
+
+Vereist prometheus-client (extra `metrics`); SQLAlchemy enkel als er engines
+meegegeven worden.
+"""
+
+import os
+import time
+from contextvars import ContextVar
+from typing import Any, Iterable, Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from starlette.requests import Request
+from starlette.responses import Response
+
+from casuse_common.routing import route_template
+
+
+LABELS = ("service", "method", "route")
+
+# seconden; van een gecachte GET tot een zware export
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP-requests per route-template en status",
+    LABELS + ("status",),
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Duur van een HTTP-request (tot de laatste byte van de response)",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP-requests die nu lopen",
+    LABELS,
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Aantal SQL-queries per HTTP-request",
+    LABELS,
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Tijd in SQL-queries per HTTP-request",
+    LABELS,
+    buckets=LATENCY_BUCKETS,
+)
+
+
+class _RequestDbStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# DB-cijfers van de lopende request; None buiten een request
+_request_db: ContextVar[Optional[_RequestDbStats]] = ContextVar(
+    "casuse_request_db", default=None
+)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._casuse_query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_db.get()
+    if stats is None or context is None:
+        return
+    started = getattr(context, "_casuse_query_started", None)
+    stats.queries += 1
+    if started is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_engine(engine) -> None:
+    """Telt de queries van `engine` (Engine of AsyncEngine) per request."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """Pure ASGI-middleware (ook streaming responses tellen tot het einde)."""
+
+    def __init__(self, app, service: str, fastapi_app, metrics_path: str = "/metrics") -> None:
+        self.app = app
+        self.service = service
+        self.fastapi_app = fastapi_app
+        self.metrics_path = metrics_path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == self.metrics_path:
+            return await self.app(scope, receive, send)
+
+        labels = (
+            self.service,
+            scope["method"],
+            route_template(self.fastapi_app, scope),
+        )
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_stats = _RequestDbStats()
+        token = _request_db.set(db_stats)
+        in_progress = IN_PROGRESS.labels(*labels)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUEST_DURATION.labels(*labels).observe(time.perf_counter() - started)
+            REQUESTS.labels(*labels, str(status_code)).inc()
+            REQUEST_DB_QUERIES.labels(*labels).observe(db_stats.queries)
+            REQUEST_DB_SECONDS.labels(*labels).observe(db_stats.seconds)
+            in_progress.dec()
+            _request_db.reset(token)
+
+
+def _registry():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def instrument_app(
+    app,
+    service: str,
+    engines: Iterable[Any] = (),
+    metrics_path: str = "/metrics",
+) -> None:
+    """
+    Voegt de metrics-middleware en GET `metrics_path` toe aan een FastAPI-app.
+    Aanroepen na het aanmaken van de app, vóór de start (zoals add_middleware).
+    """
+    for engine in engines:
+        if engine is not None:
+            instrument_engine(engine)
+    app.add_middleware(
+        MetricsMiddleware,
+        service=service,
+        fastapi_app=app,
+        metrics_path=metrics_path,
+    )
+    app.add_route(metrics_path, metrics_endpoint, methods=["GET"], include_in_schema=False)
@@ -0,0 +1,177 @@
+# libs/casuse-common/casuse_common/pytest_query_audit.py
+"""
+pytest-plugin bij casuse_common.query_audit: een test faalt als een request
+meer SQL-queries doet dan het budget van zijn endpoint, of (optioneel) als
+een request hetzelfde statement herhaalt (N+1).
+
+Activeren in de conftest.py van de service:
+
+    pytest_plugins = ["casuse_common.pytest_query_audit"]
+
+De app moet QueryAuditMiddleware hebben (install_query_audit; in de
+website-backend via WEBSITE_QUERY_AUDIT_ENABLED=true in de testomgeving).
+
+Budgetten per endpoint ("METHOD /route-template aantal") in pytest.ini of
+[tool.pytest.ini_options]:
+
+    query_budgets =
+        GET /api/admin/customers 4
+        GET /api/admin/customers/{customer_id} 3
+        GET /api/customer/portal/overview 3
+    query_budget_default = 10        # leeg = geen budget voor andere endpoints
+    query_repeat_threshold = 3       # zelfde vorm >= 3x in één request = N+1
+    query_fail_on_repeats = true     # anders enkel een warning
+    query_slow_ms = 200              # trage statements als warning
+
+In een test (fixture `query_audit`, ook zonder expliciet gebruik actief):
+
+    def test_klantenlijst(client, admin_headers, query_audit):
+        query_audit.budget("GET /api/admin/customers", 2)  # enkel deze test
+        client.get("/api/admin/customers", headers=admin_headers)
+        assert query_audit.requests[-1].count == 2
+
+Enkel requests uit de test zelf tellen, niet die uit fixtures (bv. login).
+Vereist pytest >= 8.
+"""
+
+import threading
+import warnings
+from typing import Dict, List, Optional
+
+import pytest
+
+from casuse_common.query_audit import QueryLog, add_listener, remove_listener
+
+
+class QueryAuditWarning(UserWarning):
+    pass
+
+
+def parse_budgets(lines: List[str]) -> Dict[str, int]:
+    budgets = {}
+    for line in lines:
+        endpoint, _, limit = line.strip().rpartition(" ")
+        if not endpoint or not limit.isdigit():
+            raise pytest.UsageError(
+                f"query_budgets: verwacht 'METHOD /route aantal', kreeg {line!r}"
+            )
+        budgets[endpoint.strip()] = int(limit)
+    return budgets
+
+
+class QueryAudit:
+    def __init__(
+        self,
+        budgets: Dict[str, int],
+        default_budget: Optional[int] = None,
+        repeat_threshold: int = 3,
+        fail_on_repeats: bool = False,
+        slow_query_ms: Optional[float] = None,
+    ) -> None:
+        self.budgets = dict(budgets)
+        self.default_budget = default_budget
+        self.repeat_threshold = repeat_threshold
+        self.fail_on_repeats = fail_on_repeats
+        self.slow_query_ms = slow_query_ms
+        self.requests: List[QueryLog] = []
+        # TestClient draait de app in een andere thread
+        self._lock = threading.Lock()
+
+    def budget(self, endpoint: str, max_queries: int) -> None:
+        """Budget voor `endpoint` ("GET /route") in deze test."""
+        self.budgets[endpoint] = max_queries
+
+    def record(self, log: QueryLog) -> None:
+        with self._lock:
+            self.requests.append(log)
+
+    def budget_for(self, endpoint: str) -> Optional[int]:
+        return self.budgets.get(endpoint, self.default_budget)
+
+    def problems(self) -> List[str]:
+        """Overschreden budgetten (en N+1 met fail_on_repeats); warnings voor de rest."""
+        problems = []
+        slow_ms = self.slow_query_ms if self.slow_query_ms is not None else float("inf")
+        with self._lock:
+            requests = list(self.requests)
+        for log in requests:
+            describe = log.describe(self.repeat_threshold, slow_ms)
+            limit = self.budget_for(log.endpoint)
+            if limit is not None and log.count > limit:
+                problems.append(f"querybudget {limit} overschreden: {describe}")
+                continue
+            if log.repeated(self.repeat_threshold):
+                if self.fail_on_repeats:
+                    problems.append(f"herhaalde statements (N+1): {describe}")
+                    continue
+                warnings.warn(QueryAuditWarning(f"herhaalde statements (N+1): {describe}"))
+            elif log.slow(slow_ms / 1000):
+                warnings.warn(QueryAuditWarning(f"trage statements: {describe}"))
+        return problems
+
+
+def pytest_addoption(parser) -> None:
+    parser.addini(
+        "query_budgets",
+        type="linelist",
+        default=[],
+        help="querybudget per endpoint: 'METHOD /route-template aantal' per regel",
+    )
+    parser.addini(
+        "query_budget_default",
+        default="",
+        help="querybudget voor endpoints zonder eigen budget (leeg = geen)",
+    )
+    parser.addini(
+        "query_repeat_threshold",
+        default="3",
+        help="zelfde statement-vorm zo vaak in één request = N+1",
+    )
+    parser.addini(
+        "query_fail_on_repeats",
+        type="bool",
+        default=False,
+        help="N+1 laat de test falen (anders een warning)",
+    )
+    parser.addini(
+        "query_slow_ms",
+        default="",
+        help="statements trager dan dit worden als warning gemeld (leeg = uit)",
+    )
+
+
+def _audit_for(item) -> QueryAudit:
+    audit = getattr(item, "_query_audit", None)
+    if audit is None:
+        config = item.config
+        default_budget = config.getini("query_budget_default").strip()
+        slow_ms = config.getini("query_slow_ms").strip()
+        audit = QueryAudit(
+            budgets=parse_budgets(config.getini("query_budgets")),
+            default_budget=int(default_budget) if default_budget else None,
+            repeat_threshold=int(config.getini("query_repeat_threshold")),
+            fail_on_repeats=config.getini("query_fail_on_repeats"),
+            slow_query_ms=float(slow_ms) if slow_ms else None,
+        )
+        item._query_audit = audit
+    return audit
+
+
+@pytest.fixture
+def query_audit(request) -> QueryAudit:
+    """Rapporten en budgetten van de lopende test (zie module-docstring)."""
+    return _audit_for(request.node)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    audit = _audit_for(item)
+    add_listener(audit.record)
+    try:
+        result = yield
+    finally:
+        remove_listener(audit.record)
+    problems = audit.problems()
+    if problems:
+        pytest.fail("\n\n".join(problems), pytrace=False)
+    return result
@@ -0,0 +1,238 @@
+# libs/casuse-common/casuse_common/query_audit.py
+"""
+N+1- en trage-query-detector voor development en tests (opt-in).
+
+Legt elk SQL-statement per request vast (SQLAlchemy before/after_cursor_execute
+op de meegegeven engines, via een contextvar aan de request gekoppeld) en
+meldt na de request:
+
+- herhaalde statements: dezelfde vorm (parameters, literals en IN-lijsten
+  weggelaten) minstens `repeat_threshold` keer in één request, het typische
+  spoor van een lazy relationship in een lus (N+1)
+- trage statements: langer dan `slow_query_ms`
+
+Gebruik in een service (enkel in dev/test, kost per query wat Python-werk):
+
+    from casuse_common.query_audit import install_query_audit
+
+    install_query_audit(app, engines=[async_engine])
+
+Elke response krijgt dan een header X-DB-Queries (queries tot aan de
+response-start), en requests met herhaalde of trage statements worden als
+warning gelogd (logger casuse_common.query_audit). Tests gebruiken de
+rapporten via de pytest-plugin casuse_common.pytest_query_audit
+(per-endpoint querybudget).
+
+Buiten een request (scripts, benchmarks):
+
+    with record_queries() as log:
+        ...
+    print(log.describe())
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from casuse_common.routing import route_template
+
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """
+    Vorm van een statement: parameters, literals en IN-lijsten als `?`, zodat
+    dezelfde query voor een andere klant of een andere lijstlengte gelijk is.
+    """
+    shape = _STRING.sub("?", statement)
+    shape = _PARAM.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    shape = _LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryRecord(NamedTuple):
+    statement: str
+    seconds: float
+
+
+class QueryLog:
+    """SQL-statements van één request (of één `record_queries`-blok)."""
+
+    def __init__(self, method: str = "", route: str = "", path: str = "") -> None:
+        self.method = method
+        self.route = route
+        self.path = path
+        self.status: Optional[int] = None
+        self.queries: List[QueryRecord] = []
+
+    @property
+    def endpoint(self) -> str:
+        """"METHOD /route/template", de key van querybudgetten."""
+        return f"{self.method} {self.route}"
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(q.seconds for q in self.queries)
+
+    def repeated(self, threshold: int = 3) -> List[Tuple[str, int]]:
+        """(vorm, aantal) van elke vorm die minstens `threshold` keer voorkomt."""
+        shapes = Counter(statement_shape(q.statement) for q in self.queries)
+        return [(shape, n) for shape, n in shapes.most_common() if n >= threshold]
+
+    def slow(self, seconds: float) -> List[QueryRecord]:
+        return [q for q in self.queries if q.seconds >= seconds]
+
+    def describe(self, repeat_threshold: int = 3, slow_query_ms: float = 100.0) -> str:
+        lines = [
+            f"{self.endpoint} ({self.path}) -> {self.status}: "
+            f"{self.count} queries, {self.db_seconds * 1000:.1f} ms DB"
+        ]
+        for shape, n in self.repeated(repeat_threshold):
+            lines.append(f"  herhaald {n}x: {shape}")
+        for query in self.slow(slow_query_ms / 1000):
+            lines.append(
+                f"  traag {query.seconds * 1000:.1f} ms: "
+                f"{_SPACE.sub(' ', query.statement).strip()}"
+            )
+        return "\n".join(lines)
+
+
+# log van de lopende request; None buiten een request / record_queries-blok
+_current: ContextVar[Optional[QueryLog]] = ContextVar("casuse_query_log", default=None)
+
+_listeners: List[Callable[[QueryLog], None]] = []
+_listeners_lock = threading.Lock()
+
+
+def add_listener(listener: Callable[[QueryLog], None]) -> None:
+    """`listener(log)` na elke request die door QueryAuditMiddleware gaat."""
+    with _listeners_lock:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[QueryLog], None]) -> None:
+    with _listeners_lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._casuse_audit_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    log = _current.get()
+    if log is None:
+        return
+    started = getattr(context, "_casuse_audit_started", None)
+    seconds = time.perf_counter() - started if started is not None else 0.0
+    log.queries.append(QueryRecord(statement, seconds))
+
+
+def instrument_engine(engine) -> None:
+    """Legt de statements van `engine` (Engine of AsyncEngine) vast."""
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryLog]:
+    """Statements van de instrumented engines binnen dit blok (zelfde context)."""
+    log = QueryLog()
+    token = _current.set(log)
+    try:
+        yield log
+    finally:
+        _current.reset(token)
+
+
+class QueryAuditMiddleware:
+    """Pure ASGI-middleware: één QueryLog per HTTP-request."""
+
+    def __init__(
+        self,
+        app,
+        fastapi_app,
+        repeat_threshold: int = 3,
+        slow_query_ms: float = 100.0,
+    ) -> None:
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.repeat_threshold = repeat_threshold
+        self.slow_query_ms = slow_query_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        log = QueryLog(
+            method=scope["method"],
+            route=route_template(self.fastapi_app, scope),
+            path=scope["path"],
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                log.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-db-queries", str(log.count).encode())
+                ]
+            await send(message)
+
+        token = _current.set(log)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._report(log)
+
+    def _report(self, log: QueryLog) -> None:
+        if log.repeated(self.repeat_threshold) or log.slow(self.slow_query_ms / 1000):
+            logger.warning(
+                "Query audit: %s", log.describe(self.repeat_threshold, self.slow_query_ms)
+            )
+        with _listeners_lock:
+            listeners = list(_listeners)
+        for listener in listeners:
+            listener(log)
+
+
+def install_query_audit(
+    app,
+    engines: Iterable = (),
+    repeat_threshold: int = 3,
+    slow_query_ms: float = 100.0,
+) -> None:
+    """Voegt QueryAuditMiddleware toe en instrumenteert `engines` (None = overslaan)."""
+    for engine in engines:
+        if engine is not None:
+            instrument_engine(engine)
+    app.add_middleware(
+        QueryAuditMiddleware,
+        fastapi_app=app,
+        repeat_threshold=repeat_threshold,
+        slow_query_ms=slow_query_ms,
+    )
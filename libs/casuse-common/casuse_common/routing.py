@@ -0,0 +1,23 @@
+# libs/casuse-common/casuse_common/routing.py
+"""Route-template van een ASGI-request, als label voor metrics en rapporten."""
+
+from starlette.routing import Match
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(app, scope) -> str:
+    """
+    Pad-template (bv. /api/admin/customers/{customer_id}) van de route die
+    `scope` zal afhandelen; UNMATCHED_ROUTE als er geen is.
+    """
+    partial = None
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            # pad klopt, methode niet (405)
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
@@ -1,4 +1,5 @@
 import os
+from casuse_common.metrics import instrument_app
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -17,6 +18,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus: GET /metrics (casuse_common.metrics)
+instrument_app(app, service=MODULE_NAME)
+
 @app.get("/healthz")
 def healthz():
     return {"status": "ok", "module": MODULE_NAME}
@@ -0,0 +1,72 @@
+import os
+import sys
+from logging.config import fileConfig
+
+from sqlalchemy import engine_from_config, pool
+from alembic import context
+
+# zorg dat de backend-map op de path staat, ook als alembic vanuit /app/alembic draait
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from database import Base  # noqa: E402
+from config import settings  # noqa: E402
+import models  # noqa: E402,F401  (tabellen registreren op Base.metadata)
+import portal_models  # noqa: E402,F401
+
+# this is the Alembic Config object, which provides
+# access to the values within the .ini file in use.
+config = context.config
+
+# Interpret the config file for Python logging.
+if config.config_file_name is not None:
+    # loggers van de app (bv. manage.py migrate) niet uitschakelen
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+# Objecten die enkel via SQL in de migraties bestaan (niet in de modellen);
+# autogenerate mag die niet als "te verwijderen" zien.
+SQL_ONLY_OBJECTS = {"ix_customers_search_trgm"}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return name not in SQL_ONLY_OBJECTS
+
+
+def run_migrations_offline() -> None:
+    url = settings.SQLALCHEMY_DATABASE_URI
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        include_object=include_object,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        {"sqlalchemy.url": settings.SQLALCHEMY_DATABASE_URI},
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,187 @@
+"""
+Baseline: het schema zoals on_startup het tot nu toe aanmaakte
+(Base.metadata.create_all + de pg_trgm/unaccent-DDL uit search.py).
+
+Bestaande databases die al via create_all opgebouwd zijn, worden overgenomen:
+tabellen die al bestaan worden overgeslagen, indexen en zoek-DDL zijn
+idempotent.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001_website_baseline"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# kopie van search.SEARCH_DOCUMENT_SQL op het moment van deze migratie
+SEARCH_DOCUMENT_SQL = (
+    "casuse_unaccent(lower("
+    "coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || "
+    "coalesce(company_name, '') || ' ' || "
+    "coalesce(tax_id, '') || ' ' || "
+    "coalesce(address_city, '')"
+    "))"
+)
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table("customers"):
+        op.create_table(
+            "customers",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("email", sa.String(255), nullable=False),
+            sa.Column("hashed_password", sa.String(255), nullable=True),
+            sa.Column("first_name", sa.String(100), nullable=False),
+            sa.Column("last_name", sa.String(100), nullable=False),
+            sa.Column("phone_number", sa.String(50), nullable=True),
+            sa.Column(
+                "customer_type",
+                sa.Enum("particulier", "bedrijf", name="customertype"),
+                nullable=False,
+            ),
+            sa.Column("description", sa.Text, nullable=True),
+            sa.Column("is_active", sa.Boolean, nullable=False),
+            sa.Column("is_admin", sa.Boolean, nullable=False),
+            sa.Column("company_name", sa.String(255), nullable=True),
+            sa.Column("tax_id", sa.String(50), nullable=True),
+            sa.Column("address_street", sa.String(255), nullable=True),
+            sa.Column("address_ext_number", sa.String(50), nullable=True),
+            sa.Column("address_int_number", sa.String(50), nullable=True),
+            sa.Column("address_neighborhood", sa.String(255), nullable=True),
+            sa.Column("address_city", sa.String(255), nullable=True),
+            sa.Column("address_state", sa.String(255), nullable=True),
+            sa.Column("address_postal_code", sa.String(20), nullable=True),
+            sa.Column("address_country", sa.String(100), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index("ix_customers_email", "customers", ["email"], unique=True)
+
+    if not _has_table("registration_tokens"):
+        op.create_table(
+            "registration_tokens",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column(
+                "customer_id",
+                postgresql.UUID(as_uuid=True),
+                sa.ForeignKey("customers.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("token", sa.String(255), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("used", sa.Boolean, nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        )
+        op.create_index(
+            "ix_registration_tokens_token", "registration_tokens", ["token"], unique=True
+        )
+    op.create_index(
+        "ix_registration_tokens_customer_created",
+        "registration_tokens",
+        ["customer_id", "created_at"],
+        if_not_exists=True,
+    )
+
+    if not _has_table("portal_statuses"):
+        op.create_table(
+            "portal_statuses",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("overall_status", sa.String, nullable=False),
+            sa.Column("progress_percent", sa.Integer, nullable=False),
+            sa.Column("last_updated", sa.DateTime, nullable=False),
+        )
+        op.create_index("ix_portal_statuses_id", "portal_statuses", ["id"])
+        op.create_index(
+            "ix_portal_statuses_customer_id", "portal_statuses", ["customer_id"]
+        )
+
+    if not _has_table("portal_status_steps"):
+        op.create_table(
+            "portal_status_steps",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column(
+                "status_id",
+                sa.Integer,
+                sa.ForeignKey("portal_statuses.id", ondelete="CASCADE"),
+                nullable=False,
+            ),
+            sa.Column("label", sa.String, nullable=False),
+            sa.Column("description", sa.String, nullable=True),
+            sa.Column("order_index", sa.Integer, nullable=False),
+            sa.Column("completed", sa.Boolean, nullable=False),
+            sa.Column("current", sa.Boolean, nullable=False),
+        )
+        op.create_index("ix_portal_status_steps_id", "portal_status_steps", ["id"])
+
+    if not _has_table("portal_documents"):
+        op.create_table(
+            "portal_documents",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("type", sa.String, nullable=False),
+            sa.Column("label", sa.String, nullable=False),
+            sa.Column("created_at", sa.DateTime, nullable=False),
+            sa.Column("download_url", sa.String, nullable=False),
+        )
+        op.create_index("ix_portal_documents_id", "portal_documents", ["id"])
+        op.create_index(
+            "ix_portal_documents_customer_id", "portal_documents", ["customer_id"]
+        )
+
+    if not _has_table("portal_representatives"):
+        op.create_table(
+            "portal_representatives",
+            sa.Column("id", sa.Integer, primary_key=True),
+            sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("full_name", sa.String, nullable=False),
+            sa.Column("email", sa.String, nullable=False),
+            sa.Column("phone", sa.String, nullable=True),
+        )
+        op.create_index(
+            "ix_portal_representatives_id", "portal_representatives", ["id"]
+        )
+        op.create_index(
+            "ix_portal_representatives_customer_id",
+            "portal_representatives",
+            ["customer_id"],
+            unique=True,
+        )
+
+    # zoekmachine (zie search.py)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION casuse_unaccent(text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+        """
+    )
+    op.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS ix_customers_search_trgm
+        ON customers USING gin (({SEARCH_DOCUMENT_SQL}) gin_trgm_ops)
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("portal_representatives")
+    op.drop_table("portal_documents")
+    op.drop_table("portal_status_steps")
+    op.drop_table("portal_statuses")
+    op.drop_table("registration_tokens")
+    op.drop_table("customers")
+    op.execute("DROP FUNCTION IF EXISTS casuse_unaccent(text)")
+    sa.Enum(name="customertype").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,151 @@
+"""
+Indexen voor de hete queries van de website-backend.
+
+- customers: lower(email) (login / get_current_user / registratie), en
+  (created_at, id) / (last_name, first_name, id) voor de keyset-sortering van
+  de admin-lijst, telkens ook partieel op `is_active IS true` (default-filter)
+- registration_tokens: openstaande tokens per klant
+  (mark_all_tokens_used_for_customers)
+- portal_documents: (customer_id, created_at) vervangt de index op enkel
+  customer_id (documenten per klant, nieuwste eerst)
+- portal_status_steps: (status_id, order_index); status_id had geen index
+
+Alles CONCURRENTLY, zodat de migratie op een draaiende database geen
+schrijf-locks neemt. Een mislukte eerdere poging laat een INVALID index
+achter; die wordt eerst verwijderd en opnieuw gebouwd. Bestaan er
+e-mailadressen die enkel in hoofdletters verschillen, dan stopt de migratie
+vóór de unieke index met de lijst van dubbels. Controle dat de queries de indexen gebruiken:
+`python -m benchmarks.check_index_usage`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002_performance_indexes"
+down_revision = "0001_website_baseline"
+branch_labels = None
+depends_on = None
+
+
+ACTIVE = sa.text("is_active IS true")
+
+INDEXES = [
+    # (naam, tabel, kolommen/expressies, extra kwargs)
+    ("ux_customers_email_lower", "customers", [sa.text("lower(email)")], {"unique": True}),
+    ("ix_customers_created_id", "customers", ["created_at", "id"], {}),
+    (
+        "ix_customers_active_created_id",
+        "customers",
+        ["created_at", "id"],
+        {"postgresql_where": ACTIVE},
+    ),
+    ("ix_customers_name_id", "customers", ["last_name", "first_name", "id"], {}),
+    (
+        "ix_customers_active_name_id",
+        "customers",
+        ["last_name", "first_name", "id"],
+        {"postgresql_where": ACTIVE},
+    ),
+    (
+        "ix_registration_tokens_customer_unused",
+        "registration_tokens",
+        ["customer_id"],
+        {"postgresql_where": sa.text("used IS false")},
+    ),
+    (
+        "ix_portal_documents_customer_created",
+        "portal_documents",
+        ["customer_id", "created_at"],
+        {},
+    ),
+    (
+        "ix_portal_status_steps_status_order",
+        "portal_status_steps",
+        ["status_id", "order_index"],
+        {},
+    ),
+]
+
+
+def _check_email_duplicates(bind):
+    # anders faalt de unieke index halverwege en blijft hij INVALID achter
+    duplicates = bind.execute(
+        sa.text(
+            """
+            SELECT lower(email) AS email, count(*) AS n
+            FROM customers
+            GROUP BY lower(email)
+            HAVING count(*) > 1
+            ORDER BY n DESC, email
+            LIMIT 10
+            """
+        )
+    ).all()
+    if duplicates:
+        listed = ", ".join(f"{email} ({n}x)" for email, n in duplicates)
+        raise RuntimeError(
+            "ux_customers_email_lower kan niet aangemaakt worden: e-mailadressen "
+            f"die enkel in hoofdletters verschillen: {listed}. Eerst de dubbele "
+            "klanten samenvoegen of hun e-mail aanpassen."
+        )
+
+
+def _drop_invalid_index(bind, name: str, table: str):
+    # een mislukte CREATE INDEX CONCURRENTLY laat een INVALID index achter,
+    # die if_not_exists anders zou overslaan
+    invalid = bind.execute(
+        sa.text(
+            """
+            SELECT 1
+            FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            WHERE c.relname = :name
+              AND c.relnamespace = current_schema()::regnamespace
+              AND NOT i.indisvalid
+            """
+        ),
+        {"name": name},
+    ).first()
+    if invalid:
+        op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def upgrade():
+    bind = op.get_bind()
+    _check_email_duplicates(bind)
+    # CREATE INDEX CONCURRENTLY mag niet binnen een transactie draaien
+    with op.get_context().autocommit_block():
+        for name, table, columns, kwargs in INDEXES:
+            _drop_invalid_index(bind, name, table)
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **kwargs,
+            )
+        # overbodig naast ix_portal_documents_customer_created
+        op.drop_index(
+            "ix_portal_documents_customer_id",
+            table_name="portal_documents",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_portal_documents_customer_id",
+            "portal_documents",
+            ["customer_id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        for name, table, _columns, _kwargs in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
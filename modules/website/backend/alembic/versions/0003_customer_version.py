@@ -0,0 +1,24 @@
+"""
+customers.version voor optimistic locking (ETag / If-Match op de admin-update).
+
+ADD COLUMN met een constante default is in Postgres 11+ enkel een
+catalogwijziging: geen table rewrite, ook niet op een grote customers-tabel.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003_customer_version"
+down_revision = "0002_performance_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "customers",
+        sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+
+
+def downgrade():
+    op.drop_column("customers", "version")
@@ -0,0 +1,41 @@
+"""
+email_outbox: transactional outbox voor registratie- en resetmails
+(zie email_worker.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_email_outbox"
+down_revision = "0003_customer_version"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("kind", sa.String(length=50), nullable=False),
+        sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("recipient", sa.String(length=255), nullable=False),
+        sa.Column("subject", sa.String(length=255), nullable=False),
+        sa.Column("body", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_email_outbox_pending",
+        "email_outbox",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_email_outbox_pending", table_name="email_outbox")
+    op.drop_table("email_outbox")
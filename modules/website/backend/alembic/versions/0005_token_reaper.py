@@ -0,0 +1,66 @@
+"""
+Opruimen van registratietokens (token_reaper.py): index op expires_at,
+archieftabel en statistiek per run.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0005_token_reaper"
+down_revision = "0004_email_outbox"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "registration_tokens_archive",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("customer_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("used", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("archived_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index(
+        "ix_registration_tokens_archive_customer_id",
+        "registration_tokens_archive",
+        ["customer_id"],
+    )
+    op.create_table(
+        "token_reaper_runs",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("purged", sa.Integer(), nullable=False),
+        sa.Column("archived", sa.Boolean(), nullable=False),
+        sa.Column("batches", sa.Integer(), nullable=False),
+        sa.Column("table_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("index_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("live_rows", sa.BigInteger(), nullable=False),
+    )
+    # registration_tokens kan groot zijn: zonder schrijf-lock aanmaken
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_registration_tokens_expires_at",
+            "registration_tokens",
+            ["expires_at"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_registration_tokens_expires_at",
+            table_name="registration_tokens",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+    op.drop_table("token_reaper_runs")
+    op.drop_index(
+        "ix_registration_tokens_archive_customer_id",
+        table_name="registration_tokens_archive",
+    )
+    op.drop_table("registration_tokens_archive")
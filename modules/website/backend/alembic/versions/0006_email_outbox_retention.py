@@ -0,0 +1,34 @@
+"""
+Retentie van email_outbox (email_worker.purge_old_emails): index op
+created_at van de afgehandelde (sent/failed) mails.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006_email_outbox_retention"
+down_revision = "0005_token_reaper"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # email_outbox werd nooit opgeruimd en kan groot zijn: zonder schrijf-lock
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_email_outbox_done_created",
+            "email_outbox",
+            ["created_at"],
+            postgresql_where=sa.text("status <> 'pending'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_email_outbox_done_created",
+            table_name="email_outbox",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -4,13 +4,32 @@ import uuid
 from datetime import datetime, timezone, timedelta
 from typing import Optional
 
-from fastapi import FastAPI, Depends, HTTPException, status, Query, Path
+from casuse_common.db_pool import pool_stats
+from casuse_common.metrics import instrument_app
+from casuse_common.query_audit import install_query_audit
+from fastapi import (
+    FastAPI,
+    Depends,
+    Header,
+    HTTPException,
+    status,
+    Query,
+    Path,
+    Request,
+    Response,
+)
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    ORJSONResponse,
+    StreamingResponse,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from config import settings
-from database import Base, engine
-from models import CustomerType, Customer
+from database import async_engine, engine, replica_engine
+from models import CustomerType
 from schemas import (
     RegistrationRequest,
     RegistrationResponse,
@@ -20,33 +39,50 @@ from schemas import (
     Token,
     LoginRequest,
     CustomersListResponse,
-    CustomerListItem,
     CustomerDetail,
+    Principal,
     CustomerUpdate,
     SimpleSuccessResponse,
     PasswordResetResponse,
+    ImportReport,
+    BulkCustomerActionRequest,
+    BulkCustomerActionResponse,
 )
 
-from security import verify_password, get_password_hash, create_access_token
-from deps import get_db, get_current_admin_user, get_current_user
+from security import access_token_cache, create_access_token
+from hashing import HashingUnavailable, password_hasher
+from cache import portal_overview_cache, principal_cache
+from deps import get_db, get_read_db, get_current_admin_user, get_current_user
 from crud import (
     get_customer_by_email,
-    create_customer,
-    create_registration_token,
+    register_customer,
+    issue_password_reset,
     get_registration_token,
-    mark_registration_token_used,
+    complete_password_setup,
+    store_rehashed_password,
     list_customers,
+    customer_list_item,
     get_customer,
     update_customer,
+    set_customer_active,
     soft_delete_customer,
-    mark_all_tokens_used_for_customer,
+    CustomerVersionConflict,
+    EmailAlreadyRegistered,
+    mark_all_tokens_used_for_customers,
+    list_token_reaper_runs,
 )
 
-from initial_data import init_db
+from pagination import InvalidCursor
+from bulk_import import ImportFormatError, detect_format, import_customers
+from customer_export import MEDIA_TYPES, export_customers
+from bulk_actions import BulkSelectionTooLarge, run_bulk_action
+from profiling import ProfilingMiddleware, request_profiler
+from ratelimit import RateLimitMiddleware, rate_limiter
+from replica import read_router
 
 import portal_models  # zorgt dat de nieuwe modellen geregistreerd worden
-import portal_crud
 import portal_schemas
+from portal_overview import etag_matches, get_overview_snapshot
 
 
 logger = logging.getLogger("website-backend")
@@ -60,24 +96,70 @@ origins = [
     if origin.strip()
 ]
 
+# Rate limiting op login/registratie/password-setup: binnen CORS, zodat ook
+# een 429 de CORS-headers krijgt en de frontend de fout kan lezen
+if settings.WEBSITE_RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,  # geen cookies nu, maar laten staan voor admin UI
     allow_methods=["*"],
     allow_headers=["*"],
+    # admin UI leest de ETag (GET/PUT klant) om mee te sturen als If-Match
+    expose_headers=["ETag"],
 )
 
+# Profiling op aanvraag (X-Profile: 1 van een admin); zonder trigger enkel
+# een blik op de headers
+if settings.WEBSITE_PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware, fastapi_app=app, profiler=request_profiler)
+
+if settings.WEBSITE_QUERY_AUDIT_ENABLED:
+    install_query_audit(
+        app,
+        engines=[async_engine, replica_engine],
+        repeat_threshold=settings.WEBSITE_QUERY_AUDIT_REPEAT_THRESHOLD,
+        slow_query_ms=settings.WEBSITE_QUERY_AUDIT_SLOW_MS,
+    )
+
+# Prometheus (GET /metrics): als laatste, dus buitenste middleware, zodat ook
+# 429's en CORS-preflights meetellen
+instrument_app(app, service="website-backend", engines=[async_engine, replica_engine])
+
 
 @app.on_event("startup")
-def on_startup():
-    Base.metadata.create_all(bind=engine)
-    init_db()
-    logger.info("Website backend started, DB initialized.")
+async def on_startup():
+    # Geen DB-I/O hier: schema en seed-data via `python manage.py setup`
+    # (één keer per deploy, docker compose: website-migrate), niet per worker.
+    password_hasher.start()
+    # replica-check loopt op de achtergrond; tot dan leest alles van de primary
+    read_router.start()
+    logger.info("Website backend started.")
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    password_hasher.shutdown()
+    await rate_limiter.backend.close()
+    await read_router.close()
+    await async_engine.dispose()
+
+
+@app.exception_handler(HashingUnavailable)
+async def hashing_unavailable_handler(request, exc: HashingUnavailable):
+    # snel weigeren i.p.v. requests te laten opstapelen achter bcrypt
+    logger.warning("Password hashing rejected: %s", exc)
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
 
 @app.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
 
 
@@ -88,11 +170,11 @@ def health():
     "/api/public/register",
     status_code=status.HTTP_201_CREATED,
 )
-def public_register(
+async def public_register(
     registration: RegistrationRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    existing = get_customer_by_email(db, registration.email)
+    existing = await get_customer_by_email(db, registration.email)
     if existing:
         # Frontend verwacht: { "detail": "Email already registered" }
         raise HTTPException(
@@ -100,22 +182,16 @@ def public_register(
             detail="Email already registered",
         )
 
-    # Klant + token aanmaken
-    customer = create_customer(db, registration=registration, hashed_password=None)
-    token = create_registration_token(db, customer)
-
-    # Password-setup link loggen (voor e-mail)
+    # Klant + token + password-setup mail (outbox) in één transactie; de mail
+    # zelf verstuurt email_worker.py, dus geen SMTP in deze request
     try:
-        base_url = settings.WEBSITE_PUBLIC_BASE_URL.rstrip("/")
-        url = f"{base_url}/password-setup?token={token.token}"
-        logger.info(
-            "Password setup email stub for %s: %s",
-            customer.email,
-            url,
+        customer, _token = await register_customer(db, registration)
+    except EmailAlreadyRegistered:
+        # gelijktijdige registratie met hetzelfde emailadres
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
         )
-    except Exception as e:
-        # Als hier iets misgaat, niet de hele registratie laten falen
-        logger.exception("Failed to build password setup URL: %s", e)
 
     return {
         "status": "ok",
@@ -131,11 +207,11 @@ def public_register(
     "/api/public/password-setup/{token}",
     response_model=PasswordSetupTokenInfo,
 )
-def password_setup_validate(
+async def password_setup_validate(
     token: str = Path(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    token_obj = get_registration_token(db, token)
+    token_obj = await get_registration_token(db, token)
     if (
         not token_obj
         or token_obj.used
@@ -179,10 +255,10 @@ def _validate_password_strength(password: str) -> None:
     "/api/public/password-setup/{token}",
     response_model=PasswordSetupResponse,
 )
-def password_setup_complete(
+async def password_setup_complete(
     token: str,
     req: PasswordSetupRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     if req.password != req.password_confirm:
         raise HTTPException(
@@ -190,7 +266,7 @@ def password_setup_complete(
             detail="Passwords do not match.",
         )
 
-    token_obj = get_registration_token(db, token)
+    token_obj = await get_registration_token(db, token)
     if (
         not token_obj
         or token_obj.used
@@ -209,10 +285,14 @@ def password_setup_complete(
         )
 
     _validate_password_strength(req.password)
-    customer.hashed_password = get_password_hash(req.password)
+    hashed_password = await password_hasher.hash(req.password)
 
-    db.add(customer)
-    mark_registration_token_used(db, token_obj)
+    # token opnieuw (atomair) controleren: het hashen duurt even
+    if not await complete_password_setup(db, token, hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid or expired token",
+        )
 
     return PasswordSetupResponse(
         status="ok",
@@ -224,18 +304,21 @@ def password_setup_complete(
 
 
 @app.post("/api/public/login", response_model=Token)
-def login(
+async def login(
     login_data: LoginRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    user = get_customer_by_email(db, login_data.email)
+    user = await get_customer_by_email(db, login_data.email)
     if not user or not user.hashed_password:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
         )
 
-    if not verify_password(login_data.password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(
+        login_data.password, user.hashed_password
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -247,6 +330,10 @@ def login(
             detail="User is inactive",
         )
 
+    if new_hash is not None:
+        # legacy schema of andere bcrypt cost: nu naar WEBSITE_BCRYPT_ROUNDS
+        await store_rehashed_password(db, user.id, user.hashed_password, new_hash)
+
     access_token_expires = timedelta(
         minutes=settings.WEBSITE_ACCESS_TOKEN_EXPIRE_MINUTES
     )
@@ -269,7 +356,7 @@ def login(
     "/api/admin/customers",
     response_model=CustomersListResponse,
 )
-def admin_list_customers(
+async def admin_list_customers(
     search: Optional[str] = Query(None),
     customer_type: Optional[CustomerType] = Query(None),
     include_inactive: bool = Query(False),
@@ -280,22 +367,26 @@ def admin_list_customers(
     ),
     sort_by: str = Query(
         "created_at",
-        regex="^(created_at|name)$",
+        regex="^(created_at|name|relevance)$",
     ),
     sort_dir: str = Query(
         "desc",
         regex="^(asc|desc)$",
     ),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(100, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
     _admin=Depends(get_current_admin_user),
 ):
     """
-    - search: naam/email/bedrijf
+    - search: naam/email/bedrijf/RFC/stad (accent-ongevoelig, ook prefix/typeahead)
     - customer_type: particulier/bedrijf
     - include_inactive (legacy): True -> status=all, False -> status=active
     - status: active/inactive/all (heeft voorrang op include_inactive)
-    - sort_by: created_at|name
+    - sort_by: created_at|name|relevance (relevance enkel zinvol met search)
     - sort_dir: asc|desc
+    - cursor: next_cursor/prev_cursor uit een vorige response
+    - limit: aantal rijen per pagina (max 500)
     """
     # backward compatible mapping van include_inactive -> status
     if status_param is None:
@@ -303,39 +394,193 @@ def admin_list_customers(
     else:
         effective_status = status_param
 
-    items, total = list_customers(
-        db,
-        search=search,
-        customer_type=customer_type,
-        skip=0,
-        limit=100,
-        status=effective_status,
-        sort_by=sort_by,
-        sort_dir=sort_dir,
+    try:
+        page = await list_customers(
+            db,
+            search=search,
+            customer_type=customer_type,
+            limit=limit,
+            status=effective_status,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            cursor=cursor,
+        )
+    except InvalidCursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+    # rijen zijn al precies de velden van CustomerListItem: geen from_orm/
+    # validatie per rij, rechtstreeks naar orjson (zelfde JSON als het model)
+    return ORJSONResponse(
+        {
+            "items": [customer_list_item(row) for row in page.items],
+            "total": page.total,
+            "total_exact": page.total_exact,
+            "next_cursor": page.next_cursor,
+            "prev_cursor": page.prev_cursor,
+        }
     )
 
-    return CustomersListResponse(
-        items=[CustomerListItem.from_orm(c) for c in items],
-        total=total,
+
+@app.post(
+    "/api/admin/customers/import",
+    response_model=ImportReport,
+)
+async def admin_import_customers(
+    request: Request,
+    import_format: Optional[str] = Query(
+        None,
+        alias="format",
+        regex="^(csv|ndjson)$",
+    ),
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Bulk import van klanten. De body is het bestand zelf (geen multipart):
+
+        curl -X POST --data-binary @klanten.csv -H "Content-Type: text/csv" \\
+             -H "Authorization: Bearer ..." .../api/admin/customers/import
+
+    - format: csv|ndjson; anders afgeleid uit de Content-Type
+    - CSV-kolommen = velden van de registratie (email, first_name, ...)
+    - per klant wordt een registratietoken aangemaakt, zoals bij registratie
+
+    Het rapport bevat per afgewezen rij het rijnummer en de reden.
+    """
+    try:
+        fmt = detect_format(import_format, request.headers.get("content-type"))
+        report = await import_customers(db, request.stream(), fmt)
+    except ImportFormatError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    logger.info(
+        "Customer import (%s): %s rows, %s imported, %s rejected in %.2fs",
+        report.format,
+        report.total_rows,
+        report.imported,
+        report.total_rows - report.imported,
+        report.duration_seconds,
     )
+    return report
+
+
+@app.get("/api/admin/customers/export")
+async def admin_export_customers(
+    export_format: str = Query(
+        "csv",
+        alias="format",
+        regex="^(csv|ndjson)$",
+    ),
+    search: Optional[str] = Query(None),
+    customer_type: Optional[CustomerType] = Query(None),
+    include_inactive: bool = Query(False),
+    status_param: Optional[str] = Query(
+        None,
+        alias="status",
+        regex="^(active|inactive|all)$",
+    ),
+    sort_by: str = Query(
+        "created_at",
+        regex="^(created_at|name|relevance)$",
+    ),
+    sort_dir: str = Query(
+        "desc",
+        regex="^(asc|desc)$",
+    ),
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Export van alle klanten die aan de filters voldoen (zelfde filters en
+    sortering als GET /api/admin/customers, zonder limiet). De response wordt
+    gestreamd vanuit een server-side cursor.
+
+    - format: csv (kolommen zoals de bulk import) of ndjson
+    """
+    if status_param is None:
+        effective_status = "all" if include_inactive else "active"
+    else:
+        effective_status = status_param
+
+    filename = f"customers-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        export_customers(
+            export_format,
+            search=search,
+            customer_type=customer_type,
+            status=effective_status,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+        ),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post(
+    "/api/admin/customers/bulk/{action}",
+    response_model=BulkCustomerActionResponse,
+)
+async def admin_bulk_customer_action(
+    payload: BulkCustomerActionRequest,
+    action: str = Path(..., regex="^(deactivate|activate|delete|reset_password)$"),
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Deactivate / activate / delete / reset_password voor veel klanten tegelijk,
+    in één transactie:
+
+        {"customer_ids": ["...", "..."]}
+        {"filter": {"status": "inactive", "search": "...", "customer_type": "..."}}
+
+    Per id: updated, unchanged (stond al zo), not_found of inactive
+    (reset_password voor een inactieve klant).
+    """
+    try:
+        return await run_bulk_action(
+            db,
+            action,
+            payload,
+            include_tokens=settings.WEBSITE_ENV.lower() in {"local", "dev", "development"},
+        )
+    except BulkSelectionTooLarge as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _customer_etag(version: int) -> str:
+    return f'"v{version}"'
+
+
+def _if_match_version(if_match: str) -> Optional[int]:
+    """Versie uit een If-Match-header (`"v3"`); None als er geen bruikbare ETag in staat."""
+    for candidate in if_match.split(","):
+        match = re.fullmatch(r'"v(\d+)"', candidate.strip())
+        if match:
+            return int(match.group(1))
+    return None
 
 
 @app.get(
     "/api/admin/customers/{customer_id}",
     response_model=CustomerDetail,
 )
-def admin_get_customer(
+async def admin_get_customer(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
+    customer = await get_customer(db, customer_id)
     if not customer:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found",
         )
 
+    response.headers["ETag"] = _customer_etag(customer.version)
     return CustomerDetail.from_orm(customer)
 
 
@@ -343,28 +588,19 @@ def admin_get_customer(
     "/api/admin/customers/{customer_id}",
     response_model=CustomerDetail,
 )
-def admin_update_customer(
+async def admin_update_customer(
     customer_id: uuid.UUID,
     payload: CustomerUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
-    if not customer or not customer.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Customer not found",
-        )
-
-    # email-uniekheid indien aangepast
-    if payload.email is not None and payload.email.lower() != customer.email.lower():
-        existing = get_customer_by_email(db, payload.email)
-        if existing and existing.id != customer.id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Another customer with this email already exists",
-            )
-
+    """
+    Partiële update. Met `If-Match: <ETag van GET /api/admin/customers/{id}>`
+    faalt de update met 412 als de klant intussen gewijzigd werd (i.p.v.
+    last-writer-wins). Zonder If-Match: onvoorwaardelijke update.
+    """
     # extra business rule: voor bedrijven company_name + tax_id verplicht
     if payload.customer_type == CustomerType.bedrijf:
         if not payload.company_name or not payload.tax_id:
@@ -373,7 +609,32 @@ def admin_update_customer(
                 detail="company_name and tax_id are required for bedrijf customers",
             )
 
-    updated = update_customer(db, customer, payload)
+    expected_version = None
+    if if_match is not None and if_match.strip() != "*":
+        expected_version = _if_match_version(if_match)
+        if expected_version is None:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="If-Match does not match a customer version",
+            )
+
+    try:
+        updated = await update_customer(db, customer_id, payload, expected_version)
+    except EmailAlreadyRegistered as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except CustomerVersionConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Customer was modified by someone else; reload and try again",
+            headers={"ETag": _customer_etag(e.current_version)},
+        )
+    if updated is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Customer not found",
+        )
+
+    response.headers["ETag"] = _customer_etag(updated.version)
     return CustomerDetail.from_orm(updated)
 
 
@@ -381,46 +642,43 @@ def admin_update_customer(
     "/api/admin/customers/{customer_id}",
     response_model=SimpleSuccessResponse,
 )
-def admin_soft_delete_customer(
+async def admin_soft_delete_customer(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
-    if not customer:
+    if await soft_delete_customer(db, customer_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found",
         )
-
-    soft_delete_customer(db, customer)
     return SimpleSuccessResponse(success=True)
 
 
 # --- NIEUW: expliciet deactiveren/activeren ---
+# Eén UPDATE met version+1 (set_customer_active), geen ORM-flush: een
+# gelijktijdige wijziging van de klant geeft dan geen StaleDataError (500).
 
 
 @app.post(
     "/api/admin/customers/{customer_id}/deactivate",
     response_model=SimpleSuccessResponse,
 )
-def admin_deactivate_customer(
+async def admin_deactivate_customer(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
-    if not customer:
+    changed = await set_customer_active(db, customer_id, active=False)
+    if changed is None:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    if customer.is_active:
-        customer.is_active = False
-        customer.deactivated_at = datetime.now(timezone.utc)
-        # alle openstaande tokens ongeldig maken
-        mark_all_tokens_used_for_customer(db, customer.id)
-        db.add(customer)
-        db.commit()
-        logger.info("Customer %s deactivated", customer.id)
+    if changed:
+        # alle openstaande tokens ongeldig maken, in dezelfde transactie
+        await mark_all_tokens_used_for_customers(db, [customer_id])
+        await db.commit()
+        principal_cache.invalidate(str(customer_id))
+        logger.info("Customer %s deactivated", customer_id)
     return SimpleSuccessResponse(success=True)
 
 
@@ -428,21 +686,19 @@ def admin_deactivate_customer(
     "/api/admin/customers/{customer_id}/activate",
     response_model=SimpleSuccessResponse,
 )
-def admin_activate_customer(
+async def admin_activate_customer(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
-    if not customer:
+    changed = await set_customer_active(db, customer_id, active=True)
+    if changed is None:
         raise HTTPException(status_code=404, detail="Customer not found")
 
-    if not customer.is_active:
-        customer.is_active = True
-        customer.deactivated_at = None
-        db.add(customer)
-        db.commit()
-        logger.info("Customer %s re-activated", customer.id)
+    if changed:
+        await db.commit()
+        principal_cache.invalidate(str(customer_id))
+        logger.info("Customer %s re-activated", customer_id)
     return SimpleSuccessResponse(success=True)
 
 
@@ -450,43 +706,178 @@ def admin_activate_customer(
     "/api/admin/customers/{customer_id}/reset_password",
     response_model=PasswordResetResponse,
 )
-def admin_reset_password(
+async def admin_reset_password(
     customer_id: uuid.UUID,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     _admin=Depends(get_current_admin_user),
 ):
-    customer = get_customer(db, customer_id)
+    customer = await get_customer(db, customer_id)
     if not customer or not customer.is_active:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Customer not found or inactive",
         )
 
-    # alle oude, ongebruikte tokens ongeldig maken
-    mark_all_tokens_used_for_customer(db, customer.id)
-
-    # nieuwe registration_token maken
-    token = create_registration_token(db, customer)
-
-    # password-setup link loggen (zelfde stijl als bij registratie)
-    try:
-        base_url = settings.WEBSITE_PUBLIC_BASE_URL.rstrip("/")
-        url = f"{base_url}/password-setup?token={token.token}"
-        logger.info(
-            "Password reset email stub for %s: %s",
-            customer.email,
-            url,
-        )
-    except Exception as e:
-        logger.exception("Failed to build password reset URL: %s", e)
+    # oude tokens ongeldig, nieuw token en reset-mail (outbox) in één commit
+    token = await issue_password_reset(db, customer.id, customer.email)
 
     resp = PasswordResetResponse(success=True)
     if settings.WEBSITE_ENV.lower() in {"local", "dev", "development"}:
-        resp.token = token.token
+        resp.token = token
 
     return resp
 
 
+@app.get("/api/admin/metrics/password-hashing")
+async def admin_password_hashing_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Wachttijd in de queue en hash-tijd (histogrammen in seconden), plus
+    afgewezen/getimede-out taken, om de hashing pool te dimensioneren.
+    """
+    return password_hasher.stats()
+
+
+@app.get("/api/admin/metrics/principal-cache")
+async def admin_principal_cache_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Hit rate van de principal cache in get_current_user (deze worker).
+    Elke hit is één bespaarde klant-query.
+    """
+    stats = principal_cache.stats()
+    stats["db_queries_saved"] = stats["hits"]
+    return stats
+
+
+@app.get("/api/admin/metrics/jwt-cache")
+async def admin_jwt_cache_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Hit rate van de cache van geverifieerde JWT-claims (deze worker). Elke
+    hit is een bespaarde handtekeningcontrole + JSON-parse.
+    """
+    return access_token_cache.stats()
+
+
+@app.get("/api/admin/metrics/portal-overview-cache")
+async def admin_portal_overview_cache_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Hit rate van de portaaloverzicht-snapshots (deze worker). Een hit kost
+    geen query; een miss precies één.
+    """
+    stats = portal_overview_cache.stats()
+    stats["db_queries_saved"] = stats["hits"]
+    return stats
+
+
+@app.get("/api/admin/metrics/rate-limit")
+async def admin_rate_limit_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Toegelaten en geweigerde (429) requests per regel (deze worker). Een
+    geweigerde request heeft geen DB-query en geen bcrypt gekost.
+    """
+    return {
+        "enabled": settings.WEBSITE_RATE_LIMIT_ENABLED,
+        **rate_limiter.stats(),
+    }
+
+
+@app.get("/api/admin/metrics/db-pool")
+async def admin_db_pool_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Connection pools van deze worker: uitgeleende verbindingen, overflow en
+    wachttijd bij checkout. Timeouts > 0: pool of Postgres te klein.
+    """
+    return {
+        "pgbouncer": settings.WEBSITE_DB_PGBOUNCER,
+        "async": pool_stats(async_engine),
+        "sync": pool_stats(engine),
+    }
+
+
+@app.get("/api/admin/metrics/db-replica")
+async def admin_db_replica_metrics(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Read replica (deze worker): bereikbaar, replicatievertraging, en hoeveel
+    read-only requests van de replica of (met de reden) van de primary lazen.
+    """
+    return {
+        **read_router.stats(),
+        "pool": pool_stats(replica_engine) if replica_engine is not None else None,
+    }
+
+
+@app.get("/api/admin/profiles")
+async def admin_list_profiles(
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Opgeslagen request-profielen van deze container (nieuwste eerst). Een
+    profiel maken: de request herhalen met header X-Profile: 1.
+    """
+    return {
+        "enabled": settings.WEBSITE_PROFILING_ENABLED,
+        **request_profiler.stats(),
+        "items": request_profiler.store.list(),
+    }
+
+
+@app.get("/api/admin/profiles/{name}")
+async def admin_get_profile(
+    name: str,
+    _admin=Depends(get_current_admin_user),
+):
+    """Speedscope-bestand (te openen op https://www.speedscope.app)."""
+    path = request_profiler.store.path_for(name)
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found",
+        )
+    return FileResponse(path, media_type="application/json", filename=name)
+
+
+@app.get("/api/admin/metrics/token-reaper")
+async def admin_token_reaper_metrics(
+    limit: int = Query(48, ge=1, le=1000),
+    db: AsyncSession = Depends(get_db),
+    _admin=Depends(get_current_admin_user),
+):
+    """
+    Runs van token_reaper.py (nieuwste eerst): opgeruimde tokens en de
+    grootte van registration_tokens (tabel/indexen/rijen) na elke run.
+    """
+    runs = await list_token_reaper_runs(db, limit)
+    return {
+        "purged_total": sum(run.purged for run in runs),
+        "runs": [
+            {
+                "started_at": run.started_at,
+                "finished_at": run.finished_at,
+                "purged": run.purged,
+                "archived": run.archived,
+                "batches": run.batches,
+                "table_bytes": run.table_bytes,
+                "index_bytes": run.index_bytes,
+                "live_rows": run.live_rows,
+            }
+            for run in runs
+        ],
+    }
+
+
 # =========================
 #  CUSTOMER PORTAL ENDPOINTS
 # =========================
@@ -496,91 +887,23 @@ def admin_reset_password(
     "/api/customer/portal/overview",
     response_model=portal_schemas.PortalOverviewResponse,
 )
-def get_customer_portal_overview(
-    current_customer: Customer = Depends(get_current_user),
-    db: Session = Depends(get_db),
+async def get_customer_portal_overview(
+    current_customer: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Geeft status, documenten en vertegenwoordiger terug voor de ingelogde klant.
-    """
-
-    from datetime import datetime
-
-    # Status
-    status_db = portal_crud.get_portal_status_for_customer(db, current_customer.id)
-
-    if status_db:
-        steps_db = portal_crud.get_portal_steps_for_status(db, status_db.id)
-        current_step_id = None
-        for step in steps_db:
-            if step.current:
-                current_step_id = step.id
-                break
-
-        status = portal_schemas.PortalStatus(
-            overallStatus=status_db.overall_status
-            if status_db.overall_status in ["NOT_STARTED", "IN_PROGRESS", "ON_HOLD", "COMPLETED"]
-            else "IN_PROGRESS",
-            progressPercent=max(0, min(100, status_db.progress_percent)),
-            currentStepId=current_step_id,
-            steps=[
-                portal_schemas.StatusStep(
-                    id=step.id,
-                    label=step.label,
-                    description=step.description,
-                    completed=step.completed,
-                    current=step.current,
-                )
-                for step in steps_db
-            ],
-            lastUpdated=status_db.last_updated,
-        )
-    else:
-        # Default als er nog geen statusrecord is
-        status = portal_schemas.PortalStatus(
-            overallStatus="NOT_STARTED",
-            progressPercent=0,
-            currentStepId=None,
-            steps=[],
-            lastUpdated=datetime.utcnow(),
-        )
-
-    # Documenten
-    documents_db = portal_crud.get_portal_documents_for_customer(
-        db, current_customer.id
-    )
-
-    documents = [
-        portal_schemas.PortalDocument(
-            id=doc.id,
-            type=doc.type if doc.type in ["OFFER", "ORDER", "INVOICE", "OTHER"] else "OTHER",
-            label=doc.label,
-            createdAt=doc.created_at,
-            downloadUrl=doc.download_url,
-        )
-        for doc in documents_db
-    ]
 
-    # Vertegenwoordiger
-    rep_db = portal_crud.get_portal_representative_for_customer(
-        db, current_customer.id
-    )
-
-    representative = (
-        portal_schemas.Representative(
-            id=rep_db.id,
-            fullName=rep_db.full_name,
-            email=rep_db.email,
-            phone=rep_db.phone,
-        )
-        if rep_db
-        else None
-    )
-
-    return portal_schemas.PortalOverviewResponse(
-        status=status,
-        documents=documents,
-        representative=representative,
+    Komt uit een per-klant snapshot (zie portal_overview.py) met een sterke
+    ETag; met een passende If-None-Match volgt 304 zonder body.
+    """
+    snapshot = await get_overview_snapshot(db, current_customer.id)
+    headers = {"ETag": snapshot.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=snapshot.body, media_type="application/json", headers=headers
     )
 
 
@@ -588,9 +911,9 @@ def get_customer_portal_overview(
     "/api/customer/portal/ai-chat",
     response_model=portal_schemas.ChatResponse,
 )
-def customer_portal_ai_chat(
+async def customer_portal_ai_chat(
     payload: portal_schemas.ChatRequestPayload,
-    current_customer: Customer = Depends(get_current_user),
+    current_customer: Principal = Depends(get_current_user),
 ):
     """
     Eenvoudige AI-chat placeholder.
@@ -0,0 +1,156 @@
+# modules/website/backend/benchmarks/bench_customer_search.py
+"""
+Benchmark voor de klant-zoekmachine (crud.list_customers(search=...)).
+
+Vult een (aparte!) database met synthetische klanten en meet de latency van
+typische zoekopdrachten uit de admin-UI: typeahead-prefixen, volledige namen
+met en zonder accenten, email-fragmenten, RFC/tax_id en steden.
+
+Gebruik (vanuit modules/website/backend, met WEBSITE_DB_* naar een bench-DB):
+
+    python -m benchmarks.bench_customer_search --rows 1000000
+    python -m benchmarks.bench_customer_search --skip-seed --iterations 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from database import AsyncSessionLocal, async_engine, engine  # noqa: E402
+from crud import list_customers  # noqa: E402
+from migrations import upgrade_to_head  # noqa: E402
+
+
+SEED_SQL = """
+INSERT INTO customers (
+    id, email, hashed_password, first_name, last_name, phone_number,
+    customer_type, description, is_active, is_admin, company_name, tax_id,
+    address_street, address_ext_number, address_neighborhood, address_city,
+    address_state, address_postal_code, address_country, created_at, updated_at
+)
+SELECT
+    gen_random_uuid(),
+    'klant' || g || '@example' || (g % 97) || '.mx',
+    NULL,
+    (ARRAY['Carlos','Sofía','Miguel','Luis','Ana','José','María','Jesús',
+           'Guadalupe','Andrés','Fernanda','Íñigo'])[1 + g % 12],
+    (ARRAY['Ramírez','López','Hernández','García','Martínez','González',
+           'Pérez','Sánchez','Núñez','Gómez','Díaz','Ortiz','Ruiz'])[1 + (g / 12) % 13]
+        || ' ' || substr(md5(g::text), 1, 6),
+    '+52 33 ' || lpad((g % 10000)::text, 4, '0'),
+    CASE WHEN g % 3 = 0 THEN 'bedrijf' ELSE 'particulier' END::customertype,
+    'Synthetische klant ' || g,
+    g % 10 <> 0,
+    false,
+    CASE WHEN g % 3 = 0
+         THEN (ARRAY['Ventanas','Aluminios','Puertas','Vidrios','Cancelería'])[1 + g % 5]
+              || ' ' || upper(substr(md5((g * 7)::text), 1, 5)) || ' S.A. de C.V.'
+    END,
+    CASE WHEN g % 3 = 0 THEN upper(substr(md5((g * 13)::text), 1, 12)) END,
+    'Calle ' || (g % 500),
+    (g % 9999)::text,
+    'Colonia ' || (g % 300),
+    (ARRAY['Guadalajara','Ciudad de México','Monterrey','Puebla','Querétaro',
+           'Mérida','León','Zapopan','Tijuana','Cancún'])[1 + g % 10],
+    'Jalisco',
+    lpad((g % 99999)::text, 5, '0'),
+    'Mexico',
+    now() - make_interval(secs => g),
+    now()
+FROM generate_series(:start, :stop) AS g
+"""
+
+QUERIES = [
+    # typeahead: oplopende prefixen zoals de admin-UI ze per toetsaanslag stuurt
+    "ram",
+    "rami",
+    "ramir",
+    # accent-ongevoelig in beide richtingen
+    "ramirez",
+    "Ramírez",
+    "nunez",
+    # email-fragment, bedrijfsnaam, stad, tax_id-fragment
+    "klant4242",
+    "aluminios",
+    "queretaro",
+    "A1B2",
+    # tikfout (fuzzy via word_similarity)
+    "hernandes",
+]
+
+
+def seed(rows: int, batch: int) -> None:
+    upgrade_to_head()
+    with engine.begin() as conn:
+        existing = conn.execute(text("SELECT count(*) FROM customers")).scalar_one()
+    start = existing + 1
+    print(f"Seeding {rows - existing} customers (existing: {existing})...")
+    t0 = time.perf_counter()
+    while start <= rows:
+        stop = min(start + batch - 1, rows)
+        with engine.begin() as conn:
+            conn.execute(text(SEED_SQL), {"start": start, "stop": stop})
+        start = stop + 1
+    with engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE customers")
+    print(f"Seeded in {time.perf_counter() - t0:.1f}s")
+
+
+async def run(iterations: int, sort_by: str, limit: int) -> None:
+    with engine.connect() as conn:
+        total = conn.execute(text("SELECT count(*) FROM customers")).scalar_one()
+    print(f"\n{total} customers, sort_by={sort_by}, limit={limit}, {iterations} runs/query")
+    print(f"{'query':<14}{'hits':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+
+    all_timings = []
+    for term in QUERIES:
+        timings = []
+        hits = 0
+        for _ in range(iterations):
+            async with AsyncSessionLocal() as db:
+                t0 = time.perf_counter()
+                page = await list_customers(
+                    db, search=term, status="all", sort_by=sort_by, limit=limit
+                )
+                timings.append((time.perf_counter() - t0) * 1000)
+                hits = page.total
+        timings.sort()
+        all_timings.extend(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1] if len(timings) >= 20 else timings[-1]
+        print(
+            f"{term:<14}{hits:>10}{statistics.median(timings):>10.1f}"
+            f"{p95:>10.1f}{timings[-1]:>10.1f}"
+        )
+
+    all_timings.sort()
+    print(
+        f"\noverall p50={statistics.median(all_timings):.1f}ms "
+        f"p95={all_timings[int(len(all_timings) * 0.95) - 1]:.1f}ms"
+    )
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=100_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=25)
+    parser.add_argument("--sort-by", default="relevance", choices=["relevance", "created_at", "name"])
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        seed(args.rows, args.batch)
+    asyncio.run(run(args.iterations, args.sort_by, args.limit))
+
+
+if __name__ == "__main__":
+    main()
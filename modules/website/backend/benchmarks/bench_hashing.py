@@ -0,0 +1,97 @@
+# modules/website/backend/benchmarks/bench_hashing.py
+"""
+Benchmark van de login-kost per hash-schema: logins/s per core.
+
+Per schema wordt een wachtwoord-verify gemeten op één core, en daarna met
+--processes parallelle processen (zoals de hash-pool in hashing.py) om te
+zien of de doorvoer lineair schaalt. Gemeten schema's:
+
+- bcrypt met WEBSITE_BCRYPT_ROUNDS (nieuwe hashes)
+- pbkdf2_sha256 met de passlib-default (seeds van de core-backend)
+- rehash: eerste login met een legacy hash (verify + nieuwe bcrypt-hash),
+  eenmalig per klant
+
+Gebruik (vanuit modules/website/backend):
+
+    python -m benchmarks.bench_hashing
+    WEBSITE_BCRYPT_ROUNDS=11 python -m benchmarks.bench_hashing --processes 4
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from passlib.hash import pbkdf2_sha256  # noqa: E402
+
+from config import settings  # noqa: E402
+from security import pwd_context, verify_and_update_password  # noqa: E402
+
+
+PASSWORD = "Benchmark-Wachtwoord-123"
+
+
+def scheme_hashes() -> dict:
+    return {
+        f"bcrypt (rounds={settings.WEBSITE_BCRYPT_ROUNDS})": pwd_context.hash(PASSWORD),
+        f"pbkdf2_sha256 (rounds={pbkdf2_sha256.default_rounds})": pbkdf2_sha256.hash(PASSWORD),
+    }
+
+
+def verify_loop(hashed: str, seconds: float, rehash: bool = False) -> int:
+    """Aantal geslaagde logins binnen `seconds` op deze core."""
+    done = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        if rehash:
+            ok, _new_hash = verify_and_update_password(PASSWORD, hashed)
+        else:
+            ok = pwd_context.verify(PASSWORD, hashed)
+        assert ok
+        done += 1
+    return done
+
+
+def measure(hashed: str, seconds: float, processes: int, rehash: bool = False):
+    single = verify_loop(hashed, seconds, rehash) / seconds
+    with ProcessPoolExecutor(
+        max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        # warm-up: processen starten en imports laden buiten de meting
+        list(pool.map(verify_loop, [hashed] * processes, [0.01] * processes))
+        started = time.perf_counter()
+        counts = list(pool.map(
+            verify_loop, [hashed] * processes, [seconds] * processes, [rehash] * processes
+        ))
+        elapsed = time.perf_counter() - started
+    return single, sum(counts) / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--seconds", type=float, default=3.0, help="meetduur per schema")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    hashes = scheme_hashes()
+    legacy = next(h for name, h in hashes.items() if name.startswith("pbkdf2"))
+    cases = [(name, hashed, False) for name, hashed in hashes.items()]
+    cases.append(("rehash pbkdf2_sha256 -> bcrypt", legacy, True))
+
+    print(f"{'schema':<38} {'ms/login':>9} {'logins/s/core':>14} "
+          f"{f'logins/s ({args.processes} proc)':>22} {'per core':>9}")
+    for name, hashed, rehash in cases:
+        single, parallel = measure(hashed, args.seconds, args.processes, rehash)
+        print(
+            f"{name:<38} {1000 / single:9.1f} {single:14.1f} "
+            f"{parallel:22.1f} {parallel / args.processes:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
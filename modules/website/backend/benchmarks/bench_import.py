@@ -0,0 +1,112 @@
+# modules/website/backend/benchmarks/bench_import.py
+"""
+Benchmark voor de bulk import (bulk_import.import_customers).
+
+Genereert een synthetische dealerlijst (CSV of NDJSON, met quotes, komma's
+en newlines in velden), streamt die in chunks van 64 KiB door de import
+tegen een (aparte!) database en rapporteert rijen/s. Elke run gebruikt
+nieuwe emails, dus de klanten blijven in de database staan.
+
+Gebruik (vanuit modules/website/backend, met WEBSITE_DB_* naar een bench-DB):
+
+    python -m benchmarks.bench_import --rows 50000 --format csv
+    python -m benchmarks.bench_import --rows 50000 --format ndjson --batch-size 2000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import AsyncIterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import settings  # noqa: E402
+from database import AsyncSessionLocal, async_engine  # noqa: E402
+from bulk_import import import_customers  # noqa: E402
+
+
+COLUMNS = [
+    "email", "first_name", "last_name", "phone_number", "customer_type",
+    "description", "company_name", "tax_id", "address_street",
+    "address_ext_number", "address_int_number", "address_neighborhood",
+    "address_city", "address_state", "address_postal_code", "address_country",
+]
+
+DOMAINS = ["gmail.com", "hotmail.com", "outlook.com", "dealer-jalisco.mx", "yahoo.com.mx"]
+
+
+def make_rows(count: int):
+    tag = uuid.uuid4().hex[:8]
+    for i in range(count):
+        company = i % 3 == 0
+        yield {
+            "email": f"bench.{tag}.{i}@{DOMAINS[i % len(DOMAINS)]}",
+            "first_name": "José",
+            "last_name": f'Hernández "{i}"',
+            "phone_number": "+52 33 1234 5678",
+            "customer_type": "bedrijf" if company else "particulier",
+            "description": "Importado de la lista del distribuidor,\nsegunda línea",
+            "company_name": f"Aluminios {i}, S.A. de C.V." if company else "",
+            "tax_id": f"ALU{i:09d}" if company else "",
+            "address_street": "Av. Vallarta",
+            "address_ext_number": str(i % 9000 + 1),
+            "address_int_number": "",
+            "address_neighborhood": "Centro",
+            "address_city": "Guadalajara",
+            "address_state": "Jalisco",
+            "address_postal_code": "44100",
+            "address_country": "Mexico",
+        }
+
+
+def build_payload(count: int, fmt: str) -> bytes:
+    out = io.StringIO()
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=COLUMNS)
+        writer.writeheader()
+        writer.writerows(make_rows(count))
+    else:
+        for row in make_rows(count):
+            out.write(json.dumps(row, ensure_ascii=False) + "\n")
+    return out.getvalue().encode()
+
+
+async def _chunks(payload: bytes, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    for start in range(0, len(payload), size):
+        yield payload[start:start + size]
+
+
+async def run(args: argparse.Namespace) -> None:
+    settings.WEBSITE_IMPORT_BATCH_SIZE = args.batch_size
+    payload = build_payload(args.rows, args.format)
+    print(f"{args.rows} rows, {len(payload) / 1e6:.1f} MB {args.format}, batch size {args.batch_size}")
+
+    async with AsyncSessionLocal() as db:
+        t0 = time.perf_counter()
+        report = await import_customers(db, _chunks(payload), args.format)
+        elapsed = time.perf_counter() - t0
+    await async_engine.dispose()
+
+    print(
+        f"imported={report.imported} invalid={report.invalid} "
+        f"duplicates={report.duplicates_in_file} existing={report.already_registered}"
+    )
+    print(f"{elapsed:.2f}s => {report.total_rows / elapsed:,.0f} rows/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    parser.add_argument("--batch-size", type=int, default=settings.WEBSITE_IMPORT_BATCH_SIZE)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
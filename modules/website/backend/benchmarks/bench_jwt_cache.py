@@ -0,0 +1,106 @@
+# modules/website/backend/benchmarks/bench_jwt_cache.py
+"""
+Microbenchmark van de JWT-verificatie per request, met en zonder de cache van
+geverifieerde claims (security.decode_access_token / casuse_common.jwt_cache).
+
+Simuleert het portaal: --users ingelogde klanten die elk om de
+--poll-seconds een request doen, elk met hun eigen access token, gedurende
+--polls pollrondes (in willekeurige volgorde per ronde). Zo zit in de
+cache-meting ook de eerste, ongecachte verificatie per token.
+
+Rapporteert per variant µs per request, de hit rate, en de CPU die de
+verificatie kost bij dat request-tempo (ms CPU per seconde = % van één core).
+Met --cache-size kleiner dan --users ziet men wat een te kleine
+WEBSITE_JWT_CACHE_SIZE kost: LRU bij rondes in willekeurige volgorde levert
+nauwelijks hits op.
+
+Gebruik (vanuit modules/website/backend):
+
+    python -m benchmarks.bench_jwt_cache
+    python -m benchmarks.bench_jwt_cache --users 20000 --poll-seconds 10 --cache-size 5000
+"""
+
+import argparse
+import random
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from casuse_common.jwt_cache import VerifiedClaimsCache  # noqa: E402
+
+from config import settings  # noqa: E402
+from security import _verify_access_token, create_access_token  # noqa: E402
+
+
+def make_tokens(users: int):
+    return [
+        create_access_token(
+            data={
+                "sub": f"klant{i}@example.mx",
+                "customer_id": str(uuid.uuid4()),
+                "is_admin": False,
+            }
+        )
+        for i in range(users)
+    ]
+
+
+def request_stream(tokens, polls: int, seed: int = 42):
+    rng = random.Random(seed)
+    stream = []
+    for _ in range(polls):
+        ronde = list(tokens)
+        rng.shuffle(ronde)
+        stream.extend(ronde)
+    return stream
+
+
+def run(decode, stream) -> float:
+    started = time.perf_counter()
+    for token in stream:
+        decode(token)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=5000, help="actieve portaalklanten")
+    parser.add_argument("--poll-seconds", type=float, default=15.0, help="pollinterval per klant")
+    parser.add_argument("--polls", type=int, default=20, help="pollrondes in de meting")
+    parser.add_argument("--cache-size", type=int, default=settings.WEBSITE_JWT_CACHE_SIZE)
+    args = parser.parse_args()
+
+    tokens = make_tokens(args.users)
+    stream = request_stream(tokens, args.polls)
+    rate = args.users / args.poll_seconds
+    print(
+        f"{args.users} klanten, poll om de {args.poll_seconds:g}s = {rate:.0f} req/s; "
+        f"{len(stream)} requests ({args.polls} rondes), {settings.WEBSITE_JWT_ALGORITHM}"
+    )
+
+    cache = VerifiedClaimsCache(
+        _verify_access_token,
+        maxsize=args.cache_size,
+        max_ttl=settings.WEBSITE_JWT_CACHE_TTL_SECONDS,
+    )
+    variants = [
+        ("zonder cache", _verify_access_token, None),
+        (f"met cache (size={args.cache_size})", cache.decode, cache),
+    ]
+    print(f"{'variant':<28} {'µs/request':>11} {'hit rate':>9} {'CPU ms/s':>9} {'% core':>7}")
+    for name, decode, stats_source in variants:
+        elapsed = run(decode, stream)
+        per_request_us = elapsed / len(stream) * 1e6
+        cpu_ms_per_s = rate * per_request_us / 1000
+        hit_rate = stats_source.stats()["hit_rate"] if stats_source else 0.0
+        print(
+            f"{name:<28} {per_request_us:11.1f} {hit_rate:9.2%} "
+            f"{cpu_ms_per_s:9.1f} {cpu_ms_per_s / 10:6.1f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# modules/website/backend/benchmarks/bench_list_serialization.py
+"""
+Benchmark van de admin-klantenlijst (/api/admin/customers): ophalen en
+serialiseren per pagina van --sizes rijen, oud pad tegenover lean pad.
+
+- oud:  select(Customer) (alle kolommen, incl. description/hashed_password)
+        -> CustomerListItem.from_orm per rij -> CustomersListResponse
+        -> jsonable_encoder + json.dumps (wat FastAPI met response_model doet)
+- lean: select van enkel de lijstkolommen (crud.customer_list_columns)
+        -> dict per rij -> ORJSONResponse
+
+Gemeten wordt apart de query + het opbouwen van de rijen ("fetch") en het
+omzetten naar response-bytes ("serialize"), als mediaan over --iterations.
+Beide paden moeten dezelfde JSON opleveren; dat wordt eerst gecontroleerd.
+
+Gebruik (vanuit modules/website/backend, tegen een DB met genoeg klanten):
+
+    python -m benchmarks.bench_list_serialization
+    python -m benchmarks.bench_list_serialization --sizes 100 500 1000 --iterations 50
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.orm import with_expression  # noqa: E402
+
+from crud import customer_list_columns, customer_list_item  # noqa: E402
+from database import AsyncSessionLocal, async_engine  # noqa: E402
+from models import Customer, portal_status_expression  # noqa: E402
+from schemas import CustomerListItem, CustomersListResponse  # noqa: E402
+
+
+async def fetch_entities(db, size: int):
+    query = (
+        select(Customer)
+        .options(with_expression(Customer.computed_portal_status, portal_status_expression()))
+        .order_by(Customer.created_at.desc(), Customer.id.desc())
+        .limit(size)
+    )
+    return list((await db.execute(query)).scalars().all())
+
+
+def serialize_entities(customers) -> bytes:
+    response = CustomersListResponse(
+        items=[CustomerListItem.from_orm(c) for c in customers],
+        total=len(customers),
+    )
+    return JSONResponse(jsonable_encoder(response)).body
+
+
+async def fetch_rows(db, size: int):
+    query = (
+        select(*customer_list_columns())
+        .order_by(Customer.created_at.desc(), Customer.id.desc())
+        .limit(size)
+    )
+    return list((await db.execute(query)).all())
+
+
+def serialize_rows(rows) -> bytes:
+    return ORJSONResponse(
+        {
+            "items": [customer_list_item(row) for row in rows],
+            "total": len(rows),
+            "total_exact": True,
+            "next_cursor": None,
+            "prev_cursor": None,
+        }
+    ).body
+
+
+async def measure(fetch, serialize, size: int, iterations: int):
+    fetch_ms, serialize_ms = [], []
+    body = b""
+    for _ in range(iterations):
+        # nieuwe sessie per iteratie: geen identity map van de vorige ronde
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            rows = await fetch(db, size)
+            fetched = time.perf_counter()
+            body = serialize(rows)
+            done = time.perf_counter()
+        fetch_ms.append((fetched - started) * 1000)
+        serialize_ms.append((done - fetched) * 1000)
+    return statistics.median(fetch_ms), statistics.median(serialize_ms), body
+
+
+async def run(sizes, iterations: int) -> None:
+    print(f"{'rijen':>6} {'pad':<6} {'fetch ms':>9} {'serialize ms':>13} {'totaal ms':>10} {'bytes':>9}")
+    for size in sizes:
+        old = await measure(fetch_entities, serialize_entities, size, iterations)
+        lean = await measure(fetch_rows, serialize_rows, size, iterations)
+        if json.loads(old[2]) != json.loads(lean[2]):
+            raise SystemExit(f"JSON verschilt tussen oud en lean pad bij {size} rijen")
+        for name, (fetch_ms, serialize_ms, body) in (("oud", old), ("lean", lean)):
+            print(
+                f"{size:>6} {name:<6} {fetch_ms:9.2f} {serialize_ms:13.2f} "
+                f"{fetch_ms + serialize_ms:10.2f} {len(body):9}"
+            )
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(run(args.sizes, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# modules/website/backend/benchmarks/bench_startup.py
+"""
+Opstarttijd van de website-backend: hoe snel is een nieuwe worker bruikbaar
+(scale-out, rolling restart)?
+
+Per run in een vers proces:
+
+- import: `import app` (alle modules, modellen, settings)
+- ready: van het starten van uvicorn tot de eerste 200 op /health
+- eerste DB-request: daarna de eerste request die de database raakt
+  (password-setup met een onbestaand token -> 400), incl. de eerste
+  verbinding uit de pool
+
+Gebruik (vanuit modules/website/backend, met WEBSITE_DB_* naar een DB die al
+gemigreerd is, `python manage.py setup`):
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 10 --port 8799
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app; "
+    "print(time.perf_counter() - t)"
+)
+
+
+def measure_import() -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def status_of(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def measure_boot(port: int, timeout: float = 60.0):
+    """(seconden tot /health 200, seconden voor de eerste DB-request)."""
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "PYTHONPATH": str(BACKEND_DIR)},
+    )
+    try:
+        while True:
+            if server.poll() is not None:
+                raise SystemExit("uvicorn stopte tijdens het opstarten")
+            if time.perf_counter() - started > timeout:
+                raise SystemExit(f"/health niet bereikbaar na {timeout:.0f}s")
+            try:
+                if status_of(f"{base}/health") == 200:
+                    break
+            except OSError:
+                time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        first = time.perf_counter()
+        status = status_of(f"{base}/api/public/password-setup/bench-startup-onbestaand")
+        if status != 400:
+            raise SystemExit(f"onverwachte status {status} op de eerste DB-request")
+        return ready, time.perf_counter() - first
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8799)
+    args = parser.parse_args()
+
+    imports, readies, firsts = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import())
+        ready, first = measure_boot(args.port)
+        readies.append(ready)
+        firsts.append(first)
+
+    print(f"{args.runs} runs (mediaan / max)")
+    for name, values in (
+        ("import app", imports),
+        ("ready (/health 200)", readies),
+        ("eerste DB-request", firsts),
+    ):
+        print(
+            f"  {name:<22} {statistics.median(values) * 1000:8.0f} ms"
+            f"  {max(values) * 1000:8.0f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
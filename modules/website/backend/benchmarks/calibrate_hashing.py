@@ -0,0 +1,124 @@
+# modules/website/backend/benchmarks/calibrate_hashing.py
+"""
+Kalibratie van de wachtwoord-hash cost op de huidige hardware.
+
+Meet hoe lang één bcrypt-verify duurt per work factor en kiest de hoogste
+cost die binnen het latency-budget per login past (--target-ms). Elke stap
+in bcrypt rounds verdubbelt de kost; onder --min-rounds gaan we nooit, ook
+niet op trage hardware (dan liever meer hash-workers).
+
+Voor pbkdf2_sha256 (seeds van de core-backend, enkel nog legacy) wordt ter
+vergelijking het aantal iteraties voor hetzelfde budget gerapporteerd.
+
+Draai dit op de productiehardware (of in de container met dezelfde CPU-limiet)
+en zet het resultaat in de config:
+
+    python -m benchmarks.calibrate_hashing --target-ms 250
+    python -m benchmarks.calibrate_hashing --target-ms 250 --env-file ../../../.env
+
+Met --env-file worden WEBSITE_BCRYPT_ROUNDS (website-backend) en
+BCRYPT_ROUNDS (core-backend, leest .env via docker compose) in dat bestand
+gezet of bijgewerkt; voor de website-backend staat de waarde in de
+environment van docker-compose.yml.
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from passlib.hash import bcrypt, pbkdf2_sha256
+
+
+PASSWORD = "Kalibratie-Wachtwoord-123"
+
+
+def median_ms(fn: Callable[[], object], samples: int) -> float:
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def bcrypt_verify_ms(rounds: int, samples: int) -> float:
+    hashed = bcrypt.using(rounds=rounds).hash(PASSWORD)
+    return median_ms(lambda: bcrypt.verify(PASSWORD, hashed), samples)
+
+
+def pick_bcrypt_rounds(target_ms: float, min_rounds: int, max_rounds: int, samples: int):
+    """(gekozen rounds, {rounds: ms}); stopt zodra het budget overschreden is."""
+    measured: Dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        # hogere cost: minder samples, het gaat om de orde van grootte
+        ms = bcrypt_verify_ms(rounds, samples if rounds < 13 else 1)
+        measured[rounds] = ms
+        if ms > target_ms:
+            break
+        chosen = rounds
+    return chosen, measured
+
+
+def pick_pbkdf2_rounds(target_ms: float, samples: int) -> int:
+    # lineair in het aantal iteraties: één meting volstaat
+    probe = 100_000
+    hashed = pbkdf2_sha256.using(rounds=probe).hash(PASSWORD)
+    ms = median_ms(lambda: pbkdf2_sha256.verify(PASSWORD, hashed), samples)
+    return int(probe * target_ms / ms)
+
+
+def update_env_file(path: Path, values: Dict[str, str]) -> None:
+    lines = path.read_text().splitlines() if path.exists() else []
+    remaining = dict(values)
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in remaining:
+            lines[i] = f"{key}={remaining.pop(key)}"
+    lines.extend(f"{key}={value}" for key, value in remaining.items())
+    path.write_text("\n".join(lines) + "\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="latency-budget voor één hash/verify (ms)")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--env-file", type=Path, default=None,
+                        help="resultaat in dit .env-bestand zetten")
+    args = parser.parse_args()
+
+    rounds, measured = pick_bcrypt_rounds(
+        args.target_ms, args.min_rounds, args.max_rounds, args.samples
+    )
+    print(f"bcrypt verify per work factor (budget {args.target_ms:.0f} ms):")
+    for r, ms in measured.items():
+        marker = "  <- gekozen" if r == rounds else ""
+        print(f"  rounds={r:<3} {ms:8.1f} ms  {1000 / ms:7.1f} logins/s/core{marker}")
+    if measured[rounds] > args.target_ms:
+        print(
+            f"  let op: zelfs rounds={rounds} past niet binnen het budget; "
+            "liever meer WEBSITE_HASH_POOL_WORKERS dan een lagere cost"
+        )
+
+    pbkdf2_rounds = pick_pbkdf2_rounds(args.target_ms, args.samples)
+    print(
+        f"pbkdf2_sha256 (legacy) voor hetzelfde budget: ~{pbkdf2_rounds} iteraties "
+        f"(passlib default {pbkdf2_sha256.default_rounds})"
+    )
+
+    values = {"WEBSITE_BCRYPT_ROUNDS": str(rounds), "BCRYPT_ROUNDS": str(rounds)}
+    print()
+    for key, value in values.items():
+        print(f"{key}={value}")
+    if args.env_file is not None:
+        update_env_file(args.env_file, values)
+        print(f"geschreven naar {args.env_file}")
+
+
+if __name__ == "__main__":
+    main()
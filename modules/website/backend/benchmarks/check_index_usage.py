@@ -0,0 +1,220 @@
+# modules/website/backend/benchmarks/check_index_usage.py
+"""
+Controle dat de hete queries van de website-backend hun index gebruiken.
+
+Draait de echte crud-/portal_crud-functies, vangt de SQL op die ze naar
+Postgres sturen en doet daarna EXPLAIN op exact die statements (met dezelfde
+parameters). Per scenario moet elke verwachte index in het plan voorkomen;
+bij sorteerscenario's mag er bovendien geen Sort-node in het plan zitten.
+
+Standaard met `enable_seqscan = off` en `enable_sort = off`: op een kleine
+dev-database kiest de planner anders terecht een seq scan (of een sort van
+drie rijen), en dan zegt het plan niets over de vraag of de index *bruikbaar*
+is. Blijft er toch een Sort-node over, dan kan geen enkele index de volgorde
+leveren. Op een database met productievolume toont --allow-seqscan het echte
+plan.
+
+Gebruik (vanuit modules/website/backend, na `alembic upgrade head`):
+
+    python -m benchmarks.check_index_usage
+    python -m benchmarks.check_index_usage --allow-seqscan --verbose
+
+Exit code 1 als een scenario zijn index niet gebruikt.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, List, NamedTuple, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import event  # noqa: E402
+
+from database import AsyncSessionLocal, async_engine  # noqa: E402
+import crud  # noqa: E402
+import portal_crud  # noqa: E402
+
+
+class Scenario(NamedTuple):
+    name: str
+    run: Callable[..., Awaitable[object]]
+    indexes: Tuple[str, ...]
+    no_sort: bool = False
+
+
+async def _list_second_page(db, **kwargs):
+    page = await crud.list_customers(db, limit=1, **kwargs)
+    if page.next_cursor:
+        await crud.list_customers(db, limit=1, cursor=page.next_cursor, **kwargs)
+
+
+async def _export_first_partition(db, **kwargs):
+    statement = crud.customer_export_statement(**kwargs).execution_options(yield_per=100)
+    result = await db.stream(statement)
+    await result.partitions().__anext__()
+    await result.close()
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario(
+        "login / get_current_user (lower(email))",
+        lambda db: crud.get_customer_by_email(db, "Admin@Casuse.mx"),
+        ("ux_customers_email_lower",),
+    ),
+    Scenario(
+        "admin lijst: actief, created_at desc",
+        lambda db: crud.list_customers(db, limit=25),
+        ("ix_customers_active_created_id",),
+        no_sort=True,
+    ),
+    Scenario(
+        "admin lijst: actief, naam asc, pagina 2",
+        lambda db: _list_second_page(db, sort_by="name", sort_dir="asc"),
+        ("ix_customers_active_name_id",),
+        no_sort=True,
+    ),
+    Scenario(
+        "admin lijst: alle statussen, created_at desc",
+        lambda db: crud.list_customers(db, status="all", limit=25),
+        ("ix_customers_created_id",),
+        no_sort=True,
+    ),
+    Scenario(
+        "admin lijst: alle statussen, naam desc",
+        lambda db: crud.list_customers(db, status="all", sort_by="name", limit=25),
+        ("ix_customers_name_id",),
+        no_sort=True,
+    ),
+    Scenario(
+        "export: alle statussen, naam asc (server-side cursor)",
+        lambda db: _export_first_partition(db, status="all", sort_by="name", sort_dir="asc"),
+        ("ix_customers_name_id",),
+        no_sort=True,
+    ),
+    Scenario(
+        "admin zoeken (pg_trgm)",
+        lambda db: crud.list_customers(db, search="ramirez", limit=25),
+        ("ix_customers_search_trgm",),
+    ),
+    Scenario(
+        "portal_status: laatste token per klant",
+        lambda db: crud.get_customer(db, uuid.uuid4()),
+        ("ix_registration_tokens_customer_created",),
+    ),
+    Scenario(
+        "reset_password: openstaande tokens ongeldig maken",
+        # onbestaande klant: het UPDATE-statement raakt geen rijen
+        lambda db: crud.mark_all_tokens_used_for_customers(db, [uuid.uuid4()]),
+        ("ix_registration_tokens_customer_unused",),
+    ),
+    Scenario(
+        "portal: documenten per klant",
+        lambda db: portal_crud.get_portal_documents_for_customer(db, uuid.uuid4()),
+        ("ix_portal_documents_customer_created",),
+        no_sort=True,
+    ),
+    Scenario(
+        "portal: stappen per status",
+        lambda db: portal_crud.get_portal_steps_for_status(db, 1),
+        ("ix_portal_status_steps_status_order",),
+        no_sort=True,
+    ),
+    Scenario(
+        "portal: volledig overzicht in één query",
+        lambda db: portal_crud.get_portal_overview_json(db, uuid.uuid4()),
+        (
+            "ix_portal_statuses_customer_id",
+            "ix_portal_status_steps_status_order",
+            "ix_portal_documents_customer_created",
+            "ix_portal_representatives_customer_id",
+        ),
+    ),
+]
+
+
+def _walk(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _walk(child)
+
+
+def _summarize(plan: dict) -> Tuple[set, set]:
+    node_types, index_names = set(), set()
+    for node in _walk(plan):
+        node_types.add(node["Node Type"])
+        if "Index Name" in node:
+            index_names.add(node["Index Name"])
+    return node_types, index_names
+
+
+async def check(args: argparse.Namespace) -> bool:
+    captured: List[Tuple[str, object]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+
+    all_ok = True
+    async with async_engine.connect() as explain_conn:
+        if not args.allow_seqscan:
+            await explain_conn.exec_driver_sql("SET enable_seqscan = off")
+            await explain_conn.exec_driver_sql("SET enable_sort = off")
+
+        for scenario in SCENARIOS:
+            captured.clear()
+            async with AsyncSessionLocal() as db:
+                await scenario.run(db)
+            statements = [
+                (stmt, params)
+                for stmt, params in captured
+                if stmt.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE"))
+            ]
+
+            used_indexes, node_types = set(), set()
+            for stmt, params in statements:
+                result = await explain_conn.exec_driver_sql(
+                    "EXPLAIN (FORMAT JSON) " + stmt, params
+                )
+                raw = result.scalar_one()
+                plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+                types, names = _summarize(plan)
+                node_types |= types
+                used_indexes |= names
+                if args.verbose:
+                    print(f"    {stmt.split()[0]}: {sorted(types)} {sorted(names)}")
+
+            missing = [name for name in scenario.indexes if name not in used_indexes]
+            sorted_in_memory = scenario.no_sort and "Sort" in node_types
+            ok = not missing and not sorted_in_memory
+            all_ok = all_ok and ok
+            detail = ""
+            if missing:
+                detail += f" missing={missing}"
+            if sorted_in_memory:
+                detail += " (Sort-node: index levert de volgorde niet)"
+            print(f"{'OK  ' if ok else 'FAIL'} {scenario.name}{detail}")
+
+    event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    await async_engine.dispose()
+    return all_ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--allow-seqscan",
+        action="store_true",
+        help="planner vrij laten kiezen (enkel zinvol op productievolume)",
+    )
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(check(args)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# modules/website/backend/benchmarks/load_test.py
+"""
+Eenvoudige load test voor de website-backend (doorvoer + latency).
+
+Draait N gelijktijdige clients gedurende een vaste tijd tegen een draaiende
+backend en meet requests/s en p50/p95/p99 per endpoint. Bedoeld om twee
+builds te vergelijken, bv. de sync- en de async-DB-versie:
+
+    # tegen de oude build
+    python -m benchmarks.load_test --base-url http://localhost:20052 \\
+        --concurrency 64 --duration 30 --output before.json
+    # tegen de nieuwe build
+    python -m benchmarks.load_test --base-url http://localhost:20052 \\
+        --concurrency 64 --duration 30 --output after.json
+    # vergelijken
+    python -m benchmarks.load_test --compare before.json after.json
+
+Vereist `httpx` (pip install httpx); geen onderdeel van requirements.txt.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+
+# (naam, methode, pad, gewicht, auth) -- auth: None | "admin" | "customer"
+SCENARIO = [
+    ("portal_overview", "GET", "/api/customer/portal/overview", 6, "customer"),
+    ("admin_list", "GET", "/api/admin/customers?limit=25", 3, "admin"),
+    ("health", "GET", "/health", 1, None),
+]
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    resp = await client.post(
+        "/api/public/login", json={"email": email, "password": password}
+    )
+    resp.raise_for_status()
+    return resp.json()["access_token"]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    headers: Dict[str, Dict[str, str]],
+    deadline: float,
+    timings: Dict[str, List[float]],
+    errors: Dict[str, int],
+) -> None:
+    weights = [entry[3] for entry in SCENARIO]
+    while time.perf_counter() < deadline:
+        name, method, path, _, auth = random.choices(SCENARIO, weights)[0]
+        t0 = time.perf_counter()
+        try:
+            resp = await client.request(method, path, headers=headers.get(auth, {}))
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        if ok:
+            timings[name].append(elapsed)
+        else:
+            errors[name] += 1
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    limits = httpx.Limits(
+        max_connections=args.concurrency, max_keepalive_connections=args.concurrency
+    )
+    async with httpx.AsyncClient(
+        base_url=args.base_url, limits=limits, timeout=args.timeout
+    ) as client:
+        headers = {
+            "admin": {
+                "Authorization": "Bearer "
+                + await _login(client, args.admin_email, args.admin_password)
+            },
+            "customer": {
+                "Authorization": "Bearer "
+                + await _login(client, args.customer_email, args.customer_password)
+            },
+        }
+
+        timings: Dict[str, List[float]] = defaultdict(list)
+        errors: Dict[str, int] = defaultdict(int)
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *[
+                _worker(client, headers, deadline, timings, errors)
+                for _ in range(args.concurrency)
+            ]
+        )
+        wall = time.perf_counter() - started
+
+    endpoints = {}
+    for name, *_ in SCENARIO:
+        values = timings.get(name, [])
+        endpoints[name] = {
+            "requests": len(values),
+            "errors": errors.get(name, 0),
+            "rps": len(values) / wall,
+            "p50_ms": _percentile(values, 50) * 1000,
+            "p95_ms": _percentile(values, 95) * 1000,
+            "p99_ms": _percentile(values, 99) * 1000,
+            "mean_ms": (statistics.fmean(values) * 1000) if values else 0.0,
+        }
+    total = sum(e["requests"] for e in endpoints.values())
+    return {
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration_s": wall,
+        "total_requests": total,
+        "total_errors": sum(e["errors"] for e in endpoints.values()),
+        "rps": total / wall,
+        "endpoints": endpoints,
+    }
+
+
+def print_result(result: dict) -> None:
+    print(
+        f"{result['base_url']}  concurrency={result['concurrency']}  "
+        f"{result['total_requests']} req in {result['duration_s']:.1f}s  "
+        f"=> {result['rps']:.1f} req/s  ({result['total_errors']} errors)"
+    )
+    print(f"{'endpoint':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err':>7}")
+    for name, e in result["endpoints"].items():
+        print(
+            f"{name:<18}{e['rps']:>10.1f}{e['p50_ms']:>10.1f}"
+            f"{e['p95_ms']:>10.1f}{e['p99_ms']:>10.1f}{e['errors']:>7}"
+        )
+
+
+def compare(before_path: str, after_path: str) -> None:
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{'endpoint':<18}{'before req/s':>14}{'after req/s':>14}{'x':>7}{'p95 before':>12}{'p95 after':>11}")
+    rows = [("TOTAL", before, after)] + [
+        (name, before["endpoints"][name], after["endpoints"].get(name, {}))
+        for name in before["endpoints"]
+    ]
+    for name, b, a in rows:
+        ratio = (a.get("rps", 0) / b["rps"]) if b.get("rps") else 0.0
+        print(
+            f"{name:<18}{b.get('rps', 0):>14.1f}{a.get('rps', 0):>14.1f}{ratio:>7.2f}"
+            f"{b.get('p95_ms', 0):>12.1f}{a.get('p95_ms', 0):>11.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--base-url", default="http://localhost:20052")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--admin-email", default="admin@casuse.mx")
+    parser.add_argument("--admin-password", default="Test1234!")
+    # standaard logt de "klant" ook als de seed-admin in; elke actieve klant werkt
+    parser.add_argument("--customer-email", default="admin@casuse.mx")
+    parser.add_argument("--customer-password", default="Test1234!")
+    parser.add_argument("--output", help="resultaat als JSON wegschrijven")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    result = asyncio.run(run(args))
+    print_result(result)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+# modules/website/backend/bulk_actions.py
+"""
+Bulk acties op klanten voor de admin: deactivate, activate, delete (soft)
+en reset_password voor een lijst ids of voor alle klanten die aan een filter
+voldoen.
+
+Alles gebeurt in één transactie met een vast aantal statements, ongeacht
+het aantal klanten:
+
+1. SELECT ... FOR UPDATE van de geselecteerde klanten (bestaat / actief?)
+2. één set-based UPDATE op customers (RETURNING de gewijzigde ids)
+3. één UPDATE op registration_tokens (deactivate / reset_password)
+4. één multi-row INSERT van nieuwe tokens + één van de resetmails in de
+   outbox (reset_password)
+
+Het resultaat bevat per id wat er gebeurd is. De semantiek per klant is
+dezelfde als die van de bestaande endpoints per klant.
+"""
+
+import logging
+import uuid
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import principal_cache
+from config import settings
+from crud import (
+    customer_filters,
+    insert_registration_tokens,
+    lock_customers,
+    mark_all_tokens_used_for_customers,
+    set_customers_active,
+)
+from outbox import PASSWORD_RESET, PasswordEmail, queue_password_emails
+from schemas import (
+    BulkCustomerActionRequest,
+    BulkCustomerActionResponse,
+    BulkCustomerOutcome,
+)
+
+
+logger = logging.getLogger("website-backend")
+
+BULK_ACTIONS = ("deactivate", "activate", "delete", "reset_password")
+
+
+class BulkSelectionTooLarge(ValueError):
+    """Meer klanten geselecteerd dan WEBSITE_BULK_ACTION_MAX_CUSTOMERS."""
+
+
+async def run_bulk_action(
+    db: AsyncSession,
+    action: str,
+    selection: BulkCustomerActionRequest,
+    include_tokens: bool = False,
+) -> BulkCustomerActionResponse:
+    """
+    Voert `action` uit op de selectie en commit één keer.
+
+    - include_tokens: nieuwe tokens meesturen in het resultaat (local/dev)
+
+    Raises BulkSelectionTooLarge (zonder iets te wijzigen) als de selectie
+    groter is dan WEBSITE_BULK_ACTION_MAX_CUSTOMERS.
+    """
+    max_customers = settings.WEBSITE_BULK_ACTION_MAX_CUSTOMERS
+
+    if selection.customer_ids is not None:
+        requested = list(dict.fromkeys(selection.customer_ids))
+        if len(requested) > max_customers:
+            raise BulkSelectionTooLarge(
+                f"At most {max_customers} customers per bulk action"
+            )
+        rows = await lock_customers(db, customer_ids=requested)
+    else:
+        conditions, _ = customer_filters(
+            selection.filter.search,
+            selection.filter.customer_type,
+            selection.filter.status,
+        )
+        rows = await lock_customers(db, conditions=conditions, limit=max_customers + 1)
+        if len(rows) > max_customers:
+            await db.rollback()
+            raise BulkSelectionTooLarge(
+                f"Filter matches more than {max_customers} customers; narrow it down"
+            )
+        requested = [row.id for row in rows]
+
+    found = {row.id: row for row in rows}
+    active_ids = [row.id for row in rows if row.is_active]
+    inactive_ids = [row.id for row in rows if not row.is_active]
+
+    changed: List[uuid.UUID] = []
+    tokens: Dict[uuid.UUID, str] = {}
+    if action in ("deactivate", "delete"):
+        changed = await set_customers_active(db, active_ids, active=False)
+        if action == "deactivate":
+            # zoals admin_deactivate_customer: openstaande tokens ongeldig maken
+            await mark_all_tokens_used_for_customers(db, changed)
+    elif action == "activate":
+        changed = await set_customers_active(db, inactive_ids, active=True)
+    elif action == "reset_password":
+        await mark_all_tokens_used_for_customers(db, active_ids)
+        tokens = await insert_registration_tokens(db, active_ids)
+        await queue_password_emails(
+            db,
+            [
+                PasswordEmail(PASSWORD_RESET, customer_id, found[customer_id].email, token)
+                for customer_id, token in tokens.items()
+            ],
+        )
+        changed = list(tokens)
+    else:
+        raise ValueError(f"Unknown bulk action: {action}")
+
+    await db.commit()
+
+    for customer_id in changed:
+        principal_cache.invalidate(str(customer_id))
+
+    changed_set = set(changed)
+    results = []
+    for customer_id in requested:
+        if customer_id not in found:
+            outcome = "not_found"
+        elif customer_id in changed_set:
+            outcome = "updated"
+        elif action == "reset_password":
+            outcome = "inactive"
+        else:
+            outcome = "unchanged"
+        results.append(
+            BulkCustomerOutcome(
+                id=customer_id,
+                outcome=outcome,
+                token=tokens.get(customer_id) if include_tokens else None,
+            )
+        )
+
+    logger.info(
+        "Bulk %s: %s requested, %s found, %s updated",
+        action,
+        len(requested),
+        len(found),
+        len(changed),
+    )
+    return BulkCustomerActionResponse(
+        action=action,
+        matched=len(found),
+        updated=len(changed),
+        results=results,
+    )
@@ -0,0 +1,330 @@
+# modules/website/backend/bulk_import.py
+"""
+Bulk import van klanten (CSV of NDJSON) voor de admin.
+
+De upload wordt gestreamd gelezen (geen volledige body in het geheugen),
+rij per rij gevalideerd met RegistrationRequest en per batch weggeschreven via
+crud.bulk_create_customers_with_tokens (multi-row INSERT + tokens, één
+transactie per batch). Dubbele emails (case-insensitive) binnen het bestand
+en emails die al in de database staan, komen in het foutenrapport.
+
+CSV: eerste rij = kolomnamen (zelfde namen als RegistrationRequest), komma
+als scheidingsteken, RFC 4180-quoting (ook newlines binnen quotes). Een
+niet-afgesloten quote kost één rij, niet de rest van het bestand.
+NDJSON: één JSON-object per regel.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from crud import bulk_create_customers_with_tokens
+from schemas import ImportReport, ImportRowError, RegistrationRequest
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+CONTENT_TYPE_FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+
+# om de zoveel rijen de event loop laten draaien (zie import_customers)
+YIELD_EVERY_ROWS = 50
+
+
+class ImportFormatError(ValueError):
+    """Bestand kan niet als CSV/NDJSON gelezen worden (geen rij-fout)."""
+
+
+def detect_format(explicit: Optional[str], content_type: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPE_FORMATS:
+        return CONTENT_TYPE_FORMATS[media_type]
+    raise ImportFormatError(
+        "Unknown import format: pass ?format=csv|ndjson or a text/csv / "
+        "application/x-ndjson Content-Type"
+    )
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Tekstregels (met newline) uit een bytestream; UTF-8, BOM wordt genegeerd."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        try:
+            buffer += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise ImportFormatError("Upload is not valid UTF-8")
+        # enkel op "\n" splitsen: andere line breaks mogen in een CSV-veld staan
+        start = 0
+        while True:
+            end = buffer.find("\n", start)
+            if end == -1:
+                break
+            yield buffer[start:end + 1]
+            start = end + 1
+        buffer = buffer[start:]
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+class _LineFeed:
+    """Regels voor csv.reader; onthoudt of de reader er meer wou dan er zijn."""
+
+    def __init__(self, lines: List[str]) -> None:
+        self._lines = iter(lines)
+        self.ran_out = False
+
+    def __iter__(self) -> "_LineFeed":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._lines)
+        except StopIteration:
+            self.ran_out = True
+            raise
+
+
+class _CsvRecords:
+    """
+    Deelt CSV-regels op in records met csv.reader zelf: een record is af als
+    de reader het teruggeeft zonder een regel te vragen die er nog niet is.
+    Vraagt hij er meer, dan staat er een quoted veld open (newline binnen
+    quotes) en wachten we op de volgende regel. Een quote midden in een veld
+    (O"Brien) opent voor csv geen quoted veld en houdt dus niets open.
+
+    Blijft een quoted veld langer dan `max_lines` regels (of tot het einde van
+    het bestand) open, dan is de quote niet afgesloten: die regel wordt als
+    fout gemeld en het lezen gaat verder met de regel erna.
+    """
+
+    UNTERMINATED = object()
+
+    def __init__(self, max_lines: int) -> None:
+        self.max_lines = max(max_lines, 1)
+        self.lines: List[str] = []
+        self.first_line = 1  # regelnummer in het bestand van lines[0]
+
+    def feed(self, line: str) -> Iterator[Tuple[int, object]]:
+        self.lines.append(line)
+        return self._records(eof=False)
+
+    def finish(self) -> Iterator[Tuple[int, object]]:
+        return self._records(eof=True)
+
+    def _records(self, eof: bool) -> Iterator[Tuple[int, object]]:
+        """(regelnummer, waarden | csv.Error | UNTERMINATED) per afgewerkt record."""
+        while self.lines:
+            feed = _LineFeed(self.lines)
+            reader = csv.reader(feed)
+            try:
+                result: object = next(reader)
+            except csv.Error as e:
+                result = e
+            if feed.ran_out:
+                if not eof and len(self.lines) < self.max_lines:
+                    return
+                yield self.first_line, self.UNTERMINATED
+                used = 1
+            else:
+                used = reader.line_num
+                # lege regels overslaan
+                if "".join(self.lines[:used]).strip():
+                    yield self.first_line, result
+            del self.lines[:used]
+            self.first_line += used
+
+
+async def _iter_csv(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    """(rijnummer, dict | foutmelding) per CSV-record (zie _CsvRecords)."""
+    records = _CsvRecords(settings.WEBSITE_IMPORT_MAX_RECORD_LINES)
+    header: Optional[List[str]] = None
+    row_number = 0
+
+    async def parsed() -> AsyncIterator[Tuple[int, object]]:
+        async for line in lines:
+            for item in records.feed(line):
+                yield item
+        for item in records.finish():
+            yield item
+
+    async for line_number, values in parsed():
+        if values is _CsvRecords.UNTERMINATED:
+            error = f"Unterminated quoted field starting on line {line_number}"
+        elif isinstance(values, csv.Error):
+            error = f"Invalid CSV on line {line_number}: {values}"
+        else:
+            error = None
+        if header is None:
+            if error is not None:
+                raise ImportFormatError(f"Invalid CSV header: {error}")
+            header = [name.strip().lower() for name in values]
+            continue
+        row_number += 1
+        if error is not None:
+            yield row_number, error
+            continue
+        if len(values) != len(header):
+            yield row_number, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # lege cellen = niet ingevuld
+        yield row_number, {
+            name: (value if value.strip() else None)
+            for name, value in zip(header, values)
+        }
+
+
+async def _iter_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[int, object]]:
+    row_number = 0
+    async for line in lines:
+        row_number += 1
+        if not line.strip():
+            continue
+        try:
+            value = json.loads(line)
+        except ValueError as e:
+            yield row_number, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row_number, "Expected a JSON object"
+            continue
+        yield row_number, value
+
+
+class _Report:
+    def __init__(self, fmt: str, max_errors: int) -> None:
+        self.fmt = fmt
+        self.max_errors = max_errors
+        self.total_rows = 0
+        self.imported = 0
+        self.invalid = 0
+        self.duplicates_in_file = 0
+        self.already_registered = 0
+        self.errors: List[ImportRowError] = []
+        self.errors_truncated = False
+        self.started = time.perf_counter()
+
+    def error(self, row: int, email: Optional[str], reason: str, details=None) -> None:
+        if len(self.errors) >= self.max_errors:
+            self.errors_truncated = True
+            return
+        self.errors.append(
+            ImportRowError(row=row, email=email, reason=reason, details=details or [])
+        )
+
+    def build(self) -> ImportReport:
+        duration = time.perf_counter() - self.started
+        return ImportReport(
+            format=self.fmt,
+            total_rows=self.total_rows,
+            imported=self.imported,
+            invalid=self.invalid,
+            duplicates_in_file=self.duplicates_in_file,
+            already_registered=self.already_registered,
+            errors=self.errors,
+            errors_truncated=self.errors_truncated,
+            duration_seconds=round(duration, 3),
+            rows_per_second=round(self.total_rows / duration, 1) if duration else 0.0,
+        )
+
+
+async def import_customers(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+) -> ImportReport:
+    """
+    Leest, valideert en importeert de stream. Elke batch wordt apart
+    gecommit: bij een afgebroken upload blijven de vorige batches staan en
+    zegt het rapport welke rijen geïmporteerd zijn.
+    """
+    batch_size = settings.WEBSITE_IMPORT_BATCH_SIZE
+    report = _Report(fmt, settings.WEBSITE_IMPORT_MAX_ERRORS)
+    records = _iter_csv if fmt == "csv" else _iter_ndjson
+
+    seen: Dict[str, int] = {}  # lower(email) -> eerste rijnummer
+    batch: List[Tuple[int, RegistrationRequest]] = []
+    # Batch die nu naar Postgres gaat: terwijl de database schrijft, valideren
+    # we de volgende batch. De sessie wordt nooit door twee batches tegelijk
+    # gebruikt.
+    pending: Optional[asyncio.Task] = None
+
+    async def flush(rows: List[Tuple[int, RegistrationRequest]]) -> None:
+        created = await bulk_create_customers_with_tokens(
+            db, [registration for _, registration in rows]
+        )
+        for row_number, registration in rows:
+            if registration.email.lower() in created:
+                report.imported += 1
+            else:
+                report.already_registered += 1
+                report.error(row_number, registration.email, "Email already registered")
+
+    try:
+        async for row_number, record in records(_iter_lines(chunks)):
+            report.total_rows += 1
+            if report.total_rows % YIELD_EVERY_ROWS == 0:
+                # validatie is CPU-werk: de lopende insert af en toe laten verdergaan
+                await asyncio.sleep(0)
+            if isinstance(record, str):
+                report.invalid += 1
+                report.error(row_number, None, record)
+                continue
+
+            email = record.get("email")
+            try:
+                registration = RegistrationRequest(**record)
+            except ValidationError as e:
+                report.invalid += 1
+                report.error(
+                    row_number,
+                    email if isinstance(email, str) else None,
+                    "Validation failed",
+                    [
+                        {"field": ".".join(str(part) for part in err["loc"]), "message": err["msg"]}
+                        for err in e.errors()
+                    ],
+                )
+                continue
+
+            key = registration.email.lower()
+            if key in seen:
+                report.duplicates_in_file += 1
+                report.error(
+                    row_number,
+                    registration.email,
+                    f"Duplicate email in file (first seen in row {seen[key]})",
+                )
+                continue
+            seen[key] = row_number
+
+            batch.append((row_number, registration))
+            if len(batch) >= batch_size:
+                if pending is not None:
+                    await pending
+                pending = asyncio.create_task(flush(batch))
+                batch = []
+    finally:
+        if pending is not None:
+            await pending
+
+    if batch:
+        await flush(batch)
+    return report.build()
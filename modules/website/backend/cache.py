@@ -0,0 +1,117 @@
+# modules/website/backend/cache.py
+"""
+Kleine in-process caches (per worker-proces).
+
+Let op bij meerdere uvicorn-workers: expliciete invalidatie geldt enkel voor
+het proces dat de wijziging uitvoert; andere workers zien de wijziging pas na
+de TTL. Hou de TTL daarom kort voor alles wat met toegang te maken heeft.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from config import settings
+
+
+class TTLCache:
+    """
+    LRU-cache met een vaste TTL per entry, thread-safe.
+
+    `set(..., loaded_at=...)` weigert een waarde die geladen werd vóór de
+    laatste invalidate() van die key, zodat een request dat tijdens een
+    wijziging nog oude data las de cache niet opnieuw kan vervuilen.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._invalidated_at: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                # laten staan voor peek(); LRU ruimt het later op
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Waarde ook als ze verlopen is (zonder stats of LRU-update)."""
+        with self._lock:
+            entry = self._data.get(key)
+            return entry[1] if entry is not None else None
+
+    def set(self, key: Hashable, value: Any, loaded_at: Optional[float] = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            invalidated_at = self._invalidated_at.get(key)
+            if loaded_at is not None and invalidated_at is not None:
+                if loaded_at <= invalidated_at:
+                    return
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._data.pop(key, None)
+            self._invalidated_at[key] = now
+            self.invalidations += 1
+            # tombstones ouder dan de TTL zijn niet meer nodig
+            if len(self._invalidated_at) > self.maxsize:
+                cutoff = now - self.ttl
+                self._invalidated_at = {
+                    k: t for k, t in self._invalidated_at.items() if t > cutoff
+                }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._invalidated_at.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+# Portaaloverzicht per klant (portal_overview.OverviewSnapshot), key = str(customer_id).
+portal_overview_cache = TTLCache(
+    maxsize=settings.WEBSITE_PORTAL_OVERVIEW_CACHE_SIZE,
+    ttl=settings.WEBSITE_PORTAL_OVERVIEW_TTL_SECONDS,
+)
+
+# Geauthenticeerde klanten (schemas.Principal), key = str(customer_id).
+# Elke hit bespaart de get_customer_by_email-query in get_current_user.
+principal_cache = TTLCache(
+    maxsize=settings.WEBSITE_PRINCIPAL_CACHE_SIZE,
+    ttl=settings.WEBSITE_PRINCIPAL_CACHE_TTL_SECONDS,
+)
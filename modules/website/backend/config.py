@@ -9,6 +9,46 @@ class Settings(BaseSettings):
     WEBSITE_DB_USER: str = os.getenv("WEBSITE_DB_USER", "website_user")
     WEBSITE_DB_PASSWORD: str = os.getenv("WEBSITE_DB_PASSWORD", "website_password")
 
+    # Connection pool per engine en per worker (zie casuse_common.db_pool);
+    # max. verbindingen naar Postgres ≈ workers × (POOL_SIZE + MAX_OVERFLOW).
+    # - RECYCLE: verbinding na zoveel seconden vervangen (-1 = nooit)
+    # - TIMEOUT: max. seconden wachten op een vrije verbinding, daarna fout
+    # - PGBOUNCER: true achter PgBouncer in transaction mode (geen
+    #   server-side prepared statements)
+    WEBSITE_DB_POOL_SIZE: int = int(os.getenv("WEBSITE_DB_POOL_SIZE", "5"))
+    WEBSITE_DB_MAX_OVERFLOW: int = int(os.getenv("WEBSITE_DB_MAX_OVERFLOW", "10"))
+    WEBSITE_DB_POOL_RECYCLE_SECONDS: int = int(
+        os.getenv("WEBSITE_DB_POOL_RECYCLE_SECONDS", "-1")
+    )
+    WEBSITE_DB_POOL_TIMEOUT_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_POOL_TIMEOUT_SECONDS", "30")
+    )
+    WEBSITE_DB_PGBOUNCER: bool = (
+        os.getenv("WEBSITE_DB_PGBOUNCER", "false").lower() == "true"
+    )
+
+    # Read replica voor read-only GET-endpoints (zie replica.py); leeg = alles
+    # naar de primary. Zelfde pool-instellingen als hierboven.
+    # - URL: asyncpg-URL, bv. postgresql+asyncpg://user:pw@replica:5432/casuse_hp_website
+    # - MAX_LAG_SECONDS: een replica die verder achterloopt wordt overgeslagen
+    # - CHECK_SECONDS: interval van de lag-/bereikbaarheidscheck
+    # - STICKY_SECONDS: na een schrijvende request leest dezelfde gebruiker
+    #   zo lang van de primary (read-your-writes, per worker)
+    # - CONNECT_TIMEOUT_SECONDS: daarna valt de request terug op de primary
+    WEBSITE_DB_REPLICA_URL: str = os.getenv("WEBSITE_DB_REPLICA_URL", "")
+    WEBSITE_DB_REPLICA_MAX_LAG_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_MAX_LAG_SECONDS", "5")
+    )
+    WEBSITE_DB_REPLICA_CHECK_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_CHECK_SECONDS", "2")
+    )
+    WEBSITE_DB_REPLICA_STICKY_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_STICKY_SECONDS", "15")
+    )
+    WEBSITE_DB_REPLICA_CONNECT_TIMEOUT_SECONDS: float = float(
+        os.getenv("WEBSITE_DB_REPLICA_CONNECT_TIMEOUT_SECONDS", "1")
+    )
+
     WEBSITE_BACKEND_PORT: int = int(os.getenv("WEBSITE_BACKEND_PORT", "8000"))
     WEBSITE_JWT_SECRET: str = os.getenv("WEBSITE_JWT_SECRET", "CHANGE_ME_LOCAL_ONLY")
     WEBSITE_JWT_ALGORITHM: str = os.getenv("WEBSITE_JWT_ALGORITHM", "HS256")
@@ -20,6 +60,105 @@ class Settings(BaseSettings):
         os.getenv("WEBSITE_REGISTRATION_TOKEN_TTL_MINUTES", "60")
     )
 
+    # Password hashing (bcrypt) in een aparte process pool:
+    # - WORKERS: aantal processen (≈ aantal cores dat je aan logins wil geven)
+    # - QUEUE_LIMIT: max. lopende + wachtende hash-taken; daarboven direct 503
+    # - TIMEOUT: max. seconden per taak (incl. wachttijd), daarna 503
+    WEBSITE_HASH_POOL_WORKERS: int = int(os.getenv("WEBSITE_HASH_POOL_WORKERS", "2"))
+    WEBSITE_HASH_QUEUE_LIMIT: int = int(os.getenv("WEBSITE_HASH_QUEUE_LIMIT", "32"))
+    WEBSITE_HASH_TIMEOUT_SECONDS: float = float(
+        os.getenv("WEBSITE_HASH_TIMEOUT_SECONDS", "5")
+    )
+    # bcrypt work factor (log2 van het aantal iteraties). Bepaal de waarde per
+    # hardware met `python -m benchmarks.calibrate_hashing`. Hashes met een
+    # andere cost (of een ander schema, bv. pbkdf2_sha256) worden bij de
+    # volgende geslaagde login herberekend.
+    WEBSITE_BCRYPT_ROUNDS: int = int(os.getenv("WEBSITE_BCRYPT_ROUNDS", "12"))
+
+    # Cache van geauthenticeerde klanten in get_current_user (per worker):
+    # - TTL: max. seconden dat een wijziging in een ándere worker onzichtbaar blijft
+    # - SIZE: max. aantal klanten in de cache (LRU)
+    WEBSITE_PRINCIPAL_CACHE_TTL_SECONDS: float = float(
+        os.getenv("WEBSITE_PRINCIPAL_CACHE_TTL_SECONDS", "30")
+    )
+    WEBSITE_PRINCIPAL_CACHE_SIZE: int = int(
+        os.getenv("WEBSITE_PRINCIPAL_CACHE_SIZE", "10000")
+    )
+
+    # Cache van geverifieerde JWT-claims (per worker, zie casuse_common.jwt_cache):
+    # een token wordt één keer geverifieerd en daarna tot `exp` (max. TTL) hergebruikt
+    WEBSITE_JWT_CACHE_SIZE: int = int(os.getenv("WEBSITE_JWT_CACHE_SIZE", "10000"))
+    WEBSITE_JWT_CACHE_TTL_SECONDS: float = float(
+        os.getenv("WEBSITE_JWT_CACHE_TTL_SECONDS", "300")
+    )
+
+    # Snapshot van /api/customer/portal/overview per klant (per worker).
+    # Portaaldata wordt buiten deze backend geschreven; de TTL is dus de
+    # maximale vertraging waarmee een wijziging zichtbaar wordt.
+    WEBSITE_PORTAL_OVERVIEW_TTL_SECONDS: float = float(
+        os.getenv("WEBSITE_PORTAL_OVERVIEW_TTL_SECONDS", "60")
+    )
+    WEBSITE_PORTAL_OVERVIEW_CACHE_SIZE: int = int(
+        os.getenv("WEBSITE_PORTAL_OVERVIEW_CACHE_SIZE", "10000")
+    )
+
+    # Admin-klantenlijst: tot zoveel rijen wordt het totaal exact geteld,
+    # daarboven komt het uit de planner-statistieken (total_exact=false)
+    WEBSITE_LIST_EXACT_COUNT_LIMIT: int = int(
+        os.getenv("WEBSITE_LIST_EXACT_COUNT_LIMIT", "10000")
+    )
+
+    # N+1-/trage-query-detector (casuse_common.query_audit), enkel voor
+    # dev en tests: header X-DB-Queries en een warning per request met
+    # herhaalde (>= REPEAT_THRESHOLD) of trage (>= SLOW_MS) statements
+    WEBSITE_QUERY_AUDIT_ENABLED: bool = (
+        os.getenv("WEBSITE_QUERY_AUDIT_ENABLED", "false").lower() == "true"
+    )
+    WEBSITE_QUERY_AUDIT_REPEAT_THRESHOLD: int = int(
+        os.getenv("WEBSITE_QUERY_AUDIT_REPEAT_THRESHOLD", "3")
+    )
+    WEBSITE_QUERY_AUDIT_SLOW_MS: float = float(
+        os.getenv("WEBSITE_QUERY_AUDIT_SLOW_MS", "100")
+    )
+
+    # Profiling op aanvraag (profiling.py): een admin-request met header
+    # X-Profile: 1 (of ?__profile=1) wordt met pyinstrument geprofiled
+    # - DIR/MAX_FILES: ring van speedscope-bestanden (per container)
+    # - INTERVAL_MS: sample-interval
+    WEBSITE_PROFILING_ENABLED: bool = (
+        os.getenv("WEBSITE_PROFILING_ENABLED", "true").lower() == "true"
+    )
+    WEBSITE_PROFILING_DIR: str = os.getenv(
+        "WEBSITE_PROFILING_DIR", "/tmp/website-profiles"
+    )
+    WEBSITE_PROFILING_MAX_FILES: int = int(
+        os.getenv("WEBSITE_PROFILING_MAX_FILES", "50")
+    )
+    WEBSITE_PROFILING_INTERVAL_MS: float = float(
+        os.getenv("WEBSITE_PROFILING_INTERVAL_MS", "1")
+    )
+
+    # Bulk import van klanten (/api/admin/customers/import):
+    # - BATCH_SIZE: rijen per multi-row INSERT + commit
+    # - MAX_ERRORS: max. aantal rij-fouten in het rapport (tellers blijven exact)
+    # - MAX_RECORD_LINES: langer loopt een CSV-record (quoted veld met
+    #   newlines) niet over; daarboven geldt de quote als niet afgesloten
+    WEBSITE_IMPORT_BATCH_SIZE: int = int(os.getenv("WEBSITE_IMPORT_BATCH_SIZE", "1000"))
+    WEBSITE_IMPORT_MAX_ERRORS: int = int(os.getenv("WEBSITE_IMPORT_MAX_ERRORS", "1000"))
+    WEBSITE_IMPORT_MAX_RECORD_LINES: int = int(
+        os.getenv("WEBSITE_IMPORT_MAX_RECORD_LINES", "50")
+    )
+
+    # Export (/api/admin/customers/export): rijen per fetch van de
+    # server-side cursor (en per chunk van de response)
+    WEBSITE_EXPORT_BATCH_SIZE: int = int(os.getenv("WEBSITE_EXPORT_BATCH_SIZE", "2000"))
+
+    # Bulk acties (/api/admin/customers/bulk/...): max. aantal klanten per
+    # aanroep (ids of filterresultaat), zodat één transactie begrensd blijft
+    WEBSITE_BULK_ACTION_MAX_CUSTOMERS: int = int(
+        os.getenv("WEBSITE_BULK_ACTION_MAX_CUSTOMERS", "1000")
+    )
+
     # Omgeving (optioneel, maar handig voor logging/config)
     WEBSITE_ENV: str = os.getenv("WEBSITE_ENV", "local")
 
@@ -31,6 +170,103 @@ class Settings(BaseSettings):
         "http://localhost:20190",
     )
 
+    # E-mail (outbox + email_worker.py). Requests schrijven enkel naar
+    # email_outbox; de worker verstuurt via SMTP (lokaal: MailHog).
+    # - ENABLED=false: de worker logt de mails i.p.v. ze te versturen
+    # - SMTP_TLS: STARTTLS na het verbinden
+    WEBSITE_EMAIL_ENABLED: bool = os.getenv("WEBSITE_EMAIL_ENABLED", "false").lower() == "true"
+    WEBSITE_EMAIL_FROM: str = os.getenv("WEBSITE_EMAIL_FROM", "no-reply@casuse.mx")
+    WEBSITE_SMTP_HOST: str = os.getenv("WEBSITE_SMTP_HOST", "localhost")
+    WEBSITE_SMTP_PORT: int = int(os.getenv("WEBSITE_SMTP_PORT", "1025"))
+    WEBSITE_SMTP_TLS: bool = os.getenv("WEBSITE_SMTP_TLS", "false").lower() == "true"
+    WEBSITE_SMTP_USERNAME: str = os.getenv("WEBSITE_SMTP_USERNAME", "")
+    WEBSITE_SMTP_PASSWORD: str = os.getenv("WEBSITE_SMTP_PASSWORD", "")
+    WEBSITE_SMTP_TIMEOUT_SECONDS: float = float(
+        os.getenv("WEBSITE_SMTP_TIMEOUT_SECONDS", "10")
+    )
+    # open SMTP-verbinding sluiten na zoveel seconden zonder mails
+    WEBSITE_SMTP_IDLE_SECONDS: float = float(os.getenv("WEBSITE_SMTP_IDLE_SECONDS", "30"))
+
+    # Worker:
+    # - BATCH_SIZE: mails per claim (één transactie, SKIP LOCKED)
+    # - POLL_SECONDS: wachttijd als de outbox leeg is
+    # - LEASE_SECONDS: zolang blijft een geclaimde mail gereserveerd; crasht de
+    #   worker tijdens het versturen, dan pakt een andere ze daarna opnieuw op
+    # - MAX_ATTEMPTS / RETRY_*: exponentiële backoff, daarna status=failed
+    # - RETENTION_DAYS: verstuurde en mislukte mails zolang na aanmaak bewaren
+    #   (de body bevat password-setup-links); PURGE_INTERVAL: seconden tussen
+    #   twee opruimbeurten
+    WEBSITE_EMAIL_BATCH_SIZE: int = int(os.getenv("WEBSITE_EMAIL_BATCH_SIZE", "50"))
+    WEBSITE_EMAIL_POLL_SECONDS: float = float(os.getenv("WEBSITE_EMAIL_POLL_SECONDS", "2"))
+    WEBSITE_EMAIL_LEASE_SECONDS: int = int(os.getenv("WEBSITE_EMAIL_LEASE_SECONDS", "300"))
+    WEBSITE_EMAIL_MAX_ATTEMPTS: int = int(os.getenv("WEBSITE_EMAIL_MAX_ATTEMPTS", "8"))
+    WEBSITE_EMAIL_RETRY_BASE_SECONDS: float = float(
+        os.getenv("WEBSITE_EMAIL_RETRY_BASE_SECONDS", "30")
+    )
+    WEBSITE_EMAIL_RETRY_MAX_SECONDS: float = float(
+        os.getenv("WEBSITE_EMAIL_RETRY_MAX_SECONDS", "3600")
+    )
+    WEBSITE_EMAIL_RETENTION_DAYS: int = int(os.getenv("WEBSITE_EMAIL_RETENTION_DAYS", "7"))
+    WEBSITE_EMAIL_PURGE_INTERVAL_SECONDS: float = float(
+        os.getenv("WEBSITE_EMAIL_PURGE_INTERVAL_SECONDS", "3600")
+    )
+
+    # Opruimen van registratietokens (token_reaper.py):
+    # - RETENTION_DAYS: tokens blijven minstens zolang na hun expires_at staan
+    # - BATCH_SIZE / PAUSE: rijen per DELETE-transactie en pauze ertussen
+    # - INTERVAL: seconden tussen twee runs (als de reaper blijft draaien)
+    # - ARCHIVE: verwijderde tokens (zonder tokenwaarde) naar
+    #   registration_tokens_archive i.p.v. ze enkel te verwijderen
+    WEBSITE_TOKEN_REAPER_RETENTION_DAYS: int = int(
+        os.getenv("WEBSITE_TOKEN_REAPER_RETENTION_DAYS", "30")
+    )
+    WEBSITE_TOKEN_REAPER_BATCH_SIZE: int = int(
+        os.getenv("WEBSITE_TOKEN_REAPER_BATCH_SIZE", "1000")
+    )
+    WEBSITE_TOKEN_REAPER_PAUSE_SECONDS: float = float(
+        os.getenv("WEBSITE_TOKEN_REAPER_PAUSE_SECONDS", "0.1")
+    )
+    WEBSITE_TOKEN_REAPER_INTERVAL_SECONDS: float = float(
+        os.getenv("WEBSITE_TOKEN_REAPER_INTERVAL_SECONDS", "3600")
+    )
+    WEBSITE_TOKEN_REAPER_ARCHIVE: bool = (
+        os.getenv("WEBSITE_TOKEN_REAPER_ARCHIVE", "false").lower() == "true"
+    )
+
+    # Rate limiting publieke auth-endpoints (zie ratelimit.py).
+    # Limieten als "<aantal>/<second|minute|hour|day>" (token bucket: burst
+    # van <aantal>, daarna aanvulling aan dat tempo).
+    WEBSITE_RATE_LIMIT_ENABLED: bool = (
+        os.getenv("WEBSITE_RATE_LIMIT_ENABLED", "true").lower() == "true"
+    )
+    # memory = per worker; redis = gedeeld (vereist het pakket `redis`)
+    WEBSITE_RATE_LIMIT_BACKEND: str = os.getenv("WEBSITE_RATE_LIMIT_BACKEND", "memory")
+    WEBSITE_RATE_LIMIT_REDIS_URL: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"
+    )
+    WEBSITE_RATE_LIMIT_MAX_KEYS: int = int(
+        os.getenv("WEBSITE_RATE_LIMIT_MAX_KEYS", "100000")
+    )
+    # enkel aanzetten achter een eigen reverse proxy die X-Forwarded-For zet
+    WEBSITE_RATE_LIMIT_TRUST_FORWARDED: bool = (
+        os.getenv("WEBSITE_RATE_LIMIT_TRUST_FORWARDED", "false").lower() == "true"
+    )
+    WEBSITE_RATE_LIMIT_LOGIN_PER_IP: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_LOGIN_PER_IP", "30/minute"
+    )
+    WEBSITE_RATE_LIMIT_LOGIN_PER_EMAIL: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_LOGIN_PER_EMAIL", "5/minute"
+    )
+    WEBSITE_RATE_LIMIT_REGISTER_PER_IP: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_REGISTER_PER_IP", "10/minute"
+    )
+    WEBSITE_RATE_LIMIT_REGISTER_PER_EMAIL: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_REGISTER_PER_EMAIL", "5/hour"
+    )
+    WEBSITE_RATE_LIMIT_PASSWORD_SETUP_PER_IP: str = os.getenv(
+        "WEBSITE_RATE_LIMIT_PASSWORD_SETUP_PER_IP", "30/minute"
+    )
+
     # CORS-origins voor de website-backend.
     # Default bevat:
     # - bestaande admin/frontends
@@ -58,5 +294,14 @@ class Settings(BaseSettings):
             f"{self.WEBSITE_DB_NAME}"
         )
 
+    @property
+    def SQLALCHEMY_ASYNC_DATABASE_URI(self) -> str:
+        return (
+            f"postgresql+asyncpg://{self.WEBSITE_DB_USER}:"
+            f"{self.WEBSITE_DB_PASSWORD}@"
+            f"{self.WEBSITE_DB_HOST}:{self.WEBSITE_DB_PORT}/"
+            f"{self.WEBSITE_DB_NAME}"
+        )
+
 
 settings = Settings()
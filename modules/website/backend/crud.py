@@ -1,36 +1,84 @@
+import json
 import secrets
 import uuid
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload, with_expression
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from models import (
+    Customer,
+    CustomerType,
+    RegistrationToken,
+    TokenReaperRun,
+    portal_status_expression,
+)
+from pagination import CustomerPage, SORT_KEYS, decode_cursor, encode_cursor
+from search import normalize_search_term, search_filter, search_rank
+from schemas import CustomerListItem, RegistrationRequest, CustomerUpdate
+from config import settings
+from hashing import password_hasher
+from cache import principal_cache
+from outbox import PASSWORD_RESET, PASSWORD_SETUP, PasswordEmail, queue_password_email
 
-from sqlalchemy import func, or_
-from sqlalchemy.orm import Session
 
-from models import Customer, CustomerType, RegistrationToken
-from schemas import RegistrationRequest, CustomerUpdate
-from config import settings
-from security import verify_password, get_password_hash
+class CustomerVersionConflict(Exception):
+    """De klant werd intussen door iemand anders gewijzigd (If-Match faalt)."""
+
+    def __init__(self, current_version: int) -> None:
+        super().__init__(f"Customer was modified (current version {current_version})")
+        self.current_version = current_version
+
+
+class EmailAlreadyRegistered(ValueError):
+    """Een andere klant heeft dit emailadres al (ux_customers_email_lower)."""
 
 
-def get_customer_by_email(db: Session, email: str) -> Optional[Customer]:
+def customer_by_email_statement(email: str):
     return (
-        db.query(Customer)
-        .filter(func.lower(Customer.email) == email.lower())
-        .first()
+        select(Customer)
+        .where(func.lower(Customer.email) == email.lower())
+        .limit(1)
     )
 
 
-def get_customer(db: Session, customer_id: uuid.UUID) -> Optional[Customer]:
-    return db.query(Customer).filter(Customer.id == customer_id).first()
+async def get_customer_by_email(db: AsyncSession, email: str) -> Optional[Customer]:
+    result = await db.execute(customer_by_email_statement(email))
+    return result.scalars().first()
+
+
+async def get_customer(db: AsyncSession, customer_id: uuid.UUID) -> Optional[Customer]:
+    # populate_existing: ook een klant die al in de sessie zit opnieuw laden,
+    # zodat computed_portal_status na een wijziging klopt.
+    result = await db.execute(
+        select(Customer)
+        .options(
+            with_expression(
+                Customer.computed_portal_status, portal_status_expression()
+            )
+        )
+        .where(Customer.id == customer_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
 
 
-def create_customer(
-    db: Session,
+def customer_values(
     registration: RegistrationRequest,
     hashed_password: Optional[str] = None,
     is_admin: bool = False,
-) -> Customer:
-    customer = Customer(
+) -> dict:
+    """
+    Kolomwaarden voor een nieuwe klant op basis van een registratie.
+    id/created_at/updated_at komen uit de kolom-defaults.
+    """
+    return dict(
         email=registration.email,
         hashed_password=hashed_password,
         first_name=registration.first_name,
@@ -51,166 +99,544 @@ def create_customer(
         address_postal_code=registration.address_postal_code,
         address_country=registration.address_country or "Mexico",
     )
+
+
+def build_customer(
+    registration: RegistrationRequest,
+    hashed_password: Optional[str] = None,
+    is_admin: bool = False,
+) -> Customer:
+    """
+    Nieuw Customer-object op basis van een registratie (zonder DB-I/O).
+    Gedeeld door de async API en het sync seed-script (initial_data).
+    """
+    return Customer(**customer_values(registration, hashed_password, is_admin))
+
+
+async def register_customer(
+    db: AsyncSession,
+    registration: RegistrationRequest,
+) -> Tuple[Customer, str]:
+    """
+    Nieuwe klant + registratietoken + password-setup mail (outbox), in één
+    transactie en één commit. Geeft (klant, token) terug.
+
+    Raises EmailAlreadyRegistered als het emailadres intussen bestaat.
+    """
+    customer = build_customer(registration)
+    customer.id = uuid.uuid4()
+    ttl_minutes = settings.WEBSITE_REGISTRATION_TOKEN_TTL_MINUTES
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
+    token_values = _registration_token_values(customer.id, expires_at)
+
     db.add(customer)
-    db.commit()
-    db.refresh(customer)
-    return customer
+    db.add(RegistrationToken(**token_values))
+    queue_password_email(
+        db,
+        PasswordEmail(PASSWORD_SETUP, customer.id, customer.email, token_values["token"]),
+    )
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise EmailAlreadyRegistered("Email already registered")
+    return customer, token_values["token"]
 
 
-def list_customers(
-    db: Session,
+async def issue_password_reset(
+    db: AsyncSession,
+    customer_id: uuid.UUID,
+    email: str,
+) -> str:
+    """
+    Oude tokens ongeldig, nieuw token en reset-mail (outbox), in één commit.
+    Geeft het nieuwe token terug.
+    """
+    await mark_all_tokens_used_for_customers(db, [customer_id])
+    token = (await insert_registration_tokens(db, [customer_id]))[customer_id]
+    queue_password_email(db, PasswordEmail(PASSWORD_RESET, customer_id, email, token))
+    await db.commit()
+    return token
+
+
+def customer_filters(
     search: Optional[str] = None,
     customer_type: Optional[CustomerType] = None,
-    skip: int = 0,
-    limit: int = 100,
     status: str = "active",
-    sort_by: str = "created_at",
-    sort_dir: str = "desc",
-) -> Tuple[List[Customer], int]:
+):
     """
-    Lijst klanten voor admin, met:
-    - status filter: active / inactive / all
-    - sortering: created_at|name + asc|desc
+    WHERE-voorwaarden voor de admin-lijst en de export, plus de
+    relevantie-expressie (None zonder zoekterm).
     """
-    query = db.query(Customer)
+    conditions = []
 
     # status filter
     if status == "inactive":
-        query = query.filter(Customer.is_active.is_(False))
+        conditions.append(Customer.is_active.is_(False))
     elif status == "all":
         # geen extra filter
         pass
     else:  # "active" of ongeldige waarde -> default naar active
-        query = query.filter(Customer.is_active.is_(True))
-
-    # zoekterm
-    if search:
-        term = f"%{search.lower()}%"
-        query = query.filter(
-            or_(
-                func.lower(Customer.first_name).like(term),
-                func.lower(Customer.last_name).like(term),
-                func.lower(Customer.email).like(term),
-                func.lower(func.coalesce(Customer.company_name, "")).like(term),
-            )
-        )
+        conditions.append(Customer.is_active.is_(True))
+
+    # zoekterm (trigram-index, accent-ongevoelig, zie search.py)
+    term = normalize_search_term(search) if search else ""
+    rank = None
+    if term:
+        rank = search_rank(term)
+        conditions.append(search_filter(term))
 
     # type filter
     if customer_type:
-        query = query.filter(Customer.customer_type == customer_type)
+        conditions.append(Customer.customer_type == customer_type)
+
+    return conditions, rank
 
-    total = query.count()
 
-    # sortering
+def _sort_columns(sort_by: str, rank=None):
+    """
+    Sorteersleutel per modus; `id` als laatste kolom maakt de volgorde uniek,
+    wat nodig is voor keyset-paginatie.
+    """
+    if sort_by == "relevance" and rank is not None:
+        return [rank, Customer.id]
     if sort_by == "name":
-        if sort_dir == "asc":
-            query = query.order_by(
-                Customer.last_name.asc(),
-                Customer.first_name.asc(),
-            )
+        return [Customer.last_name, Customer.first_name, Customer.id]
+    return [Customer.created_at, Customer.id]
+
+
+def customer_list_columns():
+    """Kolommen van CustomerListItem, in die volgorde."""
+    return [
+        Customer.id,
+        Customer.email,
+        Customer.first_name,
+        Customer.last_name,
+        Customer.customer_type,
+        Customer.is_active,
+        Customer.created_at,
+        Customer.company_name,
+        Customer.address_city,
+        Customer.address_state,
+        Customer.hashed_password.isnot(None).label("has_login"),
+        portal_status_expression().label("portal_status"),
+    ]
+
+
+class _ExplainJson(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) <statement>, met de bind-parameters van het statement."""
+
+    inherit_cache = False
+
+    def __init__(self, statement) -> None:
+        self.statement = statement
+
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def count_customers(db: AsyncSession, conditions) -> Tuple[int, bool]:
+    """
+    (total, exact) voor de admin-lijst.
+
+    Tellen stopt na WEBSITE_LIST_EXACT_COUNT_LIMIT + 1 rijen, zodat een
+    brede filter niet de hele tabel doorloopt. Zijn er meer, dan komt het
+    totaal uit de schatting van de planner (pg_statistic, bijgehouden door
+    (auto)ANALYZE) en is exact False; de UI toont dan bv. "~270.000".
+    """
+    cap = settings.WEBSITE_LIST_EXACT_COUNT_LIMIT
+    matching = select(literal(1)).select_from(Customer).where(*conditions)
+    counted = (
+        await db.execute(select(func.count()).select_from(matching.limit(cap + 1).subquery()))
+    ).scalar_one()
+    if counted <= cap:
+        return counted, True
+
+    plan = (await db.execute(_ExplainJson(matching))).scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    # we weten al dat het er meer dan `cap` zijn
+    return max(estimate, counted), False
+
+
+# deactivated_at staat in CustomerListItem maar is (nog) geen kolom -> null
+LIST_ITEM_FIELDS = tuple(CustomerListItem.__fields__)
+
+
+def customer_list_item(row) -> dict:
+    """Rij van customer_list_columns() als dict met de velden van CustomerListItem."""
+    item = {field: getattr(row, field, None) for field in LIST_ITEM_FIELDS}
+    # asyncpg geeft een subklasse van uuid.UUID terug, die orjson niet kent
+    item["id"] = str(row.id)
+    return item
+
+
+async def list_customers(
+    db: AsyncSession,
+    search: Optional[str] = None,
+    customer_type: Optional[CustomerType] = None,
+    limit: int = 100,
+    status: str = "active",
+    sort_by: str = "created_at",
+    sort_dir: str = "desc",
+    cursor: Optional[str] = None,
+) -> CustomerPage:
+    """
+    Lijst klanten voor admin, met:
+    - status filter: active / inactive / all
+    - zoeken: naam/email/bedrijf/RFC/stad, accent-ongevoelig, met relevantie
+    - sortering: created_at|name|relevance + asc|desc (altijd met id als tiebreaker);
+      relevance valt terug op created_at als er geen zoekterm is
+    - keyset-paginatie via `cursor` (geen OFFSET, dus diepe pagina's blijven snel)
+    - total: exact tot WEBSITE_LIST_EXACT_COUNT_LIMIT, daarboven een schatting
+      (total_exact=False), zie count_customers
+
+    De items zijn Rows met de kolommen van customer_list_columns() (plus
+    search_rank bij een zoekterm), geen Customer-entities.
+
+    Raises InvalidCursor als de cursor ongeldig is of niet bij de sortering past.
+    """
+    conditions, rank = customer_filters(search, customer_type, status)
+
+    total, total_exact = await count_customers(db, conditions)
+
+    # kale kolommen i.p.v. Customer-entities: geen description/hashed_password,
+    # geen identity map; portal_status in dezelfde query (geen N+1)
+    query = select(*customer_list_columns()).where(*conditions)
+    if rank is not None:
+        query = query.add_columns(rank.label("search_rank"))
+
+    if sort_by not in SORT_KEYS or (sort_by == "relevance" and rank is None):
+        sort_by = "created_at"
+    columns = _sort_columns(sort_by, rank)
+    descending = sort_dir != "asc"
+
+    # cursor: rijen strikt na (of vóór, bij backwards) de sleutel van de cursor
+    backwards = False
+    if cursor:
+        position = decode_cursor(cursor, sort_by, sort_dir)
+        backwards = position.backwards
+        row_key = tuple_(*columns)
+        cursor_key = tuple_(
+            *[literal(value, col.type) for col, value in zip(columns, position.values)]
+        )
+        if descending != backwards:
+            query = query.where(row_key < cursor_key)
         else:
-            query = query.order_by(
-                Customer.last_name.desc(),
-                Customer.first_name.desc(),
-            )
-    else:  # created_at (default)
-        if sort_dir == "asc":
-            query = query.order_by(Customer.created_at.asc())
+            query = query.where(row_key > cursor_key)
+
+    # bij backwards lezen we in omgekeerde volgorde en draaien daarna om
+    scan_desc = descending != backwards
+    query = query.order_by(*[col.desc() if scan_desc else col.asc() for col in columns])
+
+    rows = list((await db.execute(query.limit(limit + 1))).all())
+    has_more = len(rows) > limit
+    items = rows[:limit]
+    if backwards:
+        items.reverse()
+
+    next_cursor = None
+    prev_cursor = None
+    if items:
+        if backwards:
+            next_cursor = encode_cursor(items[-1], sort_by, sort_dir)
+            if has_more:
+                prev_cursor = encode_cursor(items[0], sort_by, sort_dir, backwards=True)
         else:
-            query = query.order_by(Customer.created_at.desc())
+            if has_more:
+                next_cursor = encode_cursor(items[-1], sort_by, sort_dir)
+            if cursor:
+                prev_cursor = encode_cursor(items[0], sort_by, sort_dir, backwards=True)
+
+    return CustomerPage(
+        items=items,
+        total=total,
+        total_exact=total_exact,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor,
+    )
+
 
-    items = query.offset(skip).limit(limit).all()
-    return items, total
+def customer_export_statement(
+    search: Optional[str] = None,
+    customer_type: Optional[CustomerType] = None,
+    status: str = "active",
+    sort_by: str = "created_at",
+    sort_dir: str = "desc",
+):
+    """
+    Zelfde filters en volgorde als list_customers, maar zonder paginatie en
+    als kale kolommen (geen ORM-entities): bedoeld om met yield_per te
+    streamen. Kolomnamen = velden van CustomerDetail, zonder hashed_password.
+    """
+    conditions, rank = customer_filters(search, customer_type, status)
+    if sort_by not in SORT_KEYS or (sort_by == "relevance" and rank is None):
+        sort_by = "created_at"
+    columns = _sort_columns(sort_by, rank)
+    descending = sort_dir != "asc"
 
+    return (
+        select(
+            Customer.id,
+            Customer.email,
+            Customer.first_name,
+            Customer.last_name,
+            Customer.phone_number,
+            Customer.customer_type,
+            Customer.description,
+            Customer.company_name,
+            Customer.tax_id,
+            Customer.address_street,
+            Customer.address_ext_number,
+            Customer.address_int_number,
+            Customer.address_neighborhood,
+            Customer.address_city,
+            Customer.address_state,
+            Customer.address_postal_code,
+            Customer.address_country,
+            Customer.is_active,
+            Customer.is_admin,
+            Customer.created_at,
+            Customer.updated_at,
+            Customer.hashed_password.isnot(None).label("has_login"),
+            portal_status_expression().label("portal_status"),
+        )
+        .where(*conditions)
+        .order_by(*[col.desc() if descending else col.asc() for col in columns])
+    )
 
-def create_registration_token(
-    db: Session,
-    customer: Customer,
-) -> RegistrationToken:
-    ttl_minutes = settings.WEBSITE_REGISTRATION_TOKEN_TTL_MINUTES
-    expires_at = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
 
-    token_value = secrets.token_urlsafe(32)
-    token = RegistrationToken(
-        customer_id=customer.id,
-        token=token_value,
+def _registration_token_values(customer_id: uuid.UUID, expires_at: datetime) -> dict:
+    return dict(
+        id=uuid.uuid4(),
+        customer_id=customer_id,
+        token=secrets.token_urlsafe(32),
         expires_at=expires_at,
         used=False,
+        created_at=datetime.now(timezone.utc),
     )
-    db.add(token)
-    db.commit()
-    db.refresh(token)
-    return token
 
 
-def get_registration_token(
-    db: Session,
+async def bulk_create_customers_with_tokens(
+    db: AsyncSession,
+    registrations: List[RegistrationRequest],
+) -> Dict[str, uuid.UUID]:
+    """
+    Batch-variant van create_customer + create_registration_token (bulk import).
+
+    Multi-row INSERTs in één transactie. Emails die al bestaan
+    (ux_customers_email_lower) worden overgeslagen via ON CONFLICT DO NOTHING.
+    Geeft {lower(email): customer_id} terug voor de effectief aangemaakte klanten.
+    """
+    if not registrations:
+        return {}
+
+    # Core-insert op de tabel (niet de ORM-bulk-insert): SQLAlchemy bundelt de
+    # rijen dan via "insertmanyvalues" in multi-row VALUES met één gecachte
+    # compilatie, ook met ON CONFLICT + RETURNING.
+    customers = Customer.__table__
+    result = await db.execute(
+        pg_insert(customers)
+        .on_conflict_do_nothing()
+        .returning(customers.c.id, customers.c.email),
+        [customer_values(registration) for registration in registrations],
+    )
+    created = {email.lower(): customer_id for customer_id, email in result.all()}
+
+    await insert_registration_tokens(db, list(created.values()))
+
+    await db.commit()
+    return created
+
+
+async def insert_registration_tokens(
+    db: AsyncSession,
+    customer_ids: List[uuid.UUID],
+) -> Dict[uuid.UUID, str]:
+    """
+    Eén nieuw registratietoken per klant, als één multi-row INSERT (zonder
+    commit). Geeft {customer_id: token} terug.
+    """
+    if not customer_ids:
+        return {}
+
+    ttl_minutes = settings.WEBSITE_REGISTRATION_TOKEN_TTL_MINUTES
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=ttl_minutes)
+    rows = [_registration_token_values(customer_id, expires_at) for customer_id in customer_ids]
+    await db.execute(insert(RegistrationToken.__table__), rows)
+    return {row["customer_id"]: row["token"] for row in rows}
+
+
+async def get_registration_token(
+    db: AsyncSession,
     token_str: str,
 ) -> Optional[RegistrationToken]:
-    return (
-        db.query(RegistrationToken)
-        .filter(RegistrationToken.token == token_str)
-        .first()
+    # klant meteen meeladen: lazy loading kan niet in een async sessie
+    result = await db.execute(
+        select(RegistrationToken)
+        .options(joinedload(RegistrationToken.customer))
+        .where(RegistrationToken.token == token_str)
     )
+    return result.scalars().first()
 
 
-def mark_registration_token_used(
-    db: Session,
-    token: RegistrationToken,
-) -> None:
-    token.used = True
-    db.add(token)
-    db.commit()
+async def complete_password_setup(
+    db: AsyncSession,
+    token_str: str,
+    hashed_password: str,
+) -> bool:
+    """
+    Zet het wachtwoord van de klant van `token_str` en markeert de token als
+    gebruikt, in één transactie. Geen load-modify-flush: een admin-wijziging
+    tijdens het hashen zou de flush op version laten falen (StaleDataError).
+    De token wordt enkel geclaimd als hij nog open en geldig is, zodat twee
+    gelijktijdige requests met dezelfde token niet allebei slagen. False als
+    de token intussen gebruikt of verlopen is.
+    """
+    now = datetime.now(timezone.utc)
+    customer_id = (
+        await db.execute(
+            update(RegistrationToken)
+            .where(
+                RegistrationToken.token == token_str,
+                RegistrationToken.used.is_(False),
+                RegistrationToken.expires_at >= now,
+            )
+            .values(used=True)
+            .returning(RegistrationToken.customer_id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalar_one_or_none()
+    if customer_id is None:
+        await db.rollback()
+        return False
+    await db.execute(
+        update(Customer)
+        .where(Customer.id == customer_id)
+        .values(
+            hashed_password=hashed_password,
+            updated_at=now,
+            version=Customer.version + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return True
+
+
+async def store_rehashed_password(
+    db: AsyncSession,
+    customer_id: uuid.UUID,
+    old_hash: str,
+    new_hash: str,
+) -> bool:
+    """
+    Vervangt een verouderde hash na een geslaagde login.
+
+    Enkel als de hash intussen niet gewijzigd is (bv. password-setup in een
+    andere request), en zonder de version te verhogen: het wachtwoord zelf
+    blijft hetzelfde, dus een ETag in de admin UI blijft geldig.
+    """
+    customers = Customer.__table__
+    result = await db.execute(
+        update(customers)
+        .where(customers.c.id == customer_id, customers.c.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
 
 
 # === Helpers voor admin password reset ===
 
 
-def mark_all_tokens_used_for_customer(db: Session, customer_id: uuid.UUID) -> None:
+async def mark_all_tokens_used_for_customers(
+    db: AsyncSession, customer_ids: List[uuid.UUID]
+) -> None:
     """
-    Zet alle nog niet-gebruikte tokens voor deze klant op used=True.
-    Hiermee zorgen we dat enkel de meest recente token nog 'geldig' is.
+    Zet alle nog niet-gebruikte tokens van deze klanten op used=True, in één
+    UPDATE en zonder commit (reset, deactiveren, bulk acties). Zo blijft enkel
+    een daarna uitgegeven token nog 'geldig'.
     """
-    (
-        db.query(RegistrationToken)
-        .filter(
-            RegistrationToken.customer_id == customer_id,
+    if not customer_ids:
+        return
+    await db.execute(
+        update(RegistrationToken)
+        .where(
+            RegistrationToken.customer_id.in_(customer_ids),
             RegistrationToken.used.is_(False),
         )
-        .update({"used": True}, synchronize_session=False)
+        .values(used=True)
+        .execution_options(synchronize_session=False)
     )
-    db.commit()
 
 
-def set_customer_password(
-    db: Session,
-    customer: Customer,
-    password: str,
-) -> Customer:
+async def lock_customers(
+    db: AsyncSession,
+    customer_ids: Optional[List[uuid.UUID]] = None,
+    conditions: Optional[list] = None,
+    limit: Optional[int] = None,
+):
     """
-    Zet/overschrijft het wachtwoord van een klant.
-    Wordt gebruikt bij password-setup én admin reset flows.
+    (id, email, is_active) van de gevraagde klanten (ids of filtervoorwaarden),
+    met FOR UPDATE tot het einde van de transactie. Vaste volgorde op id, zodat
+    twee gelijktijdige bulk acties elkaar niet kunnen deadlocken.
     """
-    customer.hashed_password = get_password_hash(password)
-    customer.updated_at = datetime.now(timezone.utc)
-    db.add(customer)
-    db.commit()
-    db.refresh(customer)
-    return customer
+    query = select(Customer.id, Customer.email, Customer.is_active)
+    if customer_ids is not None:
+        query = query.where(Customer.id.in_(customer_ids))
+    if conditions:
+        query = query.where(*conditions)
+    query = query.order_by(Customer.id).with_for_update()
+    if limit is not None:
+        query = query.limit(limit)
+    return (await db.execute(query)).all()
+
+
+async def set_customers_active(
+    db: AsyncSession,
+    customer_ids: List[uuid.UUID],
+    active: bool,
+) -> List[uuid.UUID]:
+    """
+    Zet is_active voor alle klanten in één UPDATE (zonder commit). Enkel rijen
+    die effectief wijzigen worden geraakt; hun ids komen terug via RETURNING.
+    """
+    if not customer_ids:
+        return []
+    result = await db.execute(
+        update(Customer)
+        .where(
+            Customer.id.in_(customer_ids),
+            Customer.is_active.is_(not active),
+        )
+        .values(
+            is_active=active,
+            updated_at=datetime.now(timezone.utc),
+            version=Customer.version + 1,
+        )
+        .returning(Customer.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
 
 
-def authenticate_customer(
-    db: Session,
+async def authenticate_customer(
+    db: AsyncSession,
     email: str,
     password: str,
 ) -> Optional[Customer]:
     """
     Helper (nu nog niet gebruikt in app.py): alleen actieve klanten met wachtwoord.
     """
-    customer = get_customer_by_email(db, email=email)
+    customer = await get_customer_by_email(db, email=email)
     if not customer or not customer.is_active or not customer.hashed_password:
         return None
-    if not verify_password(password, customer.hashed_password):
+    if not await password_hasher.verify(password, customer.hashed_password):
         return None
     return customer
 
@@ -218,78 +644,110 @@ def authenticate_customer(
 # === Update & soft delete voor admin ===
 
 
-def update_customer(
-    db: Session,
-    customer: Customer,
+async def update_customer(
+    db: AsyncSession,
+    customer_id: uuid.UUID,
     customer_in: CustomerUpdate,
-) -> Customer:
+    expected_version: Optional[int] = None,
+):
     """
     Partiële update: alleen velden die niet None zijn worden overschreven.
-    """
-    if customer_in.email is not None:
-        customer.email = customer_in.email
-
-    if customer_in.first_name is not None:
-        customer.first_name = customer_in.first_name
-    if customer_in.last_name is not None:
-        customer.last_name = customer_in.last_name
-    if customer_in.phone_number is not None:
-        customer.phone_number = customer_in.phone_number
-    if customer_in.customer_type is not None:
-        customer.customer_type = customer_in.customer_type
-    if customer_in.description is not None:
-        customer.description = customer_in.description
-
-    if customer_in.company_name is not None:
-        customer.company_name = customer_in.company_name
-    if customer_in.tax_id is not None:
-        customer.tax_id = customer_in.tax_id
-
-    if customer_in.address_street is not None:
-        customer.address_street = customer_in.address_street
-    if customer_in.address_ext_number is not None:
-        customer.address_ext_number = customer_in.address_ext_number
-    if customer_in.address_int_number is not None:
-        customer.address_int_number = customer_in.address_int_number
-    if customer_in.address_neighborhood is not None:
-        customer.address_neighborhood = customer_in.address_neighborhood
-    if customer_in.address_city is not None:
-        customer.address_city = customer_in.address_city
-    if customer_in.address_state is not None:
-        customer.address_state = customer_in.address_state
-    if customer_in.address_postal_code is not None:
-        customer.address_postal_code = customer_in.address_postal_code
-    if customer_in.address_country is not None:
-        customer.address_country = customer_in.address_country
-
-    if customer_in.is_active is not None:
-        customer.is_active = customer_in.is_active
-    if customer_in.is_admin is not None:
-        customer.is_admin = customer_in.is_admin
-
-    customer.updated_at = datetime.now(timezone.utc)
-    db.add(customer)
-    db.commit()
-    db.refresh(customer)
-    return customer
 
+    Eén UPDATE ... RETURNING (geen SELECT vooraf of refresh achteraf); de
+    rij komt terug met dezelfde attributen als CustomerDetail, inclusief
+    has_login en portal_status. Enkel actieve klanten.
 
-def soft_delete_customer(
-    db: Session,
-    customer: Customer,
-) -> Customer:
+    - expected_version: enkel updaten als customers.version nog zo is
+      (If-Match), anders CustomerVersionConflict
+
+    Geeft None terug als de klant niet bestaat of inactief is.
+    Raises EmailAlreadyRegistered als het nieuwe emailadres al in gebruik is.
     """
-    Soft delete: zet is_active=False en deactivated_at (als kolom bestaat) naar nu.
+    customers = Customer.__table__
+    conditions = [customers.c.id == customer_id, customers.c.is_active.is_(True)]
+    if expected_version is not None:
+        conditions.append(customers.c.version == expected_version)
+
+    values = customer_in.dict(exclude_none=True)
+    statement = (
+        update(customers)
+        .where(*conditions)
+        .values(
+            **values,
+            updated_at=datetime.now(timezone.utc),
+            version=customers.c.version + 1,
+        )
+        .returning(
+            *customers.c,
+            customers.c.hashed_password.isnot(None).label("has_login"),
+            portal_status_expression().label("portal_status"),
+        )
+    )
+    try:
+        row = (await db.execute(statement)).first()
+    except IntegrityError:
+        await db.rollback()
+        raise EmailAlreadyRegistered("Another customer with this email already exists")
+
+    if row is None:
+        await db.rollback()
+        if expected_version is None:
+            return None
+        # enkel in het foutpad: onderscheid tussen 404 en 412
+        current = (
+            await db.execute(
+                select(Customer.version).where(
+                    Customer.id == customer_id, Customer.is_active.is_(True)
+                )
+            )
+        ).scalar_one_or_none()
+        if current is None:
+            return None
+        raise CustomerVersionConflict(current)
+
+    await db.commit()
+    # na de commit: anders kan een parallel request de oude staat opnieuw cachen
+    principal_cache.invalidate(str(customer_id))
+    return row
+
+
+async def set_customer_active(
+    db: AsyncSession,
+    customer_id: uuid.UUID,
+    active: bool,
+) -> Optional[bool]:
+    """
+    Zet is_active van één klant in één UPDATE met version+1 (zonder commit),
+    zoals set_customers_active: geen load-modify-flush, dus geen StaleDataError
+    als de klant intussen door iemand anders gewijzigd werd. None als de klant
+    niet bestaat, anders of de rij effectief wijzigde.
+    """
+    if await set_customers_active(db, [customer_id], active):
+        return True
+    exists = (
+        await db.execute(select(Customer.id).where(Customer.id == customer_id))
+    ).scalar_one_or_none()
+    return False if exists is not None else None
+
+
+async def soft_delete_customer(
+    db: AsyncSession,
+    customer_id: uuid.UUID,
+) -> Optional[bool]:
     """
-    if not customer.is_active:
-        return customer
+    Soft delete: zet is_active=False (set-based, zie set_customer_active).
+    None als de klant niet bestaat, anders of hij nog actief was.
+    """
+    changed = await set_customer_active(db, customer_id, active=False)
+    if changed:
+        await db.commit()
+        principal_cache.invalidate(str(customer_id))
+    return changed
 
-    customer.is_active = False
-    if hasattr(customer, "deactivated_at"):
-        customer.deactivated_at = datetime.now(timezone.utc)
 
-    customer.updated_at = datetime.now(timezone.utc)
-    db.add(customer)
-    db.commit()
-    db.refresh(customer)
-    return customer
+async def list_token_reaper_runs(db: AsyncSession, limit: int = 48) -> List[TokenReaperRun]:
+    """Laatste runs van token_reaper.py, nieuwste eerst."""
+    result = await db.execute(
+        select(TokenReaperRun).order_by(TokenReaperRun.id.desc()).limit(limit)
+    )
+    return list(result.scalars().all())
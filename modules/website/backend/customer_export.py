@@ -0,0 +1,106 @@
+# modules/website/backend/customer_export.py
+"""
+Export van klanten (CSV of NDJSON) voor de admin.
+
+De rijen komen via een server-side cursor (AsyncSession.stream + yield_per)
+uit Postgres en worden per partitie als tekst weggeschreven: het geheugen
+blijft constant, ongeacht het aantal klanten. Er worden geen ORM-entities
+of Pydantic-modellen gebouwd; elke rij is een tuple met de kolommen uit
+crud.customer_export_statement.
+
+CSV gebruikt dezelfde kolomnamen als de bulk import (bulk_import.py), zodat
+een export opnieuw ingelezen kan worden.
+"""
+
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from config import settings
+from crud import customer_export_statement
+from database import AsyncSessionLocal
+from models import CustomerType
+
+
+EXPORT_FORMATS = ("csv", "ndjson")
+
+MEDIA_TYPES = {
+    "csv": "text/csv",  # Starlette voegt "; charset=utf-8" zelf toe
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _json_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        # str-enums (CustomerType) zijn ook str en worden als hun waarde geschreven
+        return value.value if isinstance(value, enum.Enum) else value
+    return _text(value)
+
+
+async def export_customers(
+    fmt: str,
+    search: Optional[str] = None,
+    customer_type: Optional[CustomerType] = None,
+    status: str = "active",
+    sort_by: str = "created_at",
+    sort_dir: str = "desc",
+) -> AsyncIterator[bytes]:
+    """
+    Body van de export als stroom bytes, één chunk per partitie van
+    WEBSITE_EXPORT_BATCH_SIZE rijen.
+
+    Opent een eigen sessie: de request-sessie (get_db) kan al gesloten zijn
+    terwijl de StreamingResponse nog loopt.
+    """
+    statement = customer_export_statement(
+        search=search,
+        customer_type=customer_type,
+        status=status,
+        sort_by=sort_by,
+        sort_dir=sort_dir,
+    ).execution_options(yield_per=settings.WEBSITE_EXPORT_BATCH_SIZE)
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement)
+        columns = list(result.keys())
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if fmt == "csv":
+            writer.writerow(columns)
+
+        async for partition in result.partitions():
+            if fmt == "csv":
+                writer.writerows([_text(value) for value in row] for row in partition)
+            else:
+                for row in partition:
+                    buffer.write(
+                        json.dumps(
+                            {name: _json_value(value) for name, value in zip(columns, row)},
+                            ensure_ascii=False,
+                            separators=(",", ":"),
+                        )
+                    )
+                    buffer.write("\n")
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+        # lege export: enkel de header
+        if buffer.tell():
+            yield buffer.getvalue().encode()
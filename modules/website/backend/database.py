@@ -1,12 +1,27 @@
+from casuse_common.db_pool import engine_options
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from config import settings
 
+
+def pool_options(url: str) -> dict:
+    return engine_options(
+        url,
+        pool_size=settings.WEBSITE_DB_POOL_SIZE,
+        max_overflow=settings.WEBSITE_DB_MAX_OVERFLOW,
+        pool_recycle=settings.WEBSITE_DB_POOL_RECYCLE_SECONDS,
+        pool_timeout=settings.WEBSITE_DB_POOL_TIMEOUT_SECONDS,
+        pgbouncer=settings.WEBSITE_DB_PGBOUNCER,
+    )
+
+
+# Sync engine: voor scripts en workers (manage.py, email_worker, benchmarks).
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
     future=True,
-    pool_pre_ping=True,
+    **pool_options(settings.SQLALCHEMY_DATABASE_URI),
 )
 
 SessionLocal = sessionmaker(
@@ -16,4 +31,39 @@ SessionLocal = sessionmaker(
     future=True,
 )
 
+# Async engine (asyncpg): voor alle API-routes, zodat een request geen
+# threadpool-slot bezet houdt terwijl het op Postgres wacht.
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    **pool_options(settings.SQLALCHEMY_ASYNC_DATABASE_URI),
+)
+
+# expire_on_commit=False: na een commit blijven attributen bruikbaar zonder
+# (in async onmogelijke) lazy refresh.
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Read replica (optioneel): enkel via replica.read_router / deps.get_read_db.
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.WEBSITE_DB_REPLICA_URL:
+    replica_options = pool_options(settings.WEBSITE_DB_REPLICA_URL)
+    replica_options["connect_args"] = {
+        **replica_options.get("connect_args", {}),
+        # kort: een onbereikbare replica mag een request niet lang ophouden
+        "timeout": settings.WEBSITE_DB_REPLICA_CONNECT_TIMEOUT_SECONDS,
+    }
+    replica_engine = create_async_engine(
+        settings.WEBSITE_DB_REPLICA_URL,
+        **replica_options,
+    )
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_engine,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 Base = declarative_base()
@@ -1,33 +1,66 @@
-from typing import Generator
+import time
+from typing import AsyncGenerator, Optional
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import SessionLocal
+from database import AsyncSessionLocal
 from security import decode_access_token
-from schemas import TokenData
+from schemas import Principal, TokenData
 from crud import get_customer_by_email
-from models import Customer
+from cache import principal_cache
+from replica import read_router
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/public/login")
 
 
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
+# methodes die niets schrijven; al de rest telt voor read-your-writes
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def principal_key(request: Request) -> Optional[str]:
+    """customer_id uit de bearer token, zonder die te valideren als gebruiker."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
     try:
+        return decode_access_token(token).get("customer_id")
+    except JWTError:
+        return None
+
+
+async def get_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Sessie op de primary. Een schrijvende request maakt de gebruiker sticky."""
+    if request.method not in READ_METHODS:
+        # vóór de handler: een GET die nog tijdens deze request binnenkomt
+        # moet de schrijfactie ook al zien
+        read_router.mark_write(principal_key(request))
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_current_user(
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessie voor handlers die enkel lezen: de read replica als die bruikbaar
+    is, anders de primary (zie replica.py). Nooit gebruiken om te schrijven.
+    """
+    async with read_router.session(principal_key(request)) as db:
+        yield db
+
+
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> Customer:
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Ingelogde klant als Principal. Eerst uit principal_cache (key = customer_id
+    uit de token); pas bij een miss de lower(email)-query. Wijzigingen aan een
+    klant (update, deactiveren, verwijderen) invalideren de cache-entry.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -47,15 +80,26 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = get_customer_by_email(db, token_data.email)
+    cache_key = token_data.customer_id
+    if cache_key:
+        principal = principal_cache.get(cache_key)
+        # email moet nog steeds kloppen: na een email-wijziging is de oude token ongeldig
+        if principal is not None and principal.email.lower() == token_data.email.lower():
+            return principal
+
+    loaded_at = time.monotonic()
+    user = await get_customer_by_email(db, token_data.email)
     if user is None or not user.is_active:
         raise credentials_exception
-    return user
+    principal = Principal.from_orm(user)
+    if cache_key == str(user.id):
+        principal_cache.set(cache_key, principal, loaded_at=loaded_at)
+    return principal
 
 
-def get_current_admin_user(
-    current_user: Customer = Depends(get_current_user),
-) -> Customer:
+async def get_current_admin_user(
+    current_user: Principal = Depends(get_current_user),
+) -> Principal:
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -0,0 +1,352 @@
+# modules/website/backend/email_worker.py
+"""
+Worker die email_outbox leegmaakt (zie outbox.py voor de request-kant).
+
+- claimt per keer WEBSITE_EMAIL_BATCH_SIZE mails met FOR UPDATE SKIP LOCKED
+  en zet er een lease op (next_attempt_at = nu + LEASE): meerdere workers
+  kunnen naast elkaar draaien zonder dezelfde mail te pakken, en er staat
+  geen transactie open tijdens de SMTP-I/O
+- verstuurt over één open SMTP-verbinding die tussen batches blijft staan
+  (geen connect/EHLO/STARTTLS/login per mail); na WEBSITE_SMTP_IDLE_SECONDS
+  zonder werk wordt ze gesloten
+- fouten: exponentiële backoff met jitter tot WEBSITE_EMAIL_MAX_ATTEMPTS,
+  permanente SMTP-fouten (5xx) meteen naar status=failed
+- at-least-once: crasht de worker tussen versturen en markeren, dan gaat de
+  mail na de lease opnieuw weg (zelfde Message-ID)
+- retentie: om de WEBSITE_EMAIL_PURGE_INTERVAL_SECONDS (en bij de start)
+  verwijdert de worker verstuurde en mislukte mails ouder dan
+  WEBSITE_EMAIL_RETENTION_DAYS, in batches met FOR UPDATE SKIP LOCKED zoals
+  token_reaper.py; zo blijven er geen setup-links in oude bodies staan
+
+Gebruik (vanuit modules/website/backend):
+
+    python email_worker.py          # blijft draaien (docker compose: website-email-worker)
+    python email_worker.py --once   # outbox één keer leegmaken en stoppen
+
+Lokaal testen: MailHog uit docker compose (SMTP op website-mailhog:1025, UI op
+http://localhost:20053), of een debugging SMTP-server op localhost:1025, bv.
+`python -m aiosmtpd -n -l localhost:1025` met WEBSITE_SMTP_HOST=localhost.
+Met WEBSITE_EMAIL_ENABLED=false worden de mails enkel gelogd.
+"""
+
+import argparse
+import logging
+import random
+import signal
+import smtplib
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formatdate
+from typing import List, Optional
+
+from sqlalchemy import delete, select, update
+
+from config import settings
+from database import SessionLocal
+from models import EmailOutbox
+
+
+logger = logging.getLogger("website-backend")
+
+outbox = EmailOutbox.__table__
+
+
+class SmtpTransport:
+    """Eén hergebruikte SMTP-verbinding."""
+
+    def __init__(self) -> None:
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(
+            settings.WEBSITE_SMTP_HOST,
+            settings.WEBSITE_SMTP_PORT,
+            timeout=settings.WEBSITE_SMTP_TIMEOUT_SECONDS,
+        )
+        smtp.ehlo()
+        if settings.WEBSITE_SMTP_TLS:
+            smtp.starttls()
+            smtp.ehlo()
+        if settings.WEBSITE_SMTP_USERNAME:
+            smtp.login(settings.WEBSITE_SMTP_USERNAME, settings.WEBSITE_SMTP_PASSWORD)
+        logger.info(
+            "SMTP connected to %s:%s",
+            settings.WEBSITE_SMTP_HOST,
+            settings.WEBSITE_SMTP_PORT,
+        )
+        return smtp
+
+    def send(self, message: EmailMessage) -> None:
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            self._smtp.send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # server heeft de (idle) verbinding gesloten: één keer opnieuw
+            self.close()
+            self._smtp = self._connect()
+            self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    def close_if_idle(self) -> None:
+        if (
+            self._smtp is not None
+            and time.monotonic() - self._last_used > settings.WEBSITE_SMTP_IDLE_SECONDS
+        ):
+            self.close()
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+
+class LogTransport:
+    """WEBSITE_EMAIL_ENABLED=false: mail loggen i.p.v. versturen."""
+
+    def send(self, message: EmailMessage) -> None:
+        logger.info(
+            "Email (not sent, WEBSITE_EMAIL_ENABLED=false) to %s: %s\n%s",
+            message["To"],
+            message["Subject"],
+            message.get_content(),
+        )
+
+    def close_if_idle(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+def build_message(row) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = settings.WEBSITE_EMAIL_FROM
+    message["To"] = row.recipient
+    message["Subject"] = row.subject
+    message["Date"] = formatdate(localtime=False)
+    # vast per outbox-rij: een herhaalde levering is herkenbaar als dezelfde mail
+    domain = settings.WEBSITE_EMAIL_FROM.rpartition("@")[2] or "casuse.mx"
+    message["Message-ID"] = f"<outbox.{row.id}@{domain}>"
+    message.set_content(row.body)
+    return message
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx-antwoorden van de SMTP-server: opnieuw proberen heeft geen zin."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code >= 500
+    return False
+
+
+def retry_delay(attempts: int) -> float:
+    delay = min(
+        settings.WEBSITE_EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.WEBSITE_EMAIL_RETRY_MAX_SECONDS,
+    )
+    # jitter, zodat mails die samen faalden niet samen opnieuw komen
+    return delay * random.uniform(0.8, 1.2)
+
+
+def claim_batch(limit: int) -> List:
+    """Reserveert tot `limit` verzendklare mails (lease) en geeft ze terug."""
+    now = datetime.now(timezone.utc)
+    due = (
+        select(outbox.c.id)
+        .where(outbox.c.status == "pending", outbox.c.next_attempt_at <= now)
+        .order_by(outbox.c.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    with SessionLocal() as db:
+        rows = db.execute(
+            update(outbox)
+            .where(outbox.c.id.in_(due.scalar_subquery()))
+            .values(
+                attempts=outbox.c.attempts + 1,
+                next_attempt_at=now + timedelta(seconds=settings.WEBSITE_EMAIL_LEASE_SECONDS),
+            )
+            .returning(
+                outbox.c.id,
+                outbox.c.recipient,
+                outbox.c.subject,
+                outbox.c.body,
+                outbox.c.attempts,
+            )
+        ).all()
+        db.commit()
+    return sorted(rows, key=lambda row: row.id)
+
+
+def record_results(sent_ids: List[int], failures: List[tuple]) -> None:
+    """Eén UPDATE voor alle verstuurde mails, één per mislukte."""
+    now = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        if sent_ids:
+            db.execute(
+                update(outbox)
+                .where(outbox.c.id.in_(sent_ids))
+                .values(status="sent", sent_at=now, last_error=None)
+            )
+        for row, error in failures:
+            give_up = is_permanent(error) or row.attempts >= settings.WEBSITE_EMAIL_MAX_ATTEMPTS
+            values = {"last_error": f"{type(error).__name__}: {error}"[:2000]}
+            if give_up:
+                values["status"] = "failed"
+            else:
+                values["next_attempt_at"] = now + timedelta(seconds=retry_delay(row.attempts))
+            db.execute(update(outbox).where(outbox.c.id == row.id).values(**values))
+            logger.warning(
+                "Email %s to %s failed (attempt %s%s): %s",
+                row.id,
+                row.recipient,
+                row.attempts,
+                ", giving up" if give_up else "",
+                error,
+            )
+        db.commit()
+
+
+# Echt verbindingsverlies: de hele rest van de batch wacht op backoff. Geen
+# kale OSError: smtplib.SMTPException is daar een subklasse van, en een
+# geweigerde ontvanger mag de andere mails niet meenemen.
+CONNECTION_LOST = (
+    smtplib.SMTPServerDisconnected,
+    smtplib.SMTPConnectError,
+    ConnectionError,
+    socket.timeout,
+)
+
+
+def process_batch(transport, rows: List) -> None:
+    sent_ids: List[int] = []
+    failures: List[tuple] = []
+    for index, row in enumerate(rows):
+        try:
+            transport.send(build_message(row))
+        except CONNECTION_LOST as e:
+            # server onbereikbaar: de rest van de batch niet elk apart laten
+            # time-outen, maar samen met backoff opnieuw inplannen
+            transport.close()
+            failures.extend((pending, e) for pending in rows[index:])
+            break
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException) as e:
+            # antwoord van de server over deze ene mail (geweigerde ontvanger,
+            # afzender of data): enkel deze rij faalt, de verbinding blijft
+            # bruikbaar (smtplib stuurt zelf een RSET)
+            failures.append((row, e))
+        except Exception as e:
+            failures.append((row, e))
+            if not is_permanent(e):
+                # verbinding in onbekende toestand: volgende mail op een nieuwe
+                transport.close()
+        else:
+            sent_ids.append(row.id)
+    record_results(sent_ids, failures)
+    logger.info("Email batch: %s sent, %s failed", len(sent_ids), len(failures))
+
+
+# rijen per DELETE-transactie bij het opruimen
+PURGE_BATCH_SIZE = 1000
+
+
+def purge_batch(db, cutoff: datetime, limit: int) -> int:
+    """Verwijdert tot `limit` afgehandelde mails van vóór `cutoff` (SKIP LOCKED)."""
+    doomed = (
+        select(outbox.c.id)
+        .where(outbox.c.status != "pending", outbox.c.created_at < cutoff)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    return db.execute(
+        delete(outbox).where(outbox.c.id.in_(doomed.scalar_subquery()))
+    ).rowcount
+
+
+def purge_old_emails(stop: Optional[threading.Event] = None) -> int:
+    stop = stop or threading.Event()
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.WEBSITE_EMAIL_RETENTION_DAYS
+    )
+    purged = 0
+    while not stop.is_set():
+        with SessionLocal() as db:
+            count = purge_batch(db, cutoff, PURGE_BATCH_SIZE)
+            db.commit()
+        purged += count
+        if count < PURGE_BATCH_SIZE:
+            break
+    if purged:
+        logger.info("Email outbox: %s sent/failed emails older than %s purged", purged, cutoff)
+    return purged
+
+
+def run(once: bool = False, stop: Optional[threading.Event] = None) -> None:
+    stop = stop or threading.Event()
+    transport = SmtpTransport() if settings.WEBSITE_EMAIL_ENABLED else LogTransport()
+    purge_interval = settings.WEBSITE_EMAIL_PURGE_INTERVAL_SECONDS
+    last_purge: Optional[float] = None
+    try:
+        while not stop.is_set():
+            now = time.monotonic()
+            if last_purge is None or now - last_purge >= purge_interval:
+                last_purge = now
+                try:
+                    purge_old_emails(stop)
+                except Exception:
+                    logger.exception("Could not purge old emails from the outbox")
+
+            try:
+                rows = claim_batch(settings.WEBSITE_EMAIL_BATCH_SIZE)
+            except Exception:
+                # bv. database nog niet bereikbaar of nog niet gemigreerd
+                logger.exception("Could not claim emails from the outbox")
+                if once:
+                    raise
+                stop.wait(settings.WEBSITE_EMAIL_POLL_SECONDS)
+                continue
+
+            if rows:
+                process_batch(transport, rows)
+                continue
+
+            transport.close_if_idle()
+            if once:
+                break
+            stop.wait(settings.WEBSITE_EMAIL_POLL_SECONDS)
+    finally:
+        transport.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="outbox één keer leegmaken en stoppen",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    stop = threading.Event()
+    # docker stop: lopende batch afwerken, dan stoppen
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run(once=args.once, stop=stop)
+
+
+if __name__ == "__main__":
+    main()
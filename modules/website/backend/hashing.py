@@ -0,0 +1,191 @@
+# modules/website/backend/hashing.py
+"""
+Begrensde process pool voor wachtwoord-hashing (bcrypt via passlib).
+
+bcrypt kost ~100-300 ms CPU per aanroep. Inline (of in de threadpool) laat een
+golf logins alle andere endpoints verhongeren. Hier draait hashing in een
+aparte, begrensde set processen met:
+
+- admission control: maximaal WEBSITE_HASH_QUEUE_LIMIT taken tegelijk
+  (lopend + wachtend); daarboven meteen HashingUnavailable -> 503
+- een timeout per taak, inclusief wachttijd in de wachtrij
+- metrics voor wachttijd in de queue en de eigenlijke hash-tijd
+- verify_and_update: verouderde hashes (pbkdf2_sha256 of een andere bcrypt
+  cost dan WEBSITE_BCRYPT_ROUNDS) worden bij login in dezelfde taak opnieuw
+  gehasht
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from config import settings
+from security import get_password_hash, verify_and_update_password, verify_password
+
+
+logger = logging.getLogger("website-backend")
+
+
+class HashingUnavailable(Exception):
+    """Pool zit vol of de taak duurde te lang; caller antwoordt met 503."""
+
+
+def _timed_verify(plain: str, hashed: str) -> Tuple[bool, float, float]:
+    started = time.time()
+    ok = verify_password(plain, hashed)
+    return ok, started, time.time()
+
+
+def _timed_verify_and_update(
+    plain: str, hashed: str
+) -> Tuple[Tuple[bool, Optional[str]], float, float]:
+    started = time.time()
+    result = verify_and_update_password(plain, hashed)
+    return result, started, time.time()
+
+
+def _timed_hash(password: str) -> Tuple[str, float, float]:
+    started = time.time()
+    hashed = get_password_hash(password)
+    return hashed, started, time.time()
+
+
+class _Histogram:
+    """Cumulatieve histogram (Prometheus-stijl buckets, in seconden)."""
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(self.BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, value)
+        for i, bound in enumerate(self.BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, object]:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(self.BUCKETS, self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        buckets["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.total, 6),
+            "avg_seconds": round(self.total / self.count, 6) if self.count else 0.0,
+            "max_seconds": round(self.max, 6),
+            "buckets": buckets,
+        }
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, queue_limit: int, timeout_seconds: float) -> None:
+        self.workers = workers
+        self.queue_limit = max(queue_limit, workers)
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # enkel aangepast vanuit de event loop, dus geen lock nodig
+        self._in_flight = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.rehashed = 0
+        self.queue_wait = _Histogram()
+        self.hash_time = _Histogram()
+
+    def start(self) -> None:
+        if self._executor is None:
+            # spawn i.p.v. fork: geen kopie van event loop/threads/DB-pools
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            logger.info(
+                "Password hashing pool started (workers=%s, queue_limit=%s)",
+                self.workers,
+                self.queue_limit,
+            )
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._submit(_timed_verify, plain, hashed)
+
+    async def verify_and_update(self, plain: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """
+        Zoals verify, maar geeft bij een geldige, verouderde hash meteen de
+        nieuwe hash mee (berekend in dezelfde taak, in de pool).
+        """
+        ok, new_hash = await self._submit(_timed_verify_and_update, plain, hashed)
+        if new_hash is not None:
+            self.rehashed += 1
+        return ok, new_hash
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_timed_hash, password)
+
+    async def _submit(self, fn, *args):
+        if self._in_flight >= self.queue_limit:
+            self.rejected += 1
+            raise HashingUnavailable("Password hashing queue is full")
+        self._in_flight += 1
+        try:
+            self.start()
+            submitted = time.time()
+            future = None
+            try:
+                future = self._executor.submit(fn, *args)
+                result, started, finished = await asyncio.wait_for(
+                    asyncio.wrap_future(future), timeout=self.timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                future.cancel()
+                self.timeouts += 1
+                raise HashingUnavailable("Password hashing timed out")
+            except BrokenProcessPool:
+                # worker gecrasht: pool opnieuw opbouwen bij de volgende taak
+                logger.exception("Password hashing pool broken, restarting")
+                self.shutdown()
+                raise HashingUnavailable("Password hashing pool restarted")
+            self.queue_wait.observe(started - submitted)
+            self.hash_time.observe(finished - started)
+            return result
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "in_flight": self._in_flight,
+            "rejected_total": self.rejected,
+            "timeouts_total": self.timeouts,
+            "rehashed_total": self.rehashed,
+            "bcrypt_rounds": settings.WEBSITE_BCRYPT_ROUNDS,
+            "queue_wait": self.queue_wait.snapshot(),
+            "hash_time": self.hash_time.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.WEBSITE_HASH_POOL_WORKERS,
+    queue_limit=settings.WEBSITE_HASH_QUEUE_LIMIT,
+    timeout_seconds=settings.WEBSITE_HASH_TIMEOUT_SECONDS,
+)
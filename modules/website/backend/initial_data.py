@@ -3,15 +3,21 @@ from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import CustomerType, Customer
 from schemas import RegistrationRequest
-from crud import create_customer, get_customer_by_email
+from crud import build_customer, customer_by_email_statement
 from security import get_password_hash
 
 
-def init_db() -> None:
+def init_db() -> int:
+    """
+    Seed-data voor een lege database (`python manage.py seed`, niet bij het
+    opstarten van de app). Draait bewust over de sync engine (SessionLocal),
+    zodat het ook buiten de event loop als script werkt. Geeft het aantal
+    aangemaakte klanten terug.
+    """
     db: Session = SessionLocal()
     try:
-        if db.query(Customer).count() > 0:
-            return
+        if db.query(Customer.id).first() is not None:
+            return 0
 
         password = "Test1234!"
         hashed = get_password_hash(password)
@@ -109,17 +115,21 @@ def init_db() -> None:
             ),
         ]
 
+        created = 0
         for i, reg in enumerate(seed_customers):
-            if get_customer_by_email(db, reg.email):
+            if db.execute(customer_by_email_statement(reg.email)).first():
                 continue
             is_admin = i == 0
-            create_customer(
-                db,
-                registration=reg,
-                hashed_password=hashed,
-                is_admin=is_admin,
+            db.add(
+                build_customer(
+                    reg,
+                    hashed_password=hashed,
+                    is_admin=is_admin,
+                )
             )
+            created += 1
 
         db.commit()
+        return created
     finally:
         db.close()
@@ -0,0 +1,66 @@
+# modules/website/backend/manage.py
+"""
+Beheertaken voor de website-backend: schema en seed-data.
+
+Draait één keer per deploy (docker compose: website-migrate), niet in elke
+uvicorn-worker: de app zelf schrijft bij het opstarten niets naar de
+database.
+
+Gebruik (vanuit modules/website/backend):
+
+    python manage.py migrate   # alembic upgrade head
+    python manage.py seed      # demo-klanten, enkel als customers leeg is
+    python manage.py setup     # migrate + seed (zo draait website-migrate)
+"""
+
+import argparse
+import logging
+import time
+
+from migrations import upgrade_to_head
+
+
+logger = logging.getLogger("website-backend")
+
+
+def migrate() -> None:
+    started = time.perf_counter()
+    upgrade_to_head()
+    logger.info("Database at head (%.1fs)", time.perf_counter() - started)
+
+
+def seed() -> None:
+    # pas hier importeren: seeden hasht een wachtwoord (bcrypt)
+    from initial_data import init_db
+
+    started = time.perf_counter()
+    created = init_db()
+    logger.info(
+        "Seed: %s customers created (%.1fs)", created, time.perf_counter() - started
+    )
+
+
+COMMANDS = {
+    "migrate": [migrate],
+    "seed": [seed],
+    "setup": [migrate, seed],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    # alembic.ini zet de root-logger op WARN (fileConfig in alembic/env.py)
+    logger.setLevel(logging.INFO)
+    for step in COMMANDS[args.command]:
+        step()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+# modules/website/backend/migrations.py
+"""
+Alembic vanuit Python aanroepen (scripts/benchmarks), los van de werkmap.
+In de container via `python manage.py setup` (docker compose: website-migrate).
+"""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+
+BACKEND_DIR = Path(__file__).resolve().parent
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return config
+
+
+def upgrade_to_head() -> None:
+    command.upgrade(alembic_config(), "head")
@@ -3,16 +3,24 @@ import uuid
 from datetime import datetime, timezone
 
 from sqlalchemy import (
+    BigInteger,
     Column,
     String,
     Boolean,
+    Integer,
     DateTime,
     Text,
     Enum,
     ForeignKey,
+    Index,
+    and_,
+    case,
+    func,
+    select,
+    text,
 )
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import object_session, query_expression, relationship
 
 from database import Base
 
@@ -63,12 +71,26 @@ class Customer(Base):
         onupdate=utcnow,
     )
 
+    # optimistic locking: +1 bij elke wijziging (ORM-flush via version_id_col,
+    # set-based UPDATEs in crud zetten het zelf); basis voor ETag/If-Match
+    version = Column(Integer, nullable=False, default=1, server_default=text("1"))
+
+    __mapper_args__ = {"version_id_col": version}
+
     registration_tokens = relationship(
         "RegistrationToken",
         back_populates="customer",
         cascade="all, delete-orphan",
     )
 
+    # Relevantie-score van de laatste zoekopdracht; enkel gevuld als de query
+    # via with_expression(Customer.search_rank, ...) geladen werd (zie search.py).
+    search_rank = query_expression()
+
+    # portal_status berekend in SQL (zie portal_status_expression); enkel
+    # gevuld als de query met with_expression geladen werd, anders None.
+    computed_portal_status = query_expression()
+
     # ─────────────────────────────────────────────
     # Extra helpers voor portal / login status
     # (geen nieuwe kolommen in de database)
@@ -96,10 +118,25 @@ class Customer(Base):
         """
         Handige helper om het meest recente registratietoken op te vragen.
         Kan None zijn als er geen tokens zijn.
+
+        Is de collectie niet al geladen, dan wordt enkel het laatste token
+        opgehaald (LIMIT 1 via ix_registration_tokens_customer_created) i.p.v.
+        alle tokens van de klant.
         """
-        if not self.registration_tokens:
+        if "registration_tokens" in self.__dict__:
+            if not self.registration_tokens:
+                return None
+            return max(self.registration_tokens, key=lambda t: t.created_at)
+
+        session = object_session(self)
+        if session is None:
             return None
-        return max(self.registration_tokens, key=lambda t: t.created_at)
+        return session.scalars(
+            select(RegistrationToken)
+            .where(RegistrationToken.customer_id == self.id)
+            .order_by(RegistrationToken.created_at.desc())
+            .limit(1)
+        ).first()
 
     @property
     def portal_status(self) -> str:
@@ -111,7 +148,14 @@ class Customer(Base):
         - "invited"             -> uitnodiging verstuurd, nog niet gebruikt en niet verlopen
         - "invitation_expired"  -> uitnodiging verstuurd, maar token is verlopen
         - "no_invitation"       -> geen uitnodiging/token gevonden
+
+        Lijst- en detailqueries laden deze waarde in SQL mee
+        (computed_portal_status), zodat registration_tokens niet per klant
+        lazy geladen moeten worden.
         """
+        if self.computed_portal_status is not None:
+            return self.computed_portal_status
+
         if self.has_portal_password and self.is_active:
             return "active"
 
@@ -133,6 +177,18 @@ class Customer(Base):
 
 class RegistrationToken(Base):
     __tablename__ = "registration_tokens"
+    __table_args__ = (
+        # meest recente token per klant (portal_status_expression)
+        Index("ix_registration_tokens_customer_created", "customer_id", "created_at"),
+        # openstaande tokens per klant (mark_all_tokens_used_for_customers)
+        Index(
+            "ix_registration_tokens_customer_unused",
+            "customer_id",
+            postgresql_where=text("used IS false"),
+        ),
+        # kandidaten voor token_reaper.py (lang verlopen tokens)
+        Index("ix_registration_tokens_expires_at", "expires_at"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     customer_id = Column(
@@ -151,3 +207,134 @@ class RegistrationToken(Base):
     @property
     def is_expired(self) -> bool:
         return self.expires_at < utcnow()
+
+
+class RegistrationTokenArchive(Base):
+    """
+    Opgeruimde registratietokens (token_reaper.py met
+    WEBSITE_TOKEN_REAPER_ARCHIVE=true). Zonder de tokenwaarde zelf: enkel
+    voor historiek/audit.
+    """
+
+    __tablename__ = "registration_tokens_archive"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    customer_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used = Column(Boolean, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+
+
+class TokenReaperRun(Base):
+    """Eén rij per run van token_reaper.py: opgeruimde rijen en tabelgrootte."""
+
+    __tablename__ = "token_reaper_runs"
+
+    id = Column(BigInteger, primary_key=True)
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    purged = Column(Integer, nullable=False)
+    archived = Column(Boolean, nullable=False)
+    batches = Column(Integer, nullable=False)
+    # registration_tokens na de run (pg_table_size / pg_indexes_size / n_live_tup)
+    table_bytes = Column(BigInteger, nullable=False)
+    index_bytes = Column(BigInteger, nullable=False)
+    live_rows = Column(BigInteger, nullable=False)
+
+
+class EmailOutbox(Base):
+    """
+    Uitgaande mails (transactional outbox): in dezelfde transactie geschreven
+    als de klant/het token waar ze over gaan, verstuurd door email_worker.py.
+    Een request doet dus nooit zelf mail-I/O.
+    """
+
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # wat de worker ophaalt: pending, oudste next_attempt_at eerst
+        Index(
+            "ix_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        # retentie: afgehandelde mails op aanmaakdatum (email_worker.purge_batch)
+        Index(
+            "ix_email_outbox_done_created",
+            "created_at",
+            postgresql_where=text("status <> 'pending'"),
+        ),
+    )
+
+    id = Column(BigInteger, primary_key=True)
+    # password_setup | password_reset
+    kind = Column(String(50), nullable=False)
+    # enkel ter referentie (geen FK: de mail blijft staan als de klant weg is)
+    customer_id = Column(UUID(as_uuid=True), nullable=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)
+
+    # pending | sent | failed
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, default=utcnow)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+
+# Indexen op customers. Schema-wijzigingen lopen via Alembic (alembic/versions);
+# hou deze declaraties gelijk met de migraties.
+#
+# De partiële indexen gebruiken letterlijk `is_active IS true`, net als het
+# filter in crud.list_customers (Customer.is_active.is_(True)): alleen dan
+# kan de planner ze gebruiken.
+Index("ux_customers_email_lower", func.lower(Customer.email), unique=True)
+Index("ix_customers_created_id", Customer.created_at, Customer.id)
+Index(
+    "ix_customers_active_created_id",
+    Customer.created_at,
+    Customer.id,
+    postgresql_where=text("is_active IS true"),
+)
+Index("ix_customers_name_id", Customer.last_name, Customer.first_name, Customer.id)
+Index(
+    "ix_customers_active_name_id",
+    Customer.last_name,
+    Customer.first_name,
+    Customer.id,
+    postgresql_where=text("is_active IS true"),
+)
+
+
+def portal_status_expression():
+    """
+    SQL-versie van Customer.portal_status, voor gebruik met
+    with_expression(Customer.computed_portal_status, ...).
+
+    De gecorreleerde subquery haalt per klant enkel het meest recente token op
+    (via ix_registration_tokens_customer_created), in dezelfde query als de
+    klanten zelf: één roundtrip per pagina, ongeacht het aantal rijen.
+    """
+    latest_token_status = (
+        select(
+            case(
+                (RegistrationToken.used.is_(True), "no_invitation"),
+                (RegistrationToken.expires_at < func.now(), "invitation_expired"),
+                else_="invited",
+            )
+        )
+        .where(RegistrationToken.customer_id == Customer.id)
+        .order_by(RegistrationToken.created_at.desc())
+        .limit(1)
+        .correlate(Customer)
+        .scalar_subquery()
+    )
+    return case(
+        (
+            and_(Customer.hashed_password.isnot(None), Customer.is_active.is_(True)),
+            "active",
+        ),
+        else_=func.coalesce(latest_token_status, "no_invitation"),
+    )
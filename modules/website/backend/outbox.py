@@ -0,0 +1,86 @@
+# modules/website/backend/outbox.py
+"""
+Mails in de outbox zetten (request-kant van email_worker.py).
+
+De mail wordt volledig opgemaakt op het moment van de wijziging en als rij
+in email_outbox toegevoegd aan de lopende transactie, zonder commit: de
+caller commit klant/token en mail samen. Er wordt hier nooit een
+SMTP-verbinding geopend.
+"""
+
+import uuid
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import EmailOutbox
+
+
+PASSWORD_SETUP = "password_setup"
+PASSWORD_RESET = "password_reset"
+
+# (onderwerp, tekst) per soort mail; klanten zijn Mexicaans, dus Spaans
+TEMPLATES = {
+    PASSWORD_SETUP: (
+        "Crea tu contraseña para el portal de Casuse",
+        "Hola,\n\n"
+        "Gracias por registrarte en Casuse. Para activar tu acceso al portal de "
+        "clientes, crea tu contraseña en el siguiente enlace:\n\n"
+        "{url}\n\n"
+        "El enlace es válido durante {ttl_minutes} minutos.\n\n"
+        "Casuse\n",
+    ),
+    PASSWORD_RESET: (
+        "Restablece tu contraseña del portal de Casuse",
+        "Hola,\n\n"
+        "Se solicitó un restablecimiento de tu contraseña para el portal de "
+        "clientes de Casuse. Elige una nueva contraseña en el siguiente enlace:\n\n"
+        "{url}\n\n"
+        "El enlace es válido durante {ttl_minutes} minutos. Si no solicitaste "
+        "este cambio, puedes ignorar este correo.\n\n"
+        "Casuse\n",
+    ),
+}
+
+
+class PasswordEmail(NamedTuple):
+    kind: str
+    customer_id: Optional[uuid.UUID]
+    recipient: str
+    token: str
+
+
+def password_setup_url(token: str) -> str:
+    base_url = settings.WEBSITE_PUBLIC_BASE_URL.rstrip("/")
+    return f"{base_url}/password-setup?token={token}"
+
+
+def _outbox_values(email: PasswordEmail) -> dict:
+    subject, body = TEMPLATES[email.kind]
+    return dict(
+        kind=email.kind,
+        customer_id=email.customer_id,
+        recipient=email.recipient,
+        subject=subject,
+        body=body.format(
+            url=password_setup_url(email.token),
+            ttl_minutes=settings.WEBSITE_REGISTRATION_TOKEN_TTL_MINUTES,
+        ),
+    )
+
+
+def queue_password_email(db: AsyncSession, email: PasswordEmail) -> None:
+    """Voegt de mail toe aan de sessie; wordt verstuurd na de commit van de caller."""
+    db.add(EmailOutbox(**_outbox_values(email)))
+
+
+async def queue_password_emails(db: AsyncSession, emails: List[PasswordEmail]) -> None:
+    """Zelfde als queue_password_email, als één multi-row INSERT (bulk acties)."""
+    if not emails:
+        return
+    await db.execute(
+        insert(EmailOutbox.__table__),
+        [_outbox_values(email) for email in emails],
+    )
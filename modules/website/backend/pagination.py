@@ -0,0 +1,94 @@
+# modules/website/backend/pagination.py
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional
+
+
+class InvalidCursor(ValueError):
+    """Cursor kon niet gedecodeerd worden of hoort bij een andere sortering."""
+
+
+class CursorPosition(NamedTuple):
+    values: List[Any]
+    backwards: bool
+
+
+class CustomerPage(NamedTuple):
+    items: list
+    total: int
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    # False: total is een schatting (meer dan WEBSITE_LIST_EXACT_COUNT_LIMIT rijen)
+    total_exact: bool = True
+
+
+# Per sorteermodus: welke sleutelvelden (in volgorde) de positie bepalen.
+# De laatste sleutel is altijd `id`, zodat de volgorde uniek is.
+SORT_KEYS = {
+    "created_at": ("created_at", "id"),
+    "name": ("last_name", "first_name", "id"),
+    "relevance": ("search_rank", "id"),
+}
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _from_json(key: str, value: Any) -> Any:
+    if key == "id":
+        return uuid.UUID(value)
+    if key == "created_at":
+        return datetime.fromisoformat(value)
+    if key == "search_rank":
+        return float(value)
+    if not isinstance(value, str):
+        raise InvalidCursor(f"Invalid value for {key}")
+    return value
+
+
+def encode_cursor(
+    row: Any,
+    sort_by: str,
+    sort_dir: str,
+    backwards: bool = False,
+) -> str:
+    """
+    Bouwt een opaque cursor op basis van de sorteersleutel van `row`.
+    `backwards=True` betekent: de pagina vóór deze rij opvragen.
+    """
+    keys = SORT_KEYS[sort_by]
+    payload = {
+        "s": sort_by,
+        "d": sort_dir,
+        "k": [_to_json(getattr(row, key)) for key in keys],
+        "b": backwards,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_dir: str) -> CursorPosition:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        keys = SORT_KEYS[sort_by]
+        if payload["s"] != sort_by or payload["d"] != sort_dir:
+            raise InvalidCursor("Cursor does not match the requested sort order")
+        raw_values = payload["k"]
+        if len(raw_values) != len(keys):
+            raise InvalidCursor("Cursor has the wrong number of keys")
+        values = [_from_json(key, value) for key, value in zip(keys, raw_values)]
+        return CursorPosition(values=values, backwards=bool(payload.get("b")))
+    except InvalidCursor:
+        raise
+    except (KeyError, TypeError, ValueError, binascii.Error, UnicodeError) as e:
+        raise InvalidCursor("Malformed cursor") from e
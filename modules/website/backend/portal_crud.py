@@ -2,48 +2,116 @@
 
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy import bindparam, select, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import portal_models
 
 
-def get_portal_status_for_customer(
-    db: Session, customer_id
+async def get_portal_status_for_customer(
+    db: AsyncSession, customer_id
 ) -> Optional[portal_models.PortalStatus]:
-    return (
-        db.query(portal_models.PortalStatus)
-        .filter(portal_models.PortalStatus.customer_id == customer_id)
-        .first()
+    result = await db.execute(
+        select(portal_models.PortalStatus)
+        .where(portal_models.PortalStatus.customer_id == customer_id)
+        .limit(1)
     )
+    return result.scalars().first()
 
 
-def get_portal_steps_for_status(
-    db: Session, status_id: int
+async def get_portal_steps_for_status(
+    db: AsyncSession, status_id: int
 ) -> List[portal_models.PortalStatusStep]:
-    return (
-        db.query(portal_models.PortalStatusStep)
-        .filter(portal_models.PortalStatusStep.status_id == status_id)
+    result = await db.execute(
+        select(portal_models.PortalStatusStep)
+        .where(portal_models.PortalStatusStep.status_id == status_id)
         .order_by(portal_models.PortalStatusStep.order_index.asc())
-        .all()
     )
+    return list(result.scalars().all())
 
 
-def get_portal_documents_for_customer(
-    db: Session, customer_id
+async def get_portal_documents_for_customer(
+    db: AsyncSession, customer_id
 ) -> List[portal_models.PortalDocument]:
-    return (
-        db.query(portal_models.PortalDocument)
-        .filter(portal_models.PortalDocument.customer_id == customer_id)
+    result = await db.execute(
+        select(portal_models.PortalDocument)
+        .where(portal_models.PortalDocument.customer_id == customer_id)
         .order_by(portal_models.PortalDocument.created_at.desc())
-        .all()
     )
+    return list(result.scalars().all())
 
 
-def get_portal_representative_for_customer(
-    db: Session, customer_id
+async def get_portal_representative_for_customer(
+    db: AsyncSession, customer_id
 ) -> Optional[portal_models.PortalRepresentative]:
-    return (
-        db.query(portal_models.PortalRepresentative)
-        .filter(portal_models.PortalRepresentative.customer_id == customer_id)
-        .first()
+    result = await db.execute(
+        select(portal_models.PortalRepresentative)
+        .where(portal_models.PortalRepresentative.customer_id == customer_id)
+        .limit(1)
     )
+    return result.scalars().first()
+
+
+# Volledig portaaloverzicht van één klant in één roundtrip, als JSON opgebouwd
+# in Postgres (status + stappen, documenten, vertegenwoordiger). Gebruikt
+# dezelfde indexen als de losse functies hierboven.
+PORTAL_OVERVIEW_SQL = text(
+    """
+    SELECT json_build_object(
+        'status', (
+            SELECT json_build_object(
+                'id', s.id,
+                'overall_status', s.overall_status,
+                'progress_percent', s.progress_percent,
+                'last_updated', s.last_updated,
+                'steps', COALESCE((
+                    SELECT json_agg(json_build_object(
+                        'id', st.id,
+                        'label', st.label,
+                        'description', st.description,
+                        'completed', st.completed,
+                        'current', st.current
+                    ) ORDER BY st.order_index)
+                    FROM portal_status_steps st
+                    WHERE st.status_id = s.id
+                ), '[]'::json)
+            )
+            FROM portal_statuses s
+            WHERE s.customer_id = :customer_id
+            LIMIT 1
+        ),
+        'documents', COALESCE((
+            SELECT json_agg(json_build_object(
+                'id', d.id,
+                'type', d.type,
+                'label', d.label,
+                'created_at', d.created_at,
+                'download_url', d.download_url
+            ) ORDER BY d.created_at DESC)
+            FROM portal_documents d
+            WHERE d.customer_id = :customer_id
+        ), '[]'::json),
+        'representative', (
+            SELECT json_build_object(
+                'id', r.id,
+                'full_name', r.full_name,
+                'email', r.email,
+                'phone', r.phone
+            )
+            FROM portal_representatives r
+            WHERE r.customer_id = :customer_id
+            LIMIT 1
+        )
+    )::text
+    """
+).bindparams(bindparam("customer_id", type_=UUID(as_uuid=True)))
+
+
+async def get_portal_overview_json(db: AsyncSession, customer_id) -> str:
+    """
+    Ruwe JSON-tekst van het overzicht (snake_case, zoals de tabellen);
+    portal_overview.py zet dit om naar PortalOverviewResponse.
+    """
+    result = await db.execute(PORTAL_OVERVIEW_SQL, {"customer_id": customer_id})
+    return result.scalar_one()
@@ -9,6 +9,7 @@ from sqlalchemy import (
     Integer,
     String,
     ForeignKey,
+    Index,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -48,6 +49,10 @@ class PortalStatusStep(Base):
     """
 
     __tablename__ = "portal_status_steps"
+    __table_args__ = (
+        # stappen per status, in volgorde (get_portal_steps_for_status)
+        Index("ix_portal_status_steps_status_order", "status_id", "order_index"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     status_id = Column(
@@ -73,9 +78,13 @@ class PortalDocument(Base):
     """
 
     __tablename__ = "portal_documents"
+    __table_args__ = (
+        # documenten per klant, nieuwste eerst (get_portal_documents_for_customer)
+        Index("ix_portal_documents_customer_created", "customer_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    customer_id = Column(UUID(as_uuid=True), index=True, nullable=False)
+    customer_id = Column(UUID(as_uuid=True), nullable=False)
 
     # OFFER | ORDER | INVOICE | OTHER
     type = Column(String, nullable=False, default="OTHER")
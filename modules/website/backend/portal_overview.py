@@ -0,0 +1,153 @@
+# modules/website/backend/portal_overview.py
+"""
+Portaaloverzicht per klant als kant-en-klare JSON met een sterke ETag.
+
+- één query (portal_crud.get_portal_overview_json) i.p.v. vier
+- het resultaat wordt per klant in portal_overview_cache bewaard als bytes +
+  ETag; zolang de snapshot vers is, raakt een request Postgres niet
+- na het verlopen van de TTL wordt opnieuw gelezen; is de dossierdata
+  ongewijzigd, dan blijven body en ETag identiek, zodat pollende clients
+  304 blijven krijgen
+"""
+
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import portal_crud
+import portal_schemas
+from cache import portal_overview_cache
+
+
+OVERALL_STATUSES = {"NOT_STARTED", "IN_PROGRESS", "ON_HOLD", "COMPLETED"}
+DOCUMENT_TYPES = {"OFFER", "ORDER", "INVOICE", "OTHER"}
+
+
+class OverviewSnapshot(NamedTuple):
+    body: bytes
+    etag: str
+    # hash van de ruwe DB-data, om na de TTL te zien of er iets veranderd is
+    source_hash: str
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def build_overview(data: dict) -> portal_schemas.PortalOverviewResponse:
+    """
+    Ruwe overzichtsdata (zie PORTAL_OVERVIEW_SQL) naar het response-schema,
+    met dezelfde normalisaties als voorheen per endpoint-aanroep.
+    """
+    status_row = data.get("status")
+    if status_row:
+        steps = status_row["steps"]
+        current_step_id = next((step["id"] for step in steps if step["current"]), None)
+        status = portal_schemas.PortalStatus(
+            overallStatus=status_row["overall_status"]
+            if status_row["overall_status"] in OVERALL_STATUSES
+            else "IN_PROGRESS",
+            progressPercent=max(0, min(100, status_row["progress_percent"])),
+            currentStepId=current_step_id,
+            steps=[
+                portal_schemas.StatusStep(
+                    id=step["id"],
+                    label=step["label"],
+                    description=step["description"],
+                    completed=step["completed"],
+                    current=step["current"],
+                )
+                for step in steps
+            ],
+            lastUpdated=status_row["last_updated"],
+        )
+    else:
+        # Default als er nog geen statusrecord is
+        status = portal_schemas.PortalStatus(
+            overallStatus="NOT_STARTED",
+            progressPercent=0,
+            currentStepId=None,
+            steps=[],
+            lastUpdated=datetime.utcnow(),
+        )
+
+    documents = [
+        portal_schemas.PortalDocument(
+            id=doc["id"],
+            type=doc["type"] if doc["type"] in DOCUMENT_TYPES else "OTHER",
+            label=doc["label"],
+            createdAt=doc["created_at"],
+            downloadUrl=doc["download_url"],
+        )
+        for doc in data.get("documents") or []
+    ]
+
+    rep = data.get("representative")
+    representative = (
+        portal_schemas.Representative(
+            id=rep["id"],
+            fullName=rep["full_name"],
+            email=rep["email"],
+            phone=rep["phone"],
+        )
+        if rep
+        else None
+    )
+
+    return portal_schemas.PortalOverviewResponse(
+        status=status,
+        documents=documents,
+        representative=representative,
+    )
+
+
+async def get_overview_snapshot(db: AsyncSession, customer_id) -> OverviewSnapshot:
+    key = str(customer_id)
+    snapshot = portal_overview_cache.get(key)
+    if snapshot is not None:
+        return snapshot
+
+    loaded_at = time.monotonic()
+    raw = await portal_crud.get_portal_overview_json(db, customer_id)
+    source_hash = _sha256(raw.encode())
+
+    previous = portal_overview_cache.peek(key)
+    if previous is not None and previous.source_hash == source_hash:
+        # niets gewijzigd: zelfde bytes en ETag hergebruiken
+        snapshot = previous
+    else:
+        body = build_overview(json.loads(raw)).json(separators=(",", ":")).encode()
+        snapshot = OverviewSnapshot(
+            body=body,
+            etag=f'"{_sha256(body)[:32]}"',
+            source_hash=source_hash,
+        )
+    portal_overview_cache.set(key, snapshot, loaded_at=loaded_at)
+    return snapshot
+
+
+def invalidate_portal_overview(customer_id) -> None:
+    """
+    Aanroepen na elke wijziging aan portaaldata van deze klant (status,
+    stappen, documenten, vertegenwoordiger) die via deze backend loopt.
+    """
+    portal_overview_cache.invalidate(str(customer_id))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match-vergelijking (RFC 9110: weak comparison, `*` matcht alles)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
@@ -0,0 +1,216 @@
+# modules/website/backend/profiling.py
+"""
+Profiling op aanvraag van één request (sampling profiler, pyinstrument).
+
+Een admin zet op een trage request de header `X-Profile: 1` (of de
+query-parameter `__profile=1`); enkel die request wordt geprofiled en het
+resultaat komt als speedscope-bestand in WEBSITE_PROFILING_DIR, met tijdstip
+en route in de naam:
+
+    20261017T101512123Z_GET_api-admin-customers_1234.speedscope.json
+
+- enkel voor admins: de bearer token moet geldig zijn met is_admin; voor
+  anderen wordt de trigger stil genegeerd
+- de response krijgt X-Profile-Id met de bestandsnaam; ophalen via
+  GET /api/admin/profiles/{name} en openen op https://www.speedscope.app
+- ring op schijf: hooguit WEBSITE_PROFILING_MAX_FILES bestanden, de oudste
+  verdwijnen eerst
+- één profiel tegelijk per worker; een trigger tijdens een lopend profiel
+  wordt genegeerd (skipped_busy)
+- zonder trigger: één blik op de headers en de query string, verder niets;
+  pyinstrument wordt pas bij het eerste profiel geïmporteerd
+
+bcrypt draait in de process pool (hashing.py): in het profiel is dat
+wachttijd ([await]) in password_hasher, niet de hash zelf.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from casuse_common.routing import route_template
+from jose import JWTError
+
+from config import settings
+from security import decode_access_token
+
+
+logger = logging.getLogger("website-backend")
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY = "__profile"
+FILE_SUFFIX = ".speedscope.json"
+# bestandsnamen die de admin-endpoints aannemen (geen paden)
+PROFILE_NAME = re.compile(r"^[\w.-]+\.speedscope\.json$")
+_SLUG = re.compile(r"[^A-Za-z0-9]+")
+
+OFF_VALUES = {"", "0", "false", "no"}
+
+
+def _triggered(scope) -> bool:
+    query_string = scope.get("query_string", b"")
+    if PROFILE_QUERY.encode() in query_string:
+        values = parse_qs(query_string.decode("latin-1")).get(PROFILE_QUERY)
+        if values and values[-1].lower() not in OFF_VALUES:
+            return True
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1").strip().lower() not in OFF_VALUES
+    return False
+
+
+def _is_admin(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return False
+            try:
+                return decode_access_token(token).get("is_admin") is True
+            except JWTError:
+                return False
+    return False
+
+
+class ProfileStore:
+    """Ring van speedscope-bestanden in één map (oudste eerst weg)."""
+
+    def __init__(self, directory: str, max_files: int) -> None:
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def new_name(self, method: str, route: str) -> str:
+        now = datetime.now(timezone.utc)
+        # sorteert chronologisch; pid tegen botsingen tussen workers
+        stamp = now.strftime("%Y%m%dT%H%M%S") + f"{now.microsecond // 1000:03d}Z"
+        slug = _SLUG.sub("-", route).strip("-") or "root"
+        return f"{stamp}_{method}_{slug}_{os.getpid()}{FILE_SUFFIX}"
+
+    def save(self, name: str, content: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{name}.tmp"
+        tmp.write_text(content, encoding="utf-8")
+        tmp.replace(self.directory / name)
+        self._prune()
+
+    def _prune(self) -> None:
+        files = sorted(self.directory.glob(f"*{FILE_SUFFIX}"))
+        for path in files[: max(len(files) - self.max_files, 0)]:
+            path.unlink(missing_ok=True)
+
+    def path_for(self, name: str) -> Optional[Path]:
+        if not PROFILE_NAME.match(name):
+            return None
+        path = self.directory / name
+        return path if path.is_file() else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        if not self.directory.is_dir():
+            return []
+        items = []
+        for path in sorted(self.directory.glob(f"*{FILE_SUFFIX}"), reverse=True):
+            stat = path.stat()
+            items.append(
+                {
+                    "name": path.name,
+                    "size_bytes": stat.st_size,
+                    "created_at": datetime.fromtimestamp(stat.st_mtime, timezone.utc),
+                }
+            )
+        return items
+
+
+class RequestProfiler:
+    def __init__(self, store: ProfileStore, interval: float = 0.001) -> None:
+        self.store = store
+        self.interval = interval
+        self.active = False
+        self.profiles_written = 0
+        self.skipped_busy = 0
+        self.failed = 0
+
+    async def profile(self, app, scope, receive, send, name: str) -> None:
+        from pyinstrument import Profiler
+
+        self.active = True
+        profiler = Profiler(interval=self.interval, async_mode="enabled")
+        started = time.perf_counter()
+        try:
+            profiler.start()
+            await app(scope, receive, send)
+        finally:
+            if profiler.is_running:
+                profiler.stop()
+            self.active = False
+            # ook een request die faalde levert een profiel op
+            if profiler.last_session is not None:
+                await self._store(profiler, name, time.perf_counter() - started)
+
+    async def _store(self, profiler, name: str, elapsed: float) -> None:
+        from pyinstrument.renderers import SpeedscopeRenderer
+
+        loop = asyncio.get_running_loop()
+        try:
+            # renderen en schrijven buiten de event loop; de response is al weg
+            content = await loop.run_in_executor(None, profiler.output, SpeedscopeRenderer())
+            await loop.run_in_executor(None, self.store.save, name, content)
+        except Exception:
+            self.failed += 1
+            logger.exception("Could not store profile %s", name)
+        else:
+            self.profiles_written += 1
+            logger.info("Profiled request (%.0f ms): %s", elapsed * 1000, name)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self.active,
+            "profiles_written": self.profiles_written,
+            "skipped_busy": self.skipped_busy,
+            "failed": self.failed,
+            "max_files": self.store.max_files,
+            "interval_ms": self.interval * 1000,
+        }
+
+
+class ProfilingMiddleware:
+    """Pure ASGI: profilet enkel requests met de trigger van een admin."""
+
+    def __init__(self, app, fastapi_app, profiler: RequestProfiler) -> None:
+        self.app = app
+        self.fastapi_app = fastapi_app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _triggered(scope) or not _is_admin(scope):
+            return await self.app(scope, receive, send)
+        if self.profiler.active:
+            self.profiler.skipped_busy += 1
+            return await self.app(scope, receive, send)
+
+        name = self.profiler.store.new_name(
+            scope["method"], route_template(self.fastapi_app, scope)
+        )
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", name.encode())
+                ]
+            await send(message)
+
+        await self.profiler.profile(self.app, scope, receive, send_wrapper, name)
+
+
+request_profiler = RequestProfiler(
+    ProfileStore(
+        settings.WEBSITE_PROFILING_DIR,
+        max_files=settings.WEBSITE_PROFILING_MAX_FILES,
+    ),
+    interval=settings.WEBSITE_PROFILING_INTERVAL_MS / 1000,
+)
@@ -0,0 +1,325 @@
+# modules/website/backend/ratelimit.py
+"""
+Rate limiting voor de publieke auth-endpoints (login, registratie,
+password-setup).
+
+- token buckets per IP en, voor login/registratie, per emailadres
+  (uit de JSON-body); een bucket van "10/minute" laat een burst van 10 toe
+  en vult daarna aan met 10 per minuut
+- een request kost een token uit elke bucket van zijn regel, maar enkel als
+  ze allemaal nog een token hebben: wie op het emailadres geweigerd wordt,
+  verbruikt ook zijn IP-budget niet
+- login/registratie zonder leesbaar emailadres omdat de body groter is dan
+  MAX_INSPECTED_BODY: 413, anders zou opvullen de limiet per email omzeilen
+- als pure ASGI-middleware vóór FastAPI: een geweigerde request kost geen
+  routing, geen Pydantic-validatie, geen DB-query en zeker geen bcrypt
+- backends:
+  - MemoryBackend (default): per worker, begrensd aantal sleutels (LRU)
+  - RedisBackend: gedeeld tussen workers/containers (atomair via een
+    Lua-script); vereist het optionele pakket `redis`. Is Redis even niet
+    bereikbaar, dan valt de limiter terug op het geheugen van de worker.
+"""
+
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+from config import settings
+
+
+logger = logging.getLogger("website-backend")
+
+PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+
+# maximale body die we lezen om het emailadres te vinden (login/registratie)
+MAX_INSPECTED_BODY = 16 * 1024
+
+
+class Limit(NamedTuple):
+    capacity: float
+    refill_per_second: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Limit":
+        """'10/minute' -> burst van 10, aanvulling 10 per minuut."""
+        count, _, period = value.partition("/")
+        if period not in PERIODS:
+            raise ValueError(f"Invalid rate limit {value!r}, expected e.g. '10/minute'")
+        return cls(float(count), float(count) / PERIODS[period])
+
+
+class Rule(NamedTuple):
+    name: str
+    method: str
+    path_prefix: str
+    per_ip: Optional[Limit]
+    per_email: Optional[Limit]
+
+
+class MemoryBackend:
+    """Token buckets in het geheugen van deze worker."""
+
+    def __init__(self, max_keys: int) -> None:
+        self.max_keys = max_keys
+        # key -> (tokens, laatste update)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, checks: List[Tuple[str, Limit]]) -> Tuple[bool, float]:
+        # geen await tussen lezen en schrijven: atomair binnen de event loop
+        now = time.monotonic()
+        buckets = []
+        retry_after = 0.0
+        for key, limit in checks:
+            tokens, updated = self._buckets.pop(key, (limit.capacity, now))
+            tokens = min(limit.capacity, tokens + (now - updated) * limit.refill_per_second)
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / limit.refill_per_second)
+            buckets.append((key, tokens))
+        allowed = retry_after == 0.0
+        for key, tokens in buckets:
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+        while len(self._buckets) > self.max_keys:
+            # veel verschillende IPs/emails: de minst recente bucket vergeten
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    async def close(self) -> None:
+        pass
+
+
+# KEYS = buckets, ARGV = per bucket capacity, refill_per_second, ttl_ms.
+# Alle buckets in één script: eerst alles controleren, dan pas verbruiken.
+# Tijd van de Redis-server, zodat workers met scheve klokken hetzelfde zien.
+TOKEN_BUCKET_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local tokens = {}
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+  local capacity = tonumber(ARGV[i * 3 - 2])
+  local rate = tonumber(ARGV[i * 3 - 1])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local current = tonumber(state[1]) or capacity
+  local ts = tonumber(state[2]) or now
+  current = math.min(capacity, current + math.max(0, now - ts) * rate)
+  if current < 1 then
+    retry_after = math.max(retry_after, (1 - current) / rate)
+  end
+  tokens[i] = current
+end
+local allowed = 0
+if retry_after == 0 then
+  allowed = 1
+end
+for i, key in ipairs(KEYS) do
+  redis.call('HSET', key, 'tokens', tostring(tokens[i] - allowed), 'ts', tostring(now))
+  redis.call('PEXPIRE', key, ARGV[i * 3])
+end
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RedisBackend:
+    """Token buckets in Redis, gedeeld door alle workers."""
+
+    def __init__(self, url: str, fallback: MemoryBackend) -> None:
+        try:
+            import redis.asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError(
+                "WEBSITE_RATE_LIMIT_BACKEND=redis requires the 'redis' package "
+                "(pip install redis)"
+            ) from e
+        self._client = redis_asyncio.from_url(url)
+        self._script = self._client.register_script(TOKEN_BUCKET_LUA)
+        self._fallback = fallback
+        self._last_error_logged = 0.0
+
+    async def take(self, checks: List[Tuple[str, Limit]]) -> Tuple[bool, float]:
+        args = []
+        for _key, limit in checks:
+            # bucket na volledige aanvulling + marge laten verlopen
+            ttl_ms = int(limit.capacity / limit.refill_per_second * 1000) + 1000
+            args.extend([limit.capacity, limit.refill_per_second, ttl_ms])
+        try:
+            allowed, retry_after = await self._script(
+                keys=[f"ratelimit:{key}" for key, _limit in checks],
+                args=args,
+            )
+        except Exception:
+            now = time.monotonic()
+            if now - self._last_error_logged > 60:
+                self._last_error_logged = now
+                logger.exception("Rate limit backend unavailable, using per-worker limits")
+            return await self._fallback.take(checks)
+        return bool(allowed), float(retry_after)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def default_rules() -> List[Rule]:
+    return [
+        Rule(
+            "login",
+            "POST",
+            "/api/public/login",
+            per_ip=Limit.parse(settings.WEBSITE_RATE_LIMIT_LOGIN_PER_IP),
+            per_email=Limit.parse(settings.WEBSITE_RATE_LIMIT_LOGIN_PER_EMAIL),
+        ),
+        Rule(
+            "register",
+            "POST",
+            "/api/public/register",
+            per_ip=Limit.parse(settings.WEBSITE_RATE_LIMIT_REGISTER_PER_IP),
+            per_email=Limit.parse(settings.WEBSITE_RATE_LIMIT_REGISTER_PER_EMAIL),
+        ),
+        # GET (token controleren) en POST (wachtwoord zetten = bcrypt)
+        Rule(
+            "password_setup",
+            "*",
+            "/api/public/password-setup/",
+            per_ip=Limit.parse(settings.WEBSITE_RATE_LIMIT_PASSWORD_SETUP_PER_IP),
+            per_email=None,
+        ),
+    ]
+
+
+def build_backend():
+    memory = MemoryBackend(settings.WEBSITE_RATE_LIMIT_MAX_KEYS)
+    if settings.WEBSITE_RATE_LIMIT_BACKEND == "redis":
+        return RedisBackend(settings.WEBSITE_RATE_LIMIT_REDIS_URL, fallback=memory)
+    return memory
+
+
+class RateLimiter:
+    def __init__(self, backend, rules: List[Rule], trust_forwarded: bool = False) -> None:
+        self.backend = backend
+        self.rules = rules
+        self.trust_forwarded = trust_forwarded
+        self.allowed: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self.rejected: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self.too_large: Dict[str, int] = {rule.name: 0 for rule in rules}
+
+    def rule_for(self, method: str, path: str) -> Optional[Rule]:
+        for rule in self.rules:
+            if rule.method in ("*", method) and path.startswith(rule.path_prefix):
+                return rule
+        return None
+
+    def client_ip(self, scope) -> str:
+        if self.trust_forwarded:
+            for name, value in scope.get("headers", []):
+                if name == b"x-forwarded-for":
+                    # laatste hop = wat onze eigen proxy zag (niet spoofbaar)
+                    return value.decode("latin-1").split(",")[-1].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def check(self, rule: Rule, ip: str, email: Optional[str]) -> float:
+        """0 als de request door mag, anders het aantal seconden tot de volgende poging."""
+        checks = []
+        if rule.per_ip:
+            checks.append((f"{rule.name}:ip:{ip}", rule.per_ip))
+        if rule.per_email and email:
+            checks.append((f"{rule.name}:email:{email}", rule.per_email))
+        if not checks:
+            self.allowed[rule.name] += 1
+            return 0.0
+        allowed, retry_after = await self.backend.take(checks)
+        if not allowed:
+            self.rejected[rule.name] += 1
+            return max(retry_after, 1.0)
+        self.allowed[rule.name] += 1
+        return 0.0
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "rules": {
+                rule.name: {
+                    "per_ip": rule.per_ip._asdict() if rule.per_ip else None,
+                    "per_email": rule.per_email._asdict() if rule.per_email else None,
+                    "allowed": self.allowed[rule.name],
+                    "rejected": self.rejected[rule.name],
+                    "too_large": self.too_large[rule.name],
+                }
+                for rule in self.rules
+            },
+        }
+
+
+def _email_from_body(body: bytes) -> Optional[str]:
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    email = data.get("email") if isinstance(data, dict) else None
+    return email.strip().lower() if isinstance(email, str) and email.strip() else None
+
+
+class RateLimitMiddleware:
+    """ASGI-middleware rond de app; zie RateLimiter voor de regels."""
+
+    def __init__(self, app, limiter: RateLimiter) -> None:
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        rule = self.limiter.rule_for(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        email = None
+        if rule.per_email:
+            # body bufferen om het emailadres te lezen, daarna opnieuw afspelen
+            messages = []
+            body = b""
+            while True:
+                message = await receive()
+                messages.append(message)
+                if message["type"] != "http.request":
+                    break
+                body += message.get("body", b"")
+                if not message.get("more_body", False) or len(body) > MAX_INSPECTED_BODY:
+                    break
+            original_receive = receive
+
+            async def receive():
+                if messages:
+                    return messages.pop(0)
+                return await original_receive()
+
+            if len(body) > MAX_INSPECTED_BODY:
+                # niet zonder emailadres doorlaten: enkel per IP tellen zou de
+                # limiet per email omzeilen (extra velden negeert Pydantic)
+                self.limiter.too_large[rule.name] += 1
+                response = JSONResponse(
+                    {"detail": "Request body too large"},
+                    status_code=413,
+                )
+                return await response(scope, receive, send)
+            email = _email_from_body(body)
+
+        retry_after = await self.limiter.check(rule, self.limiter.client_ip(scope), email)
+        if retry_after:
+            response = JSONResponse(
+                {"detail": "Too many requests, please try again later"},
+                status_code=429,
+                headers={"Retry-After": str(int(retry_after + 0.999))},
+            )
+            return await response(scope, receive, send)
+        return await self.app(scope, receive, send)
+
+
+rate_limiter = RateLimiter(
+    build_backend(),
+    default_rules(),
+    trust_forwarded=settings.WEBSITE_RATE_LIMIT_TRUST_FORWARDED,
+)
@@ -0,0 +1,217 @@
+# modules/website/backend/replica.py
+"""
+Routing van read-only requests naar een read replica (WEBSITE_DB_REPLICA_URL).
+
+Handlers die enkel lezen (admin-klantenlijst en -detail, portaaloverzicht)
+krijgen via deps.get_read_db een sessie van `read_router`. Die kiest per
+request:
+
+- primary als er geen replica geconfigureerd is
+- primary als dezelfde gebruiker (customer_id uit de token) de laatste
+  WEBSITE_DB_REPLICA_STICKY_SECONDS een schrijvende request deed
+  (read-your-writes; deps.get_db markeert dat)
+- primary als de laatste check de replica onbereikbaar vond, of met meer
+  replicatievertraging dan WEBSITE_DB_REPLICA_MAX_LAG_SECONDS
+- anders de replica; lukt de verbinding niet, dan toch de primary (en de
+  replica geldt als onbereikbaar tot de volgende geslaagde check)
+
+De check draait als achtergrondtaak per worker, om de
+WEBSITE_DB_REPLICA_CHECK_SECONDS. Zolang de eerste check niet klaar is, gaat
+alles naar de primary.
+
+Stickiness is per worker (zoals cache.py): een request die bij een andere
+worker landt, ziet een eigen schrijfactie pas na de replicatievertraging,
+die door MAX_LAG_SECONDS begrensd blijft.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cache import TTLCache
+from config import settings
+from database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+
+
+logger = logging.getLogger("website-backend")
+
+# Seconden achterstand op de primary. Een replica die alle ontvangen WAL al
+# heeft toegepast loopt niet achter, ook al is de laatste replayed transactie
+# oud (rustige primary); op een primary zelf is de lag 0.
+LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """
+)
+
+# fouten waarbij een request van de replica naar de primary terugvalt
+CONNECT_ERRORS = (OSError, asyncio.TimeoutError, DBAPIError)
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replica_engine=None,
+        replica_sessionmaker=None,
+        primary_sessionmaker=AsyncSessionLocal,
+        max_lag: float = 5.0,
+        check_interval: float = 2.0,
+        sticky_seconds: float = 15.0,
+        sticky_maxsize: int = 10000,
+    ) -> None:
+        self.replica_engine = replica_engine
+        self.replica_sessionmaker = replica_sessionmaker
+        self.primary_sessionmaker = primary_sessionmaker
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        # customer_id -> True zolang die gebruiker van de primary leest
+        self.sticky = TTLCache(maxsize=sticky_maxsize, ttl=sticky_seconds)
+
+        self.available = False
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.reads = {
+            "replica": 0,
+            "primary_no_replica": 0,
+            "primary_sticky": 0,
+            "primary_unavailable": 0,
+            "primary_lagging": 0,
+            "primary_connect_failed": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.replica_sessionmaker is not None
+
+    # --- health / lag ---------------------------------------------------
+
+    async def check(self) -> None:
+        try:
+            async with self.replica_engine.connect() as conn:
+                lag = float((await conn.execute(LAG_QUERY)).scalar_one())
+        except CONNECT_ERRORS as e:
+            self._mark_unavailable(e)
+            return
+        if not self.available:
+            logger.info("Read replica available (lag %.1fs)", lag)
+        self.available = True
+        self.lag_seconds = lag
+        self.last_error = None
+        self.checked_at = time.monotonic()
+
+    def _mark_unavailable(self, error: BaseException) -> None:
+        if self.available or self.checked_at is None:
+            logger.warning("Read replica unavailable, reading from primary: %s", error)
+        self.available = False
+        self.lag_seconds = None
+        self.last_error = f"{type(error).__name__}: {error}"
+        self.checked_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self.check(), timeout=max(self.check_interval, 1.0))
+            except asyncio.TimeoutError as e:
+                self._mark_unavailable(e)
+            except Exception as e:  # de check mag de taak nooit stoppen
+                logger.exception("Read replica check failed")
+                self._mark_unavailable(e)
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self.enabled and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.replica_engine is not None:
+            await self.replica_engine.dispose()
+
+    # --- routing ----------------------------------------------------------
+
+    def mark_write(self, principal_key: Optional[str]) -> None:
+        """`principal_key` leest de volgende STICKY_SECONDS van de primary."""
+        if principal_key and self.enabled:
+            self.sticky.set(principal_key, True)
+
+    def _route(self, principal_key: Optional[str]) -> str:
+        if not self.enabled:
+            return "primary_no_replica"
+        if principal_key and self.sticky.get(principal_key):
+            return "primary_sticky"
+        if not self.available:
+            return "primary_unavailable"
+        if self.lag_seconds is not None and self.lag_seconds > self.max_lag:
+            return "primary_lagging"
+        return "replica"
+
+    @asynccontextmanager
+    async def session(self, principal_key: Optional[str] = None) -> AsyncIterator[AsyncSession]:
+        route = self._route(principal_key)
+        db = None
+        if route == "replica":
+            db = self.replica_sessionmaker()
+            try:
+                # nu verbinden, zodat een fout nog naar de primary kan
+                await db.connection()
+            except CONNECT_ERRORS as e:
+                await db.close()
+                self._mark_unavailable(e)
+                db = None
+                route = "primary_connect_failed"
+        self.reads[route] += 1
+        if db is None:
+            db = self.primary_sessionmaker()
+        async with db:
+            yield db
+
+    def stats(self) -> Dict[str, Any]:
+        total = sum(self.reads.values())
+        return {
+            "enabled": self.enabled,
+            "available": self.available,
+            "lag_seconds": (
+                round(self.lag_seconds, 3) if self.lag_seconds is not None else None
+            ),
+            "max_lag_seconds": self.max_lag,
+            "checked_seconds_ago": (
+                round(time.monotonic() - self.checked_at, 1)
+                if self.checked_at is not None
+                else None
+            ),
+            "last_error": self.last_error,
+            "sticky_seconds": self.sticky.ttl,
+            "sticky_principals": self.sticky.stats()["size"],
+            "reads": dict(self.reads),
+            "replica_read_ratio": round(self.reads["replica"] / total, 4) if total else 0.0,
+        }
+
+
+read_router = ReplicaRouter(
+    replica_engine=replica_engine,
+    replica_sessionmaker=ReplicaSessionLocal,
+    max_lag=settings.WEBSITE_DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.WEBSITE_DB_REPLICA_CHECK_SECONDS,
+    sticky_seconds=settings.WEBSITE_DB_REPLICA_STICKY_SECONDS,
+)
@@ -2,7 +2,7 @@ from datetime import datetime
 from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, validator
+from pydantic import BaseModel, EmailStr, Field, validator
 from models import CustomerType
 
 
@@ -19,6 +19,23 @@ class TokenData(BaseModel):
     is_admin: Optional[bool] = None
 
 
+class Principal(BaseModel):
+    """
+    Onveranderlijke momentopname van de ingelogde klant (zie cache.py).
+    Geen ORM-object: wordt gedeeld tussen requests.
+    """
+    id: UUID
+    email: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    is_active: bool
+    is_admin: bool
+
+    class Config:
+        orm_mode = True
+        allow_mutation = False
+
+
 # === Public registration ===
 
 class RegistrationRequest(BaseModel):
@@ -177,6 +194,9 @@ class CustomerDetail(CustomerBase):
     has_login: bool
     portal_status: Optional[str] = None
 
+    # optimistic locking: zelfde waarde als de ETag ("v<version>")
+    version: int
+
     class Config:
         orm_mode = True
 
@@ -184,6 +204,70 @@ class CustomerDetail(CustomerBase):
 class CustomersListResponse(BaseModel):
     items: List[CustomerListItem]
     total: int
+    # False: total is een schatting van de planner (grote resultaten)
+    total_exact: bool = True
+    # keyset-paginatie: opaque cursors, None als er geen volgende/vorige pagina is
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+# === Bulk import ===
+
+class ImportRowError(BaseModel):
+    row: int
+    email: Optional[str] = None
+    reason: str
+    # veldfouten van RegistrationRequest: [{"field": ..., "message": ...}]
+    details: List[dict] = []
+
+
+class ImportReport(BaseModel):
+    format: str
+    total_rows: int
+    imported: int
+    invalid: int
+    duplicates_in_file: int
+    already_registered: int
+    errors: List[ImportRowError]
+    errors_truncated: bool = False
+    duration_seconds: float
+    rows_per_second: float
+
+
+# === Bulk acties ===
+
+class BulkCustomerFilter(BaseModel):
+    """Zelfde filters als GET /api/admin/customers."""
+    search: Optional[str] = None
+    customer_type: Optional[CustomerType] = None
+    status: str = Field("active", regex="^(active|inactive|all)$")
+
+
+class BulkCustomerActionRequest(BaseModel):
+    # ofwel een lijst ids, ofwel een filter (niet allebei)
+    customer_ids: Optional[List[UUID]] = None
+    filter: Optional[BulkCustomerFilter] = None
+
+    @validator("filter", always=True)
+    def validate_selection(cls, v, values):
+        if (values.get("customer_ids") is None) == (v is None):
+            raise ValueError("Geef ofwel customer_ids ofwel filter op.")
+        return v
+
+
+class BulkCustomerOutcome(BaseModel):
+    id: UUID
+    # updated / unchanged / not_found / inactive
+    outcome: str
+    # enkel bij reset_password in local/dev (zoals PasswordResetResponse)
+    token: Optional[str] = None
+
+
+class BulkCustomerActionResponse(BaseModel):
+    action: str
+    matched: int
+    updated: int
+    results: List[BulkCustomerOutcome]
 
 
 class SimpleSuccessResponse(BaseModel):
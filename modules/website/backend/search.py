@@ -0,0 +1,92 @@
+# modules/website/backend/search.py
+"""
+Zoekmachine achter `crud.list_customers(search=...)`.
+
+- pg_trgm GIN-index op één genormaliseerd zoekdocument per klant
+  (naam, email, bedrijf, RFC/tax_id en stad)
+- accent-ongevoelig via `unaccent` ("Ramirez" vindt "Ramírez")
+- substring- en prefixmatch (typeahead) plus fuzzy match via word_similarity
+- relevantie-score om op te sorteren
+"""
+
+import unicodedata
+
+from sqlalchemy import Float, String, bindparam, case, cast, func, literal_column, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+
+# Let op: deze expressie moet letterlijk gelijk zijn aan die in de index
+# ix_customers_search_trgm (alembic/versions/0001_website_baseline.py),
+# anders kan Postgres de index niet gebruiken. Daarom staat ze als SQL-tekst
+# hier, en niet als SQLAlchemy-expressie (die zou o.a. ' ' als bind-parameter
+# versturen). coalesce + || in plaats van concat_ws, want concat_ws is niet
+# IMMUTABLE en mag dus niet in een index-expressie.
+SEARCH_DOCUMENT_SQL = (
+    "casuse_unaccent(lower("
+    "coalesce(first_name, '') || ' ' || "
+    "coalesce(last_name, '') || ' ' || "
+    "coalesce(email, '') || ' ' || "
+    "coalesce(company_name, '') || ' ' || "
+    "coalesce(tax_id, '') || ' ' || "
+    "coalesce(address_city, '')"
+    "))"
+)
+
+# Bonus voor een woord dat met de zoekterm begint (typeahead), bovenop de
+# word_similarity-score (0..1).
+PREFIX_BONUS = 1.0
+
+
+def normalize_search_term(term: str) -> str:
+    """
+    Zelfde normalisatie als het zoekdocument: lowercase en zonder accenten.
+    """
+    decomposed = unicodedata.normalize("NFKD", term.strip().lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_document() -> ColumnElement:
+    return literal_column(SEARCH_DOCUMENT_SQL)
+
+
+def search_filter(term: str) -> ColumnElement:
+    """
+    Match als het document de term bevat, of als een woord in het document
+    voldoende op de term lijkt (tikfouten). Beide vormen gebruiken de GIN-index.
+    """
+    document = search_document()
+    escaped = _escape_like(term)
+    return or_(
+        document.like(
+            bindparam("search_contains", f"%{escaped}%", type_=String),
+            escape="\\",
+        ),
+        document.bool_op("%>")(bindparam("search_term", term, type_=String)),
+    )
+
+
+def search_rank(term: str) -> ColumnElement:
+    """
+    Relevantie: word_similarity plus een bonus als een woord met de term begint.
+    """
+    document = search_document()
+    escaped = _escape_like(term)
+    prefix_match = or_(
+        document.like(
+            bindparam("search_prefix", f"{escaped}%", type_=String),
+            escape="\\",
+        ),
+        document.like(
+            bindparam("search_word_prefix", f"% {escaped}%", type_=String),
+            escape="\\",
+        ),
+    )
+    return cast(
+        func.word_similarity(bindparam("search_term", term, type_=String), document)
+        + case((prefix_match, PREFIX_BONUS), else_=0.0),
+        Float(precision=53),
+    )
@@ -1,18 +1,39 @@
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
+from casuse_common.jwt_cache import VerifiedClaimsCache
 from jose import jwt
 from passlib.context import CryptContext
 
 from config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# - nieuwe hashes: bcrypt met WEBSITE_BCRYPT_ROUNDS
+# - pbkdf2_sha256 (seeds van de core-backend) blijft geldig, maar is deprecated
+# - min/max rounds: bcrypt-hashes met een andere cost (te zwak of te duur)
+#   gelden als verouderd, zie verify_and_update_password
+pwd_context = CryptContext(
+    schemes=["bcrypt", "pbkdf2_sha256"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.WEBSITE_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.WEBSITE_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.WEBSITE_BCRYPT_ROUNDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    (geldig, nieuwe hash). De nieuwe hash is enkel gezet als het wachtwoord
+    klopt en de bestaande hash verouderd is (ander schema of andere cost).
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
@@ -37,10 +58,22 @@ def create_access_token(
     return encoded_jwt
 
 
-def decode_access_token(token: str) -> Dict[str, Any]:
-    payload = jwt.decode(
+def _verify_access_token(token: str) -> Dict[str, Any]:
+    return jwt.decode(
         token,
         settings.WEBSITE_JWT_SECRET,
         algorithms=[settings.WEBSITE_JWT_ALGORITHM],
     )
-    return payload
+
+
+# Geverifieerde claims per token (per worker); verloopt op `exp` van de token.
+access_token_cache = VerifiedClaimsCache(
+    _verify_access_token,
+    maxsize=settings.WEBSITE_JWT_CACHE_SIZE,
+    max_ttl=settings.WEBSITE_JWT_CACHE_TTL_SECONDS,
+)
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Claims van een geldige token (gedeeld, niet wijzigen); anders JWTError."""
+    return access_token_cache.decode(token)
@@ -0,0 +1,178 @@
+# modules/website/backend/token_reaper.py
+"""
+Periodiek opruimen van registration_tokens.
+
+Opgeruimd worden tokens waarvan expires_at langer dan
+WEBSITE_TOKEN_REAPER_RETENTION_DAYS geleden is, en die ofwel gebruikt zijn,
+ofwel vervangen door een nieuwer token van dezelfde klant. Het meest recente,
+ongebruikte token van een klant blijft altijd staan: daarop steunt
+portal_status ("invitation_expired").
+
+- per batch één korte transactie: DELETE ... WHERE id IN (SELECT ... LIMIT n
+  FOR UPDATE SKIP LOCKED), dus rijen die de registratie-/resetflow net
+  vastheeft worden overgeslagen i.p.v. erop te wachten
+- optioneel archiveren (WEBSITE_TOKEN_REAPER_ARCHIVE) in hetzelfde statement
+  (DELETE ... RETURNING in een CTE, INSERT in registration_tokens_archive)
+- per run een rij in token_reaper_runs: opgeruimde rijen plus tabel- en
+  indexgrootte, zie GET /api/admin/metrics/token-reaper
+
+Gebruik (vanuit modules/website/backend):
+
+    python token_reaper.py          # elke WEBSITE_TOKEN_REAPER_INTERVAL_SECONDS
+    python token_reaper.py --once   # één run (bv. vanuit cron)
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, exists, insert, or_, select, text
+
+from config import settings
+from database import SessionLocal
+from models import RegistrationToken, RegistrationTokenArchive, TokenReaperRun
+
+
+logger = logging.getLogger("website-backend")
+
+tokens = RegistrationToken.__table__
+archive = RegistrationTokenArchive.__table__
+
+TABLE_STATS_SQL = text(
+    """
+    SELECT pg_table_size('registration_tokens') AS table_bytes,
+           pg_indexes_size('registration_tokens') AS index_bytes,
+           coalesce(
+               (SELECT n_live_tup FROM pg_stat_user_tables
+                WHERE relname = 'registration_tokens'),
+               0
+           ) AS live_rows
+    """
+)
+
+
+class ReapResult(NamedTuple):
+    purged: int
+    batches: int
+
+
+def reapable_batch(cutoff: datetime, limit: int):
+    """ids van maximaal `limit` op te ruimen tokens, vergrendeld met SKIP LOCKED."""
+    newer = tokens.alias("newer")
+    superseded = exists().where(
+        newer.c.customer_id == tokens.c.customer_id,
+        newer.c.created_at > tokens.c.created_at,
+    )
+    return (
+        select(tokens.c.id)
+        .where(
+            tokens.c.expires_at < cutoff,
+            or_(tokens.c.used.is_(True), superseded),
+        )
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def purge_batch(db, cutoff: datetime, limit: int, archive_rows: bool) -> int:
+    doomed = delete(tokens).where(
+        tokens.c.id.in_(reapable_batch(cutoff, limit).scalar_subquery())
+    )
+    if not archive_rows:
+        return db.execute(doomed).rowcount
+
+    columns = ["id", "customer_id", "expires_at", "used", "created_at"]
+    purged = doomed.returning(*[tokens.c[name] for name in columns]).cte("purged")
+    result = db.execute(
+        insert(archive).from_select(
+            columns + ["archived_at"],
+            select(*[purged.c[name] for name in columns], text("now()")),
+        )
+    )
+    return result.rowcount
+
+
+def reap_tokens(stop: Optional[threading.Event] = None) -> ReapResult:
+    stop = stop or threading.Event()
+    cutoff = datetime.now(timezone.utc) - timedelta(
+        days=settings.WEBSITE_TOKEN_REAPER_RETENTION_DAYS
+    )
+    batch_size = settings.WEBSITE_TOKEN_REAPER_BATCH_SIZE
+    purged = batches = 0
+    while not stop.is_set():
+        with SessionLocal() as db:
+            count = purge_batch(db, cutoff, batch_size, settings.WEBSITE_TOKEN_REAPER_ARCHIVE)
+            db.commit()
+        batches += 1
+        purged += count
+        if count < batch_size:
+            break
+        # andere schrijvers en autovacuum wat ruimte geven
+        stop.wait(settings.WEBSITE_TOKEN_REAPER_PAUSE_SECONDS)
+    return ReapResult(purged=purged, batches=batches)
+
+
+def run_once(stop: Optional[threading.Event] = None) -> ReapResult:
+    started_at = datetime.now(timezone.utc)
+    result = reap_tokens(stop)
+    finished_at = datetime.now(timezone.utc)
+    with SessionLocal() as db:
+        stats = db.execute(TABLE_STATS_SQL).one()
+        db.add(
+            TokenReaperRun(
+                started_at=started_at,
+                finished_at=finished_at,
+                purged=result.purged,
+                archived=settings.WEBSITE_TOKEN_REAPER_ARCHIVE,
+                batches=result.batches,
+                table_bytes=stats.table_bytes,
+                index_bytes=stats.index_bytes,
+                live_rows=stats.live_rows,
+            )
+        )
+        db.commit()
+    logger.info(
+        "Token reaper: %s tokens %s in %s batches (%.1fs); registration_tokens "
+        "now %s live rows, table %s bytes, indexes %s bytes",
+        result.purged,
+        "archived" if settings.WEBSITE_TOKEN_REAPER_ARCHIVE else "deleted",
+        result.batches,
+        (finished_at - started_at).total_seconds(),
+        stats.live_rows,
+        stats.table_bytes,
+        stats.index_bytes,
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n\n")[0])
+    parser.add_argument("--once", action="store_true", help="één run en stoppen")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    while not stop.is_set():
+        try:
+            run_once(stop)
+        except Exception:
+            # bv. database nog niet bereikbaar of nog niet gemigreerd
+            logger.exception("Token reaper run failed")
+            if args.once:
+                raise
+        if args.once:
+            break
+        stop.wait(settings.WEBSITE_TOKEN_REAPER_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
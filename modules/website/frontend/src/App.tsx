@@ -50,6 +50,8 @@ interface CustomerListItem {
 interface CustomersListResponse {
   items: CustomerListItem[]
   total: number
+  // false: total is een schatting (grote resultaten), toon bv. "~270.000"
+  total_exact?: boolean
 }
 
 interface CustomerDetail extends CustomerListItem {